@@ -9,12 +9,13 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
-from core.data_loader import load_seed
+from core.data_loader import load_seed, seed_fingerprint, SeedWatcher, SEED
+from core.service import apply_seed_delta
 from core import frp
 from core.transforms import (
     add_task, filter_by_status, avg_tasks_per_user,
     by_priority, by_assignee, by_date_range,
-    walk_comments, traverse_tasks,
+    walk_comments, traverse_tasks, iter_traverse_tasks,
     overdue_tasks, measure_cache_performance,
     safe_task, validate_task, create_task_pipeline
 )
@@ -25,21 +26,44 @@ from core.report import (
 )
 from core.ftypes import Maybe, Some, Nothing, Either, Right, Left
 from core.domain import Task
+from core.comments import CommentIndex
+import dataclasses
 import datetime
-
-# Загружаем данные
-projects, users, tasks, comments = load_seed()
+import uuid
+from itertools import islice
+
+# Загружаем данные один раз за сессию; при изменении seed.json
+# применяем только разницу (SeedWatcher), а не перечитываем всё заново
+if "seed" not in st.session_state:
+    # Отпечаток снимается до загрузки: изменение файла во время неё заметит первый poll()
+    _fingerprint = seed_fingerprint(SEED)
+    _loaded = load_seed()
+    _projects, _users, _tasks, _comments = _loaded
+    # Индекс комментариев по задачам строится один раз при загрузке
+    st.session_state.seed = (_projects, _users, _tasks, CommentIndex(_comments))
+    st.session_state.seed_watcher = SeedWatcher(seed=_loaded, fingerprint=_fingerprint)
+else:
+    _delta = st.session_state.seed_watcher.poll()
+    if _delta:
+        _projects, _users, _tasks, _comments = st.session_state.seed
+        st.session_state.seed = (
+            st.session_state.seed_watcher.current("projects"),
+            st.session_state.seed_watcher.current("users"),
+            apply_seed_delta(_tasks, _delta.tasks),
+            _comments.apply_delta(_delta.comments),
+        )
+projects, users, tasks, comments = st.session_state.seed
 
 # Инициализация EventBus в session_state
 if "bus" not in st.session_state:
-    st.session_state.bus = frp.EventBus()
+    st.session_state.bus = frp.EventBus(coalesce={"task_updated": "id"}, ids=frp.IDS_ULID, metrics=True)
     st.session_state.events = []
 
-    def log_event(ev):
-        st.session_state.events.append(ev)
+    def log_events(batch):
+        st.session_state.events.extend(batch)
 
-    st.session_state.bus.subscribe("task_created", log_event)
-    st.session_state.bus.subscribe("task_updated", log_event)
+    st.session_state.bus.subscribe("task_created", log_events, batch=True)
+    st.session_state.bus.subscribe("task_updated", log_events, batch=True)
 
 # Инициализация текущей страницы
 if "current_page" not in st.session_state:
@@ -411,6 +435,9 @@ def show_events_page():
     if st.session_state.events:
         for ev in reversed(st.session_state.events[-10:]):  # показываем последние 10
             payload = ev.payload
+            if isinstance(payload, Task):
+                # task_created из формы публикует задачу целиком — показываем её поля так же, как словарь
+                payload = dataclasses.asdict(payload)
             if isinstance(payload, dict):
                 title = payload.get("title") or payload.get("id") or ""
                 desc = payload.get("desc") or payload.get("text") or ""
@@ -444,12 +471,23 @@ def show_events_page():
     else:
         st.info("Пока событий нет — создайте первую задачу.")
 
+    metrics = st.session_state.bus.metrics_snapshot()
+    if metrics and metrics["handlers"]:
+        st.markdown("#### ⏱️ Обработчики событий")
+        st.dataframe(metrics["handlers"], use_container_width=True)
+        st.caption(" · ".join(f"{event_name_labels.get(k, k)}: {n}" for k, n in metrics["events"].items()))
+
 def show_create_task_page():
     """Форма публикации события task_created (демонстрация EventBus)."""
     st.markdown("### ➕ Создать задачу")
     with st.form("new_task"):
         title = st.text_input("Название задачи")
         desc = st.text_area("Описание")
+        project_id = st.selectbox(
+            "Проект",
+            [p.id for p in projects],
+            format_func=lambda v: next((p.name for p in projects if p.id == v), v),
+        )
         status = st.selectbox(
             "Статус",
             ["todo", "in_progress", "review", "done"],
@@ -468,13 +506,20 @@ def show_create_task_page():
         submitted = st.form_submit_button("Создать задачу")
 
         if submitted and title:
-            new_task = {
-                "title": title,
-                "desc": desc,
-                "status": status,
-                "priority": priority,
-                "assignee": assignee if assignee else None
-            }
+            # Полная задача, а не словарь из формы: по журналу событий её можно восстановить
+            # Наивная строка UTC, как в seed.json: даты с часовым поясом правила SLA пропускают
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat()
+            new_task = Task(
+                id=f"t_{uuid.uuid4().hex[:12]}",
+                project_id=project_id,
+                title=title,
+                desc=desc,
+                status=status,
+                priority=priority,
+                assignee=assignee if assignee else None,
+                created=now,
+                updated=now,
+            )
             ev = st.session_state.bus.publish("task_created", new_task)
             st.success(f"✅ Задача '{title}' создана!")
 
@@ -593,8 +638,8 @@ def show_lab2_filters_page():
     
     if st.button("Обойти задачи в порядке статусов"):
         status_order = ("todo", "in_progress", "review", "done")
-        task_ids = traverse_tasks(tasks, status_order)
-        st.write(f"ID задач в порядке статусов: {task_ids[:10]}")
+        task_ids = tuple(islice(iter_traverse_tasks(tasks, status_order), 10))
+        st.write(f"ID задач в порядке статусов: {task_ids}")
 
 def show_lab3_reports_page():
     """Лаба #3: Продвинутая рекурсия + мемоизация - Reports"""
@@ -627,6 +672,11 @@ def show_lab3_reports_page():
             st.metric("Улучшение", f"{perf['cache_improvement']:.1f}x")
         
         st.success(f"Кэш ускорил выполнение в {perf['cache_improvement']:.1f} раз!")
+        cache_stats = perf["cache_stats"]
+        st.caption(
+            f"Кэш SLA: попаданий {cache_stats['hits']}, промахов {cache_stats['misses']}, "
+            f"вытеснений {cache_stats['evictions']}, записей {cache_stats['entries']}"
+        )
     
     # Отчет по загрузке пользователей
     st.markdown("#### 👥 Загрузка пользователей")
@@ -0,0 +1,207 @@
+# core/cache.py
+"""Кэш результатов SLA-проверок (просроченных задач).
+
+В отличие от `functools.lru_cache`, ключ здесь не хеширует весь кортеж задач:
+снимок коллекции опознаётся по идентичности объекта (O(1)), а к ключу
+добавляется номер временного окна, чтобы результат не «застывал», когда
+идут часы. Размер кэша ограничен и числом записей, и суммарным числом задач
+в сохранённых результатах; счётчики попаданий/промахов/вытеснений доступны
+через `stats()`. Снимки, на которые нельзя взять слабую ссылку (кортежи —
+обычный результат `load_seed`), кэш удерживает сам, поэтому их длина тоже
+входит в этот лимит.
+
+`SnapshotCache` — такой же ограниченный кэш по идентичности снимка для
+производных структур (индексов сроков и т.п.), которые строятся один раз
+на снимок. Такие структуры растут вместе со снимком (и часто ссылаются на
+него), поэтому и здесь помимо числа записей ограничено суммарное число
+задач в снимках. `invalidate_snapshot` сбрасывает записи снимка во всех кэшах.
+"""
+
+import time
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .domain import Task
+
+R = TypeVar("R")
+_REGISTRY: List[Any] = []
+
+
+def _snapshot_ref(tasks: Any) -> Tuple[Callable[[], Any], int]:
+    """Ссылка на снимок и число задач, которые она удерживает.
+
+    Ссылка слабая, если объект это позволяет (0 задач); иначе обычная, и
+    тогда удерживается весь снимок.
+    """
+    try:
+        return weakref.ref(tasks), 0
+    except TypeError:
+        return (lambda: tasks), _size(tasks)
+
+
+def _size(tasks: Any) -> int:
+    try:
+        return len(tasks)
+    except TypeError:
+        return 0
+
+
+class SlaCache:
+    """Ограниченный LRU-кэш для `overdue_tasks` с временными окнами.
+
+    Ключ записи — `(id снимка, правила, окно времени)`. Попадание засчитывается
+    только если запись ссылается на тот же самый объект снимка, поэтому
+    переиспользование `id()` после сборки мусора не даёт ложных попаданий.
+    """
+
+    def __init__(self, maxsize: int = 32, max_items: int = 1_000_000, bucket_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.max_items = max_items
+        self.bucket_seconds = bucket_seconds
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._items = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        _REGISTRY.append(self)
+
+    def _bucket(self, now: Optional[datetime]) -> int:
+        if now is None:
+            ts = time.time()
+        elif now.tzinfo is None:  # наивное время в проекте — UTC, а не местное
+            ts = now.replace(tzinfo=timezone.utc).timestamp()
+        else:
+            ts = now.timestamp()
+        return int(ts // self.bucket_seconds)
+
+    def get_or_compute(self, tasks: Any, rules: Tuple[str, ...], compute: Callable[[], Tuple[Task, ...]], now: Optional[datetime] = None) -> Tuple[Task, ...]:
+        """Вернуть закэшированный результат для снимка или посчитать его через `compute`."""
+        key = (id(tasks), rules, self._bucket(now))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is tasks:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        result = compute()
+        if entry is not None:
+            self._drop(key)
+        ref, pinned = _snapshot_ref(tasks)
+        weight = len(result) + pinned
+        self._entries[key] = (ref, result, weight)
+        self._items += weight
+        self._evict()
+        return result
+
+    def _drop(self, key: tuple) -> None:
+        self._items -= self._entries.pop(key)[2]
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.maxsize or self._items > self.max_items):
+            key = next(iter(self._entries))
+            self._drop(key)
+            self.evictions += 1
+
+    def invalidate(self, tasks: Any = None) -> int:
+        """Удалить записи снимка `tasks` (или все записи). Вернуть число удалённых."""
+        if tasks is None:
+            keys = list(self._entries)
+        else:
+            keys = [k for k, (ref, _, _) in self._entries.items() if k[0] == id(tasks) and ref() is tasks]
+        for key in keys:
+            self._drop(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Очистить кэш и обнулить счётчики."""
+        self._entries.clear()
+        self._items = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Счётчики кэша и текущий размер."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "cached_tasks": self._items,
+        }
+
+
+class SnapshotCache:
+    """Ограниченный LRU-кэш структур, построенных по снимку задач.
+
+    Вес записи — длина снимка: структура (индекс сроков, индекс ID…) растёт
+    вместе с ним, а кортеж-снимок кэш к тому же удерживает сам.
+    """
+
+    def __init__(self, maxsize: int = 8, max_items: int = 1_000_000):
+        self.maxsize = maxsize
+        self.max_items = max_items
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._items = 0
+        self.hits = 0
+        self.misses = 0
+        _REGISTRY.append(self)
+
+    def get_or_build(self, tasks: Any, build: Callable[[], R]) -> R:
+        """Вернуть структуру для снимка `tasks`, построив её при первом обращении."""
+        key = id(tasks)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0]() is tasks:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = build()
+        self.put(tasks, value)
+        return value
+
+    def peek(self, tasks: Any) -> Optional[Any]:
+        """Структура снимка `tasks`, если она уже построена, иначе None (без счётчиков)."""
+        entry = self._entries.get(id(tasks))
+        return entry[1] if entry is not None and entry[0]() is tasks else None
+
+    def put(self, tasks: Any, value: Any) -> None:
+        """Запомнить готовую структуру для снимка (например, перенесённую с прежнего снимка)."""
+        key = id(tasks)
+        if key in self._entries:
+            self._drop(key)
+        ref, _ = _snapshot_ref(tasks)
+        weight = _size(tasks)
+        self._entries[key] = (ref, value, weight)
+        self._items += weight
+        # Последнюю запись не вытесняем: иначе снимок больше лимита перестраивался бы при каждом вызове
+        while len(self._entries) > 1 and (len(self._entries) > self.maxsize or self._items > self.max_items):
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: int) -> None:
+        self._items -= self._entries.pop(key)[2]
+
+    def invalidate(self, tasks: Any = None) -> int:
+        """Удалить запись снимка `tasks` (или все записи)."""
+        if tasks is None:
+            n = len(self._entries)
+            self._entries.clear()
+            self._items = 0
+            return n
+        entry = self._entries.get(id(tasks))
+        if entry is not None and entry[0]() is tasks:
+            self._drop(id(tasks))
+            return 1
+        return 0
+
+
+def invalidate_snapshot(tasks: Any) -> None:
+    """Сбросить записи снимка `tasks` во всех кэшах (вызывается при изменении задач)."""
+    for cache in _REGISTRY:
+        cache.invalidate(tasks)
+
+
+SLA_CACHE = SlaCache()
@@ -0,0 +1,123 @@
+# core/comments.py
+"""Индекс комментариев по `task_id`.
+
+`CommentIndex` строится за один проход по комментариям и хранит для каждой
+задачи позиции её комментариев в порядке загрузки, а также множество пар
+`(ts, позиция)` для постраничной выдачи по времени. Индекс неизменяем:
+`add`/`extend` возвращают новый индекс, разделяющий структуру с прежним
+(персистентные `PVector`/`PMap`/`PSortedSet`), поэтому новые комментарии
+не требуют перестройки.
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple
+
+from .domain import Comment
+from .persistent import PMap, PSortedSet, PVector
+
+if TYPE_CHECKING:
+    from .data_loader import EntityDelta
+
+_EMPTY_POSITIONS = PVector()
+_EMPTY_BY_TS = PSortedSet()
+
+
+class CommentIndex:
+    """Неизменяемый индекс комментариев: task_id -> комментарии.
+
+    Ведёт себя как последовательность всех комментариев, поэтому его можно
+    передавать туда, где ожидается кортеж `Comment`.
+    """
+
+    __slots__ = ("_comments", "_by_task", "_by_ts", "__weakref__")
+
+    def __init__(self, comments: Iterable[Comment] = ()):
+        comments = tuple(comments)
+        by_task: Dict[str, List[int]] = {}
+        for pos, c in enumerate(comments):
+            by_task.setdefault(c.task_id, []).append(pos)
+        self._comments = PVector(comments)
+        self._by_task = PMap({k: PVector(v) for k, v in by_task.items()})
+        self._by_ts = PMap({k: PSortedSet((comments[p].ts, p) for p in v) for k, v in by_task.items()})
+
+    @classmethod
+    def _from_parts(cls, comments: PVector, by_task: PMap, by_ts: PMap) -> "CommentIndex":
+        index = cls.__new__(cls)
+        index._comments = comments
+        index._by_task = by_task
+        index._by_ts = by_ts
+        return index
+
+    # --- протокол последовательности ---
+
+    def __len__(self) -> int:
+        return len(self._comments)
+
+    def __iter__(self) -> Iterator[Comment]:
+        return iter(self._comments)
+
+    def __getitem__(self, idx):
+        return self._comments[idx]
+
+    def __repr__(self) -> str:
+        return f"CommentIndex({len(self._comments)} comments, {len(self._by_task)} tasks)"
+
+    # --- выборки ---
+
+    def for_task(self, task_id: str) -> Tuple[Comment, ...]:
+        """Комментарии задачи в порядке загрузки."""
+        comments = self._comments
+        return tuple(comments[p] for p in self._by_task.get(task_id, _EMPTY_POSITIONS))
+
+    def positions(self, task_id: str) -> PVector:
+        """Позиции комментариев задачи в общей последовательности (по возрастанию)."""
+        return self._by_task.get(task_id, _EMPTY_POSITIONS)
+
+    def count(self, task_id: str) -> int:
+        """Количество комментариев задачи."""
+        return len(self._by_task.get(task_id, _EMPTY_POSITIONS))
+
+    def page(self, task_id: str, offset: int = 0, limit: int = 50) -> Tuple[Comment, ...]:
+        """Страница комментариев задачи, упорядоченных по `ts` (при равенстве — по порядку загрузки)."""
+        if offset < 0 or limit < 0:
+            raise ValueError("offset и limit должны быть неотрицательными")
+        comments = self._comments
+        by_ts = self._by_ts.get(task_id, _EMPTY_BY_TS)
+        return tuple(comments[p] for _, p in by_ts.slice(offset, offset + limit))
+
+    # --- неизменяемые обновления ---
+
+    def add(self, comment: Comment) -> "CommentIndex":
+        """Новый индекс с добавленным комментарием за O(log n)."""
+        pos = len(self._comments)
+        key = comment.task_id
+        by_task = self._by_task.set(key, self._by_task.get(key, _EMPTY_POSITIONS).append(pos))
+        by_ts = self._by_ts.set(key, self._by_ts.get(key, _EMPTY_BY_TS).add((comment.ts, pos)))
+        return CommentIndex._from_parts(self._comments.append(comment), by_task, by_ts)
+
+    def apply_delta(self, delta: "EntityDelta") -> "CommentIndex":
+        """Применить разницу seed.json к индексу.
+
+        Новые комментарии дописываются за O(log n) каждый; изменённые и
+        удалённые требуют перестройки, так как меняют позиции и порядок `ts`.
+        """
+        if delta.changed or delta.removed:
+            replaced = {new.id: new for _, new in delta.changed}
+            gone = {c.id for c in delta.removed}
+            index = CommentIndex(replaced.get(c.id, c) for c in self if c.id not in gone)
+        else:
+            index = self
+        return index.extend(delta.added)
+
+    def extend(self, comments: Iterable[Comment]) -> "CommentIndex":
+        """Новый индекс с несколькими добавленными комментариями."""
+        index = self
+        for c in comments:
+            index = index.add(c)
+        return index
+
+
+def comment_index(comments: Iterable[Comment]) -> CommentIndex:
+    """Индекс для коллекции комментариев; готовый `CommentIndex` возвращается как есть."""
+    if isinstance(comments, CommentIndex):
+        return comments
+    return CommentIndex(comments)
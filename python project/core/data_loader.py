@@ -1,29 +1,521 @@
 # core/data_loader.py
-"""Утилиты для загрузки типизированных тестовых данных из `data/seed.json`."""
+"""Утилиты для загрузки типизированных тестовых данных из `data/seed.json`.
 
+Файл читается потоково: текст подгружается блоками, а элементы массивов
+`projects`, `users`, `tasks` и `comments` разбираются по одному через
+`json.JSONDecoder.raw_decode`. Поэтому в памяти никогда не лежит всё дерево
+JSON целиком — только текущий блок и уже созданные сущности. `iter_seed` и
+`iter_seed_batches` отдают сущности по мере разбора, `load_seed` собирает
+из них привычные кортежи.
+
+Рядом с seed.json может лежать бинарный снимок (`data/seed.snapshot`,
+см. `core.snapshot`), который пишет `build_snapshot`. Если он есть и
+соответствует seed.json, `load_seed` читает сущности из него через `mmap`
+без разбора JSON; если снимка нет, он устарел или повреждён — из JSON.
+
+`SeedWatcher` следит за seed.json (размер/mtime, затем sha256) и при
+изменении сравнивает сущности по `id` с прошлой версией: потребителям
+уходит только разница (`SeedDelta`) — добавленные, изменённые и удалённые
+сущности, которую индексы и кэши применяют без полной перестройки.
+"""
+
+import io
 import json
+import mmap
 import os
-from typing import Tuple
-from .domain import Project, User, Task, Comment
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+from .domain import INTERNED_FIELDS, Project, User, Task, Comment, intern_fields
+from .snapshot import SECTIONS, Snapshot, SnapshotError, open_snapshot, seed_fingerprint, write_snapshot
 
 BASE = os.path.join(os.path.dirname(__file__), "..")
 SEED = os.path.join(BASE, "data", "seed.json")
+SNAPSHOT = os.path.join(BASE, "data", "seed.snapshot")
+
+CHUNK_SIZE = 1 << 20  # символов за одно чтение
+
+_WS = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Stream:
+    """Буфер поверх текстового файла: блок текста и позиция в нём."""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Дочитать следующий блок, отбросив уже разобранный текст."""
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Следующий значимый символ (пробелы пропускаются) или '' в конце файла."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"seed.json: ожидался {ch!r}, найдено {got!r} (позиция {self.pos})")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Разобрать одно JSON-значение, при необходимости дочитывая блоки."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # Число на границе блока могло оборваться — убеждаемся, что значение закончилось
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_array(stream: _Stream) -> Iterator[Any]:
+    """Элементы массива; открывающая `[` уже прочитана."""
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        yield stream.value()
+        ch = stream.peek()
+        stream.pos += 1
+        if ch == "]":
+            return
+        if ch != ",":
+            raise ValueError(f"seed.json: ожидались ',' или ']', найдено {ch!r}")
+
+
+def _next_section(stream: _Stream, first: bool) -> Optional[str]:
+    """Дойти до следующего массива из `SECTIONS` и прочитать его `[`.
+
+    `first` — стоим сразу после `{` объекта верхнего уровня, иначе — после
+    значения. Прочие ключи пропускаются; в конце объекта возвращается None.
+    """
+    while True:
+        if first:
+            first = False
+            if stream.peek() == "}":
+                stream.pos += 1
+                return None
+        else:
+            ch = stream.peek()
+            stream.pos += 1
+            if ch == "}":
+                return None
+            if ch != ",":
+                raise ValueError(f"seed.json: ожидались ',' или '}}', найдено {ch!r}")
+        key = stream.value()
+        stream.expect(":")
+        if key in SECTIONS and stream.peek() == "[":
+            stream.pos += 1
+            return key
+        stream.value()
+
+
+def _check_seed(path: Optional[str]) -> str:
+    path = path or SEED
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"seed.json not found: {path}. Сначала сгенерируй его через scripts/generate_seed.py")
+    return path
+
+
+def iter_seed(path: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """Потоково отдавать пары (секция, сущность) в порядке следования в файле.
 
-def load_seed() -> Tuple[Tuple[Project, ...], Tuple[User, ...], Tuple[Task, ...], Tuple[Comment, ...]]:
+    Секции — ключи `SECTIONS`; прочие ключи верхнего уровня пропускаются.
+    """
+    path = _check_seed(path)
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _Stream(f, chunk_size)
+        stream.expect("{")
+        key = _next_section(stream, first=True)
+        while key is not None:
+            cls = SECTIONS[key]
+            for item in _iter_array(stream):
+                yield key, cls(**intern_fields(cls, item))
+            key = _next_section(stream, first=False)
+
+
+def iter_seed_batches(path: Optional[str] = None, batch_size: int = 10_000, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Tuple[Any, ...]]]:
+    """Потоково отдавать пары (секция, кортеж до `batch_size` сущностей)."""
+    section: Optional[str] = None
+    batch: List[Any] = []
+    for key, entity in iter_seed(path, chunk_size):
+        if key != section or len(batch) >= batch_size:
+            if batch:
+                yield section, tuple(batch)
+            section, batch = key, []
+        batch.append(entity)
+    if batch:
+        yield section, tuple(batch)
+
+
+def _collect(seed_path: str) -> Dict[str, List[Any]]:
+    collected: Dict[str, List[Any]] = {key: [] for key in SECTIONS}
+    for key, entity in iter_seed(seed_path):
+        collected[key].append(entity)
+    return collected
+
+
+def build_snapshot(seed_path: Optional[str] = None, snapshot_path: Optional[str] = None) -> str:
+    """Разобрать seed.json и записать бинарный снимок; вернуть путь к снимку."""
+    seed_path = seed_path or SEED
+    snapshot_path = snapshot_path or SNAPSHOT
+    write_snapshot(_collect(seed_path), snapshot_path, seed_path)
+    return snapshot_path
+
+
+def load_snapshot(seed_path: Optional[str] = None, snapshot_path: Optional[str] = None) -> Optional[Snapshot]:
+    """Открыть снимок, если он есть и соответствует seed.json; иначе None."""
+    seed_path = seed_path or SEED
+    snapshot_path = snapshot_path or SNAPSHOT
+    if not os.path.exists(snapshot_path) or not os.path.exists(seed_path):
+        return None
+    try:
+        snapshot = open_snapshot(snapshot_path)
+    except (OSError, SnapshotError):
+        return None
+    return snapshot if snapshot.is_fresh(seed_path) else None
+
+
+def load_seed(workers: int = 1) -> Tuple[Tuple[Project, ...], Tuple[User, ...], Tuple[Task, ...], Tuple[Comment, ...]]:
     """Загрузить seed.json и вернуть неизменяемые кортежи типизированных сущностей.
 
     Возвращает 4-кортеж: (projects, users, tasks, comments).
     Бросает FileNotFoundError с подсказкой, если seed отсутствует.
+    Если есть актуальный бинарный снимок — сущности читаются из него,
+    иначе файл разбирается потоково (`iter_seed`), без промежуточного дерева JSON.
+    При `workers > 1` JSON разбирается в нескольких процессах (`load_seed_parallel`).
+    """
+    snapshot = load_snapshot()
+    if snapshot is not None:
+        try:
+            return tuple(tuple(snapshot.section(key)) for key in SECTIONS)
+        except (SnapshotError, IndexError):
+            pass  # id строки вне таблицы в данных секции — снимок повреждён, читаем JSON
+    if workers > 1:
+        return load_seed_parallel(SEED, workers)
+
+    collected = _collect(SEED)
+    return tuple(tuple(collected[key]) for key in SECTIONS)
+
+
+# === Параллельная загрузка ===
+
+PARALLEL_MIN_BYTES = 4 << 20  # файлы меньше разбираются в одном процессе
+_ELEMENT = re.compile(rb"[\[,][ \t\r\n]*\{")
+_BY_KEYS = {frozenset(f.name for f in fields(cls) if f.init): key for key, cls in SECTIONS.items()}
+_UNKNOWN = ""  # секция куска, начатого с середины файла, ещё не известна
+
+
+class _ByteStream(_Stream):
+    """`_Stream` над двоичным файлом, знающий байтовое смещение позиции."""
+
+    def __init__(self, raw: BinaryIO, offset: int, chunk_size: int):
+        super().__init__(io.TextIOWrapper(raw, encoding="utf-8", newline=""), chunk_size)
+        self.mark = 0
+        self.mark_offset = offset
+
+    def offset(self) -> int:
+        """Байтовое смещение текущей позиции (текст перекодируется один раз)."""
+        self.mark_offset += len(self.buf[self.mark:self.pos].encode("utf-8"))
+        self.mark = self.pos
+        return self.mark_offset
+
+    def fill(self) -> bool:
+        self.offset()
+        if not super().fill():
+            return False
+        self.mark = 0
+        return True
+
+
+def _field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls))
+
+
+def _to_columns(cls: type, items: List[Any]) -> Tuple[Tuple[Any, ...], ...]:
+    """Сущности -> столбцы всех полей (включая вычисленные, вроде `created_ts`)."""
+    return tuple(zip(*map(attrgetter(*_field_names(cls)), items)))
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _from_columns(cls: type, columns: Tuple[Tuple[Any, ...], ...]) -> List[Any]:
+    """Собрать сущности из столбцов без повторных `__init__`/`__post_init__`.
+
+    Значения полей из `INTERNED_FIELDS` интернируются заново: строки,
+    пришедшие из разных процессов, — разные объекты.
+    """
+    names = _field_names(cls)
+    interned = INTERNED_FIELDS.get(cls, ())
+    columns = tuple(tuple(map(_intern, col)) if name in interned else col for name, col in zip(names, columns))
+    setters = tuple(getattr(cls, name).__set__ for name in names)  # дескрипторы слотов, минуя frozen
+    new = object.__new__
+    out = []
+    for row in zip(*columns):
+        obj = new(cls)
+        for set_value, value in zip(setters, row):
+            set_value(obj, value)
+        out.append(obj)
+    return out
+
+
+_Segment = Tuple[str, str, Tuple[Tuple[Any, ...], ...]]  # (секция или _UNKNOWN, опознанная секция, столбцы)
+_Piece = Tuple[int, int, Optional[str], List[_Segment]]  # (начало, конец или -1, секция в конце, сегменты)
+
+
+def _first_element(raw: BinaryIO, start: int, stop: int) -> int:
+    """Смещение первой `{` после `[` или `,` в [start, stop); stop, если её нет.
+
+    Это лишь предположение: такая последовательность может оказаться внутри
+    строки — поэтому стыки кусков потом сверяются.
     """
-    if not os.path.exists(SEED):
-        raise FileNotFoundError(f"seed.json not found: {SEED}. Сначала сгенерируй его через scripts/generate_seed.py")
+    with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for m in _ELEMENT.finditer(mm, max(0, start - 64), stop):
+            if m.end() - 1 >= start:
+                return m.end() - 1
+    return stop
+
+
+def _parse_piece(path: str, start: int, stop: int, section: Optional[str], chunk_size: int) -> _Piece:
+    """Разобрать элементы секций, начинающиеся в байтах [start, stop).
+
+    `section`: None — начало файла; имя секции — `start` указывает на элемент
+    этой секции; `_UNKNOWN` — начать с первого похожего на элемент места после
+    `start`, определяя секцию по набору ключей. Разбор заканчивается на первом
+    элементе, начинающемся не раньше `stop` (его смещение — конец куска), или
+    в конце объекта верхнего уровня (конец -1).
+    """
+    segments: List[_Segment] = []
+    with open(path, "rb") as raw:
+        if section == _UNKNOWN:
+            start = _first_element(raw, start, stop)
+            if start >= stop:
+                return start, start, _UNKNOWN, segments
+        raw.seek(start)
+        stream = _ByteStream(raw, start, chunk_size)
+        if section is None:
+            stream.expect("{")
+            section = _next_section(stream, first=True)
+        while section is not None:
+            cls = SECTIONS.get(section)
+            kinds = set()
+            items: List[Any] = []
+            end = None
+            if stream.peek() == "]":
+                stream.pos += 1
+            else:
+                while True:
+                    stream.peek()
+                    offset = stream.offset()
+                    if offset >= stop:
+                        end = offset
+                        break
+                    item = stream.value()
+                    if cls is None:
+                        kind = _BY_KEYS.get(frozenset(item)) if isinstance(item, dict) else None
+                        if kind is None:
+                            raise ValueError("seed.json: элемент не похож ни на одну сущность")
+                        kinds.add(kind)
+                        items.append(SECTIONS[kind](**intern_fields(SECTIONS[kind], item)))
+                    else:
+                        items.append(cls(**intern_fields(cls, item)))
+                    ch = stream.peek()
+                    stream.pos += 1
+                    if ch == "]":
+                        break
+                    if ch != ",":
+                        raise ValueError(f"seed.json: ожидались ',' или ']', найдено {ch!r}")
+            if items:
+                if len(kinds) > 1:
+                    raise ValueError("seed.json: в одном массиве сущности разных секций")
+                kind = kinds.pop() if kinds else section
+                segments.append((section, kind, _to_columns(SECTIONS[kind], items)))
+            if end is not None:
+                return start, end, section, segments
+            section = _next_section(stream, first=False)
+    return start, -1, None, segments
+
+
+def _piece_fits(piece: Optional[_Piece], pos: int, section: Optional[str]) -> bool:
+    """Продолжает ли кусок ровно с того места, где остановился предыдущий."""
+    if piece is None or piece[0] != pos:
+        return False
+    segments = piece[3]
+    return not segments or segments[0][0] != _UNKNOWN or segments[0][1] == section
+
+
+def load_seed_parallel(path: Optional[str] = None, workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> Tuple[Tuple[Project, ...], Tuple[User, ...], Tuple[Task, ...], Tuple[Comment, ...]]:
+    """Разобрать seed.json в `workers` процессах; результат — как у `load_seed`.
+
+    Файл делится на равные диапазоны байт. Каждый процесс начинает с
+    первого элемента в своём диапазоне, разбирает JSON, создаёт сущности
+    (в т.ч. разбирает даты `Task`) и возвращает их столбцами — так пересылка
+    между процессами дешевле, чем пачка отдельных объектов. Главный процесс
+    собирает сущности из столбцов без повторной проверки и сверяет стыки:
+    если процесс начал не там, где закончил предыдущий (например, принял
+    текст внутри строки за начало элемента), его диапазон дочитывается
+    последовательно. Маленькие файлы и `workers <= 1` — обычный потоковый разбор.
+    """
+    path = _check_seed(path)
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    if workers <= 1 or size < PARALLEL_MIN_BYTES:
+        collected = _collect(path)
+        return tuple(tuple(collected[key]) for key in SECTIONS)
+
+    bounds = [size * i // workers for i in range(workers)] + [size]
+    collected: Dict[str, List[Any]] = {key: [] for key in SECTIONS}
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(_parse_piece, path, bounds[i], bounds[i + 1], None if i == 0 else _UNKNOWN, chunk_size)
+            for i in range(workers)
+        ]
+        pos, section = 0, None
+        for future, stop in zip(futures, bounds[1:]):
+            if pos < 0 or pos >= stop:  # диапазон уже дочитан предыдущим куском
+                future.cancel()
+                continue
+            try:
+                piece: Optional[_Piece] = future.result()
+            except Exception:
+                piece = None
+            if not _piece_fits(piece, pos, section):
+                piece = _parse_piece(path, pos, stop, section, chunk_size)
+            _, pos, end_section, segments = piece
+            if end_section != _UNKNOWN:  # иначе кусок так и не вышел из массива `section`
+                section = end_section
+            for _, kind, columns in segments:
+                collected[kind].extend(_from_columns(SECTIONS[kind], columns))
+    return tuple(tuple(collected[key]) for key in SECTIONS)
+
+
+# === Инкрементальная перезагрузка seed.json ===
+
+@dataclass(frozen=True)
+class EntityDelta:
+    """Разница одной секции между двумя версиями seed.json (по `id`)."""
+    added: Tuple[Any, ...] = ()
+    changed: Tuple[Tuple[Any, Any], ...] = ()  # пары (старая, новая)
+    removed: Tuple[Any, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+@dataclass(frozen=True)
+class SeedDelta:
+    """Разница всех секций seed.json; ключи — как в `SECTIONS`."""
+    projects: EntityDelta = EntityDelta()
+    users: EntityDelta = EntityDelta()
+    tasks: EntityDelta = EntityDelta()
+    comments: EntityDelta = EntityDelta()
+
+    def __bool__(self) -> bool:
+        return any((self.projects, self.users, self.tasks, self.comments))
+
+
+def diff_entities(old: Dict[str, Any], new: Dict[str, Any]) -> EntityDelta:
+    """Сравнить две версии секции, заданные словарями id -> сущность."""
+    added = tuple(e for k, e in new.items() if k not in old)
+    changed = tuple((old[k], e) for k, e in new.items() if k in old and old[k] != e)
+    removed = tuple(e for k, e in old.items() if k not in new)
+    return EntityDelta(added, changed, removed)
+
+
+def _by_id(seed_path: str) -> Dict[str, Dict[str, Any]]:
+    state: Dict[str, Dict[str, Any]] = {key: {} for key in SECTIONS}
+    for key, entity in iter_seed(seed_path):
+        state[key][entity.id] = entity
+    return state
+
+
+class SeedWatcher:
+    """Следит за seed.json и публикует только изменившиеся сущности.
+
+    `poll()` дёшево проверяет размер и mtime; если они изменились, сверяет
+    sha256 и лишь при другом содержимом разбирает файл потоково и строит
+    `SeedDelta`. Подписчики (`subscribe`) и, если задан, `EventBus`
+    (событие `seed_changed`) получают только разницу.
+
+    Уже загруженные сущности (`seed` — четвёрка кортежей, как у `load_seed`)
+    передаются вместе с `fingerprint`, снятым до их загрузки: тогда файл
+    не разбирается второй раз, а наблюдатель ссылается на те же объекты.
+    Если файл изменился во время загрузки, отпечаток не совпадёт и
+    ближайший `poll()` сверит содержимое. Без `seed` файл разбирается сразу.
+    """
+
+    def __init__(self, path: Optional[str] = None, bus: Any = None, seed: Optional[Tuple[Tuple[Any, ...], ...]] = None,
+                 fingerprint: Optional[Tuple[int, int, bytes]] = None):
+        self.path = path or SEED
+        self.bus = bus
+        self._subs: List[Callable[[SeedDelta], Any]] = []
+        if seed is None:
+            self._fingerprint = seed_fingerprint(self.path)
+            self._state = _by_id(self.path)
+        else:
+            if fingerprint is None:
+                raise ValueError("для загруженных сущностей нужен отпечаток seed.json, снятый до загрузки")
+            self._fingerprint = fingerprint
+            self._state = {key: {e.id: e for e in section} for key, section in zip(SECTIONS, seed)}
 
-    with open(SEED, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    def subscribe(self, handler: Callable[[SeedDelta], Any]) -> None:
+        """Подписать обработчик на разницу между версиями seed.json."""
+        self._subs.append(handler)
 
-    projects = tuple(Project(**p) for p in data.get("projects", []))
-    users = tuple(User(**u) for u in data.get("users", []))
-    tasks = tuple(Task(**t) for t in data.get("tasks", []))
-    comments = tuple(Comment(**c) for c in data.get("comments", []))
+    def current(self, section: str) -> Tuple[Any, ...]:
+        """Текущие сущности секции (в порядке seed.json)."""
+        return tuple(self._state[section].values())
 
-    return projects, users, tasks, comments
+    def poll(self) -> Optional[SeedDelta]:
+        """Проверить seed.json; вернуть разницу или None, если содержимое не менялось."""
+        size, mtime_ns, digest = self._fingerprint
+        new_size, new_mtime, _ = seed_fingerprint(self.path, with_hash=False)
+        if (new_size, new_mtime) == (size, mtime_ns):
+            return None
+        fingerprint = seed_fingerprint(self.path)
+        self._fingerprint = fingerprint
+        if fingerprint[2] == digest:
+            return None
+        state = _by_id(self.path)
+        delta = SeedDelta(**{key: diff_entities(self._state[key], state[key]) for key in SECTIONS})
+        self._state = state
+        if not delta:
+            return None
+        for handler in self._subs:
+            handler(delta)
+        if self.bus is not None:
+            self.bus.publish("seed_changed", delta)
+        return delta
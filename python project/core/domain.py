@@ -1,29 +1,62 @@
 # core/domain.py
-"""Доменные сущности приложения (неизменяемые dataclass)."""
+"""Доменные сущности приложения (неизменяемые dataclass).
 
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+Сущности объявлены со `__slots__` (без `__dict__` у каждого экземпляра).
+Поля с небольшим числом различных значений (статусы, приоритеты, авторы…)
+перечислены в `INTERNED_FIELDS`: загрузчики пропускают их через
+`sys.intern`, и одинаковые значения хранятся одним объектом строки.
+"""
 
-@dataclass(frozen=True)
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+def iso_to_us(iso: str) -> int:
+    """ISO-строка → микросекунды от эпохи (наивное время считается UTC)."""
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _US
+
+def us_to_iso(us: int) -> str:
+    """Микросекунды от эпохи → наивная ISO-строка (UTC)."""
+    return (_EPOCH + timedelta(microseconds=int(us))).isoformat()
+
+def parse_us(iso: Any) -> Optional[int]:
+    """Как `iso_to_us`, но для неразбираемой строки возвращает None."""
+    try:
+        return iso_to_us(iso)
+    except (TypeError, ValueError):
+        return None
+
+@dataclass(frozen=True, slots=True)
 class Project:
     """Проект: идентификатор, название и владелец."""
     id: str
     name: str
     owner: str
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class User:
     """Пользователь с ролью (для отчетов/назначений)."""
     id: str
     name: str
     role: str
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Task:
     """Задача в рамках проекта.
 
     Статус: todo | in_progress | review | done
     Приоритет: low | medium | high | critical
+
+    `created_ts`/`updated_ts` — те же даты в микросекундах от эпохи (UTC),
+    разобранные один раз при создании объекта (None, если строка не дата).
+    В сравнении и repr они не участвуют.
     """
     id: str
     project_id: str
@@ -34,8 +67,14 @@ class Task:
     assignee: Optional[str]
     created: str
     updated: str
+    created_ts: Optional[int] = field(init=False, repr=False, compare=False)
+    updated_ts: Optional[int] = field(init=False, repr=False, compare=False)
 
-@dataclass(frozen=True)
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "created_ts", parse_us(self.created))
+        object.__setattr__(self, "updated_ts", parse_us(self.updated))
+
+@dataclass(frozen=True, slots=True)
 class Comment:
     """Комментарий пользователя к задаче."""
     id: str
@@ -46,8 +85,66 @@ class Comment:
 
 @dataclass(frozen=True)
 class Event:
-    """Событие EventBus с произвольной нагрузкой (payload)."""
+    """Событие EventBus с произвольной нагрузкой (payload).
+
+    `ts` — ISO-время события. `EventBus` создаёт события через `Event.at`
+    с числовым временем `ts_us` (мкс от эпохи, UTC), а строку `ts`
+    форматирует при первом обращении к ней. `ts_us` — отдельный слот, а не
+    поле dataclass: `fields(Event)`, `asdict`, сравнение и repr остаются
+    прежними (id, ts, name, payload); у события из конструктора он None.
+    """
+    __slots__ = ("id", "ts", "name", "payload", "ts_us")
+
     id: str
     ts: str
     name: str
     payload: Dict[str, Any]
+
+    @classmethod
+    def at(cls, id: str, ts_us: int, name: str, payload: Any) -> "Event":
+        """Событие с отложенным форматированием `ts` по времени `ts_us`."""
+        ev = _new_event(cls)
+        _set_id(ev, id)
+        _set_name(ev, name)
+        _set_payload(ev, payload)
+        _set_ts_us(ev, ts_us)
+        return ev
+
+    def __getattr__(self, name: str) -> Any:
+        # Вызывается только для незаполненного слота: `ts` события из `Event.at`
+        # или `ts_us` события из конструктора
+        if name == "ts_us":
+            return None
+        if name == "ts":
+            ts_us = self.ts_us
+            if ts_us is not None:
+                ts = us_to_iso(ts_us)
+                _set_ts(self, ts)
+                return ts
+        raise AttributeError(name)
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return (self.id, self.ts, self.name, self.payload, self.ts_us)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for setter, value in zip(_SETTERS, state):
+            setter(self, value)
+
+_new_event = object.__new__
+_SETTERS = tuple(Event.__dict__[f].__set__ for f in Event.__slots__)
+_set_id, _set_ts, _set_name, _set_payload, _set_ts_us = _SETTERS
+
+INTERNED_FIELDS: Dict[type, Tuple[str, ...]] = {
+    Project: ("owner",),
+    User: ("role",),
+    Task: ("project_id", "status", "priority", "assignee"),
+    Comment: ("author",),
+}
+
+def intern_fields(cls: type, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Заменить строковые значения полей из `INTERNED_FIELDS` на интернированные (на месте)."""
+    for name in INTERNED_FIELDS.get(cls, ()):
+        value = item.get(name)
+        if type(value) is str:
+            item[name] = sys.intern(value)
+    return item
@@ -0,0 +1,226 @@
+# core/eventlog.py
+"""Журнал событий на диске: только дописывание, сегменты, воспроизведение.
+
+`EventLog` хранит события `EventBus` в каталоге сегментов. Каждый сегмент
+— файл JSONL `<смещение первого события>.log` (смещение — порядковый номер
+события в журнале, с нуля). Одна строка — одно событие: `o` (смещение),
+`id`, `ts`, `name` и `p` (нагрузка). Когда сегмент дорастает до
+`segment_bytes`, начинается следующий.
+
+Запись буферизуется, `fsync` выполняется раз в `fsync_every` событий,
+в `sync()` и в `close()`. При открытии журнала недописанная последняя
+строка (обрыв записи) отрезается. `replay(offset)` читает события начиная
+со смещения, не загружая журнал целиком, — по нему после перезапуска
+восстанавливают задачи и производные индексы (см. `EventBus.replay` и
+`core.service.replay_task_events`).
+
+Нагрузка пишется как JSON; сущности `core.domain` и разницы seed.json
+(`EntityDelta`/`SeedDelta`) кодируются объектами с ключом `__type__` и
+восстанавливаются при чтении (списки в их полях — снова кортежи).
+Задачи восстанавливаются только из событий, нагрузка которых — `Task` (или
+словарь со всеми его полями) либо смена статуса `{"id", "status"}`; прочие
+нагрузки `replay_task_events` пропускает, поэтому приложение публикует
+`task_created` с полной задачей.
+
+`replay` читает только строки, заканчивающиеся переводом строки: строка,
+которую в этот момент дописывает другой поток, ещё не считается событием.
+"""
+
+import json
+import os
+import threading
+from dataclasses import fields, is_dataclass
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from .data_loader import EntityDelta, SeedDelta
+from .domain import Comment, Event, Project, Task, User
+
+SEGMENT_SUFFIX = ".log"
+
+_TYPES = {cls.__name__: cls for cls in (Project, User, Task, Comment, EntityDelta, SeedDelta)}
+
+
+def _default(obj: Any) -> Any:
+    name = type(obj).__name__
+    if is_dataclass(obj) and _TYPES.get(name) is type(obj):
+        out = {"__type__": name}
+        for f in fields(obj):
+            if f.init:
+                out[f.name] = getattr(obj, f.name)
+        return out
+    raise TypeError(f"нагрузку типа {name} нельзя записать в журнал событий")
+
+
+def _tuples(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_tuples(v) for v in value)
+    return value
+
+
+def _object_hook(d: dict) -> Any:
+    name = d.pop("__type__", None)
+    if name is None:
+        return d
+    return _TYPES[name](**{k: _tuples(v) for k, v in d.items()})
+
+
+def encode_event(offset: int, ev: Event) -> bytes:
+    """Строка журнала для события (с переводом строки)."""
+    record = {"o": offset, "id": ev.id, "ts": ev.ts, "name": ev.name, "p": ev.payload}
+    return (json.dumps(record, ensure_ascii=False, default=_default) + "\n").encode("utf-8")
+
+
+_OFFSET_PREFIX = b'{"o": '
+
+
+def _line_offset(line: bytes) -> int:
+    """Смещение из начала строки `{"o": N, ...}` без разбора всего JSON."""
+    if not line.startswith(_OFFSET_PREFIX):
+        raise ValueError("строка журнала не начинается со смещения события")
+    start = len(_OFFSET_PREFIX)
+    return int(line[start:line.index(b",", start)])
+
+
+def decode_event(line: bytes) -> Tuple[int, Event]:
+    """(смещение, событие) из строки журнала."""
+    record = json.loads(line, object_hook=_object_hook)
+    return record["o"], Event(id=record["id"], ts=record["ts"], name=record["name"], payload=record["p"])
+
+
+class EventLog:
+    """Журнал событий из сегментов JSONL в каталоге `directory`."""
+
+    def __init__(self, directory: str, segment_bytes: int = 16 << 20, fsync_every: int = 1000):
+        if segment_bytes <= 0 or fsync_every <= 0:
+            raise ValueError("segment_bytes и fsync_every должны быть положительными")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_every = fsync_every
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        os.makedirs(directory, exist_ok=True)
+        segments = self.segments()
+        if segments:
+            first, path = segments[-1]
+            self._next = first + self._recover(path)
+        else:
+            first, self._next = 0, 0
+        self._file: Optional[BinaryIO] = None
+        self._open_segment(first if segments else 0)
+
+    # --- сегменты ---
+
+    def segments(self) -> List[Tuple[int, str]]:
+        """(смещение первого события, путь) всех сегментов по возрастанию."""
+        out = []
+        for name in os.listdir(self.directory):
+            stem, ext = os.path.splitext(name)
+            if ext == SEGMENT_SUFFIX and stem.isdigit():
+                out.append((int(stem), os.path.join(self.directory, name)))
+        return sorted(out)
+
+    def _segment_path(self, first: int) -> str:
+        return os.path.join(self.directory, f"{first:020d}{SEGMENT_SUFFIX}")
+
+    def _open_segment(self, first: int) -> None:
+        self._file = open(self._segment_path(first), "ab")
+
+    @staticmethod
+    def _recover(path: str) -> int:
+        """Отрезать недописанный хвост сегмента; вернуть число целых событий в нём."""
+        count = good = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    _line_offset(line)
+                    decode_event(line)
+                except (ValueError, KeyError, TypeError):
+                    break
+                count += 1
+                good += len(line)
+        if good != os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(good)
+        return count
+
+    # --- запись ---
+
+    def __len__(self) -> int:
+        return self._next
+
+    @property
+    def next_offset(self) -> int:
+        """Смещение, которое получит следующее событие."""
+        return self._next
+
+    def append(self, ev: Event) -> int:
+        """Дописать событие; вернуть его смещение."""
+        return self.append_many((ev,))
+
+    def append_many(self, events: Iterable[Event]) -> int:
+        """Дописать события одной записью; вернуть смещение первого из них."""
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("журнал событий закрыт")
+            first = self._next
+            chunk = [encode_event(pos, ev) for pos, ev in enumerate(events, first)]
+            if self._file.tell() >= self.segment_bytes:
+                self._sync()
+                self._file.close()
+                self._open_segment(first)
+            self._file.write(b"".join(chunk))
+            self._next += len(chunk)
+            self._unsynced += len(chunk)
+            if self._unsynced >= self.fsync_every:
+                self._sync()
+            return first
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def sync(self) -> None:
+        """Сбросить буфер и выполнить fsync текущего сегмента."""
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+
+    def close(self) -> None:
+        """Синхронизировать и закрыть журнал (повторный вызов безопасен)."""
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    # --- чтение ---
+
+    def replay(self, offset: int = 0, names: Optional[Iterable[str]] = None) -> Iterator[Tuple[int, Event]]:
+        """(смещение, событие) начиная с `offset`; `names` — только эти события.
+
+        Видны события, дописанные до вызова (буфер записи сбрасывается).
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+            end = self._next
+        wanted = None if names is None else frozenset(names)
+        segments = self.segments()
+        for i, (first, path) in enumerate(segments):
+            if i + 1 < len(segments) and segments[i + 1][0] <= offset:
+                continue
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        return  # строка ещё дописывается
+                    pos = _line_offset(line)
+                    if pos >= end:
+                        return
+                    if pos < offset:
+                        continue
+                    pos, ev = decode_event(line)
+                    if wanted is None or ev.name in wanted:
+                        yield pos, ev
@@ -1,37 +1,470 @@
 # core/frp.py
-"""Минимальный EventBus в стиле FRP для логирования доменных событий в UI."""
+"""Минимальный EventBus в стиле FRP для логирования доменных событий в UI.
 
-from typing import Callable, Dict, List, Any
-from .domain import Event
+По умолчанию обработчики вызываются синхронно в потоке публикации. В
+асинхронном режиме (`EventBus(mode="async")`) у каждой подписки своя
+ограниченная очередь, а события разбирает пул потоков: медленный
+подписчик не задерживает `publish`. Порядок событий внутри одной подписки
+сохраняется. При заполненной очереди действует политика подписки:
+`block` (ждать места), `drop_oldest` (вытеснить самое старое событие) или
+`drop_newest` (отбросить новое). `flush()` дожидается обработки всех
+событий, `close()` — ещё и останавливает пул. Обработчик не должен
+публиковать с политикой `block` в собственную заполненную очередь —
+он будет ждать сам себя.
+
+Массовые операции публикуют пачкой: `publish_many(name, payloads)` или
+все `publish` внутри `with bus.batch():`. Подписчик с `batch=True`
+получает кортеж событий одним вызовом (обычный — по одному событию).
+Пачка `batch()` доставляется в порядке публикации: подряд идущие события
+одного имени — одной доставкой, события разных имён не переставляются.
+Для событий из `coalesce` (имя -> поле-ключ, например
+`{"task_updated": "id"}`) внутри такой доставки остаётся только последнее
+событие на каждый ключ.
+
+С журналом (`EventBus(log=EventLog(...))`, см. `core.eventlog`) каждое
+опубликованное событие сначала дописывается на диск, а `replay(offset)`
+заново доставляет записанные события текущим подписчикам.
+
+Имена событий — темы из сегментов через точку (`task.updated.status`).
+Подписаться можно на шаблон: `*` заменяет ровно один сегмент, `#` — любое
+их число, в том числе ноль (`task.*`, `task.#`, `#`). Подписки хранятся в
+дереве тем, а список подписчиков для конкретного имени вычисляется один
+раз и кэшируется до следующего `subscribe`/`unsubscribe`, поэтому
+`publish` не сравнивает имя с шаблонами.
+
+Событию, у которого нет ни подписчиков, ни журнала, ID не выдаётся:
+`publish` по-прежнему возвращает `Event`, но с пустым `id` (и
+`publish_many` — такие же события), и больше ничего с ним не делает. ID событий выдаёт стратегия `ids`: `uuid`
+(uuid4, по умолчанию), `counter` (счётчик шины, уникален в пределах
+процесса) или `ulid` (время, случайный префикс шины и счётчик — уникален
+между перезапусками и упорядочен по времени). Время берётся один раз
+числом (`Event.ts_us`), а ISO-строка `Event.ts` форматируется при первом
+обращении.
+
+С `metrics=True` (или после `instrument()`) шина считает доставленные
+события по именам, а по каждой подписке — вызовы, ошибки, суммарную и
+процентильную задержку и последнее исключение (см. `core.metrics`);
+`metrics_snapshot()` отдаёт их для страницы событий. Без метрик вызов
+обработчика идёт прежним путём. Исключение обработчика не прерывает
+доставку: оно пишется в журнал `logging` (логгер `core.frp`) с трассировкой.
+"""
+
+import logging
+import os
+import threading
+import time
 import uuid
-import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import count, groupby
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .domain import Event
+from .metrics import BusMetrics
+
+if TYPE_CHECKING:
+    from .eventlog import EventLog
+
+log = logging.getLogger(__name__)
+
+SYNC, ASYNC = "sync", "async"
+BLOCK, DROP_OLDEST, DROP_NEWEST = "block", "drop_oldest", "drop_newest"
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST)
+
+_DRAIN_BATCH = 64  # доставок за один заход воркера, чтобы подписки делили пул честно
+_ROUTES_MAX = 4096  # имён в кэше маршрутов; при переполнении кэш начинается заново
+ONE, ANY = "*", "#"  # один сегмент темы / любое число сегментов
+IDS_UUID, IDS_COUNTER, IDS_ULID = "uuid", "counter", "ulid"
+ID_STRATEGIES = (IDS_UUID, IDS_COUNTER, IDS_ULID)
+
+Delivery = Union[Event, Tuple[Event, ...]]  # событие или пачка (для подписок с batch=True)
+
+
+def _id_factory(strategy: str) -> Callable[[int], str]:
+    """Генератор ID событий по времени события (мкс) для стратегии `ids`."""
+    if strategy == IDS_UUID:
+        return lambda ts_us: str(uuid.uuid4())
+    if strategy == IDS_COUNTER:
+        counter = count(1)
+        return lambda ts_us: str(next(counter))
+    if strategy == IDS_ULID:
+        counter = count(1)
+        prefix = os.urandom(4).hex()
+        return lambda ts_us: f"{ts_us:014x}{prefix}{next(counter):010x}"
+    raise ValueError(f"неизвестная стратегия ID событий: {strategy!r}")
+
+
+def _payload_key(payload: Any, field: str) -> Any:
+    if isinstance(payload, dict):
+        return payload.get(field)
+    return getattr(payload, field, None)
+
+
+class Subscription:
+    """Подписка обработчика на событие; в асинхронном режиме — со своей очередью."""
+
+    __slots__ = ("name", "handler", "batch", "maxsize", "policy", "queue", "scheduled", "dropped", "order")
+
+    def __init__(self, name: str, handler: Callable[[Any], Any], maxsize: int, policy: str, batch: bool = False):
+        if not all(name.split(".")):
+            raise ValueError(f"пустой сегмент в теме: {name!r}")
+        if policy not in POLICIES:
+            raise ValueError(f"неизвестная политика очереди: {policy!r}")
+        if maxsize <= 0:
+            raise ValueError("размер очереди должен быть положительным")
+        self.name = name
+        self.handler = handler
+        self.batch = batch  # обработчик получает кортеж событий
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue: Deque[Delivery] = deque()
+        self.scheduled = False  # очередь уже разбирает воркер
+        self.dropped = 0
+        self.order = 0  # номер подписки в шине: порядок вызова обработчиков
+
+    def __repr__(self) -> str:
+        return f"Subscription({self.name!r}, {self.policy}, {len(self.queue)}/{self.maxsize})"
+
+
+class _TopicNode:
+    __slots__ = ("children", "subs")
+
+    def __init__(self):
+        self.children: Dict[str, "_TopicNode"] = {}
+        self.subs: List[Subscription] = []
+
+
+class TopicTree:
+    """Дерево шаблонов тем: по сегменту на уровень, `*` и `#` — отдельные ветви."""
+
+    def __init__(self):
+        self._root = _TopicNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, sub: Subscription) -> None:
+        node = self._root
+        for part in sub.name.split("."):
+            node = node.children.setdefault(part, _TopicNode())
+        node.subs.append(sub)
+        self._size += 1
+
+    def remove(self, sub: Subscription) -> bool:
+        path = [self._root]
+        for part in sub.name.split("."):
+            node = path[-1].children.get(part)
+            if node is None:
+                return False
+            path.append(node)
+        if sub not in path[-1].subs:
+            return False
+        path[-1].subs.remove(sub)
+        self._size -= 1
+        # Убрать опустевшие ветви, чтобы поиск не обходил их
+        for parent, part, node in zip(reversed(path[:-1]), reversed(sub.name.split(".")), reversed(path[1:])):
+            if node.subs or node.children:
+                break
+            del parent.children[part]
+        return True
+
+    def match(self, name: str) -> Tuple[Subscription, ...]:
+        """Подписки, чьи шаблоны подходят под имя, в порядке подписки."""
+        found: Dict[int, Subscription] = {}
+        self._match(self._root, name.split("."), 0, found)
+        return tuple(sorted(found.values(), key=lambda sub: sub.order))
+
+    def _match(self, node: _TopicNode, parts: List[str], i: int, found: Dict[int, Subscription]) -> None:
+        rest = node.children.get(ANY)
+        if rest is not None:
+            for j in range(i, len(parts) + 1):
+                self._match(rest, parts, j, found)
+        if i == len(parts):
+            for sub in node.subs:
+                found[id(sub)] = sub
+            return
+        for key in (parts[i], ONE):
+            child = node.children.get(key)
+            if child is not None:
+                self._match(child, parts, i + 1, found)
+
 
 class EventBus:
     """Простой in-memory pub/sub шина событий.
 
-    - `subscribe(name, handler)`: подписать обработчик на событие
+    - `subscribe(name, handler)`: подписать обработчик на событие или шаблон темы
+    - `unsubscribe(sub)`: снять подписку
     - `publish(name, payload)`: опубликовать событие и уведомить подписчиков
+    - `publish_many(name, payloads)` / `with batch()`: опубликовать пачкой
+    - `replay(offset)`: доставить события из журнала (`log`) заново
+    - `instrument()` / `metrics_snapshot()`: включить метрики обработчиков / получить их
+    - `flush()` / `close()`: дождаться обработки (асинхронный режим) / остановить шину
     """
 
-    def __init__(self):
-        self._subs: Dict[str, List[Callable[[Event], Any]]] = {}
+    def __init__(self, mode: str = SYNC, workers: int = 4, queue_size: int = 1024, policy: str = BLOCK,
+                 coalesce: Optional[Dict[str, str]] = None, log: Optional["EventLog"] = None,
+                 ids: str = IDS_UUID, metrics: bool = False):
+        if mode not in (SYNC, ASYNC):
+            raise ValueError(f"неизвестный режим EventBus: {mode!r}")
+        self.mode = mode
+        self.queue_size = queue_size
+        self.policy = policy
+        self.coalesce = dict(coalesce or {})
+        self.log = log
+        self.ids = ids
+        self._new_id = _id_factory(ids)
+        self.metrics: Optional[BusMetrics] = None
+        self.coalesced = 0  # событий, поглощённых более поздними с тем же ключом
+        self._local = threading.local()  # буфер `batch()` текущего потока
+        self._topics = TopicTree()
+        self._routes: Dict[str, Tuple[Subscription, ...]] = {}  # имя -> подписчики (кэш)
+        self._subs_lock = threading.Lock()
+        self._order = 0
+        self._cond = threading.Condition()
+        self._pending = 0  # события в очередях и в обработке
+        self._closed = False
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="eventbus") if mode == ASYNC else None
+        if metrics:
+            self.instrument()
 
-    def subscribe(self, name: str, handler: Callable[[Event], Any]):
-        """Подписка на событие"""
-        self._subs.setdefault(name, []).append(handler)
+    def subscribe(self, name: str, handler: Callable[[Any], Any], queue_size: Optional[int] = None,
+                  policy: Optional[str] = None, batch: bool = False) -> Subscription:
+        """Подписка на событие или шаблон темы (размер очереди и политика — для асинхронного режима).
+
+        При `batch=True` обработчик получает кортеж событий пачки (события
+        одного конкретного имени, даже если подписка — на шаблон).
+        """
+        sub = Subscription(name, handler, queue_size or self.queue_size, policy or self.policy, batch)
+        with self._subs_lock:
+            self._order += 1
+            sub.order = self._order
+            self._topics.add(sub)
+            self._routes = {}
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> bool:
+        """Снять подписку; False — её уже нет. Уже поставленные в очередь события доставляются."""
+        with self._subs_lock:
+            removed = self._topics.remove(sub)
+            if removed:
+                self._routes = {}
+        return removed
+
+    def _route(self, name: str) -> Tuple[Subscription, ...]:
+        """Подписчики конкретного имени: из кэша, при промахе — поиском по дереву тем."""
+        subs = self._routes.get(name)
+        if subs is None:
+            with self._subs_lock:
+                subs = self._topics.match(name)
+                if len(self._routes) >= _ROUTES_MAX:
+                    self._routes = {}
+                self._routes[name] = subs
+        return subs
+
+    def _event(self, name: str, payload: Any, with_id: bool = True) -> Event:
+        if self._closed:
+            raise RuntimeError("EventBus закрыт")
+        ts_us = time.time_ns() // 1000
+        return Event.at(self._new_id(ts_us) if with_id else "", ts_us, name, payload)
 
     def publish(self, name: str, payload: dict) -> Event:
-        """Публикация события"""
-        ev = Event(
-            id=str(uuid.uuid4()),
-            ts=datetime.datetime.utcnow().isoformat(),
-            name=name,
-            payload=payload
-        )
-        handlers = self._subs.get(name, [])
-        for h in handlers:
-            try:
-                h(ev)
-            except Exception as e:
-                print("Handler error:", e)
+        """Публикация события; если его некому получить (ни подписчиков, ни журнала) — событие с пустым `id`."""
+        if self.log is None and not self._route(name):
+            return self._event(name, payload, with_id=False)
+        ev = self._event(name, payload)
+        if self.log is not None:
+            self.log.append(ev)
+        buffer = getattr(self._local, "batch", None)
+        if buffer is not None:
+            buffer.append(ev)
+        else:
+            self._deliver(name, (ev,))
         return ev
+
+    def publish_many(self, name: str, payloads: Iterable[Any]) -> Tuple[Event, ...]:
+        """Опубликовать несколько событий одного типа одной пачкой (без получателей — события с пустым `id`)."""
+        if self.log is None and not self._route(name):
+            return tuple(self._event(name, p, with_id=False) for p in payloads)
+        events = tuple(self._event(name, p) for p in payloads)
+        if self.log is not None:
+            self.log.append_many(events)
+        buffer = getattr(self._local, "batch", None)
+        if buffer is not None:
+            buffer.extend(events)
+        else:
+            self._deliver(name, self._coalesce(name, events))
+        return events
+
+    @contextmanager
+    def batch(self) -> Iterator["EventBus"]:
+        """Копить события, опубликованные в этом потоке, и доставить их пачками на выходе.
+
+        Порядок публикации сохраняется: подряд идущие события одного имени
+        уходят одной доставкой (и схлопываются по `coalesce` только внутри
+        неё), как в `replay`. Вложенные `batch()` входят во внешний.
+        """
+        if getattr(self._local, "batch", None) is not None:
+            yield self
+            return
+        buffer: List[Event] = []
+        self._local.batch = buffer
+        try:
+            yield self
+        finally:
+            self._local.batch = None
+            for name, run in groupby(buffer, key=attrgetter("name")):
+                self._deliver(name, self._coalesce(name, run))
+
+    def replay(self, offset: int = 0, names: Optional[Iterable[str]] = None, batch_size: int = 1000) -> int:
+        """Доставить подписчикам события журнала начиная с `offset` (в журнал они не пишутся).
+
+        Подряд идущие события одного имени доставляются пачками до
+        `batch_size`. Возвращает смещение, с которого продолжать.
+        """
+        if self.log is None:
+            raise RuntimeError("у EventBus нет журнала событий")
+        run: List[Event] = []
+        next_offset = offset
+        for pos, ev in self.log.replay(offset, names):
+            if run and (ev.name != run[0].name or len(run) >= batch_size):
+                self._deliver(run[0].name, tuple(run))
+                run = []
+            run.append(ev)
+            next_offset = pos + 1
+        if run:
+            self._deliver(run[0].name, tuple(run))
+        return max(next_offset, offset)
+
+    def _coalesce(self, name: str, events: Iterable[Event]) -> Tuple[Event, ...]:
+        """Оставить последнее событие на каждый ключ `coalesce[name]` (события без ключа — все)."""
+        events = tuple(events)
+        field = self.coalesce.get(name)
+        if field is None or len(events) < 2:
+            return events
+        keys = [_payload_key(ev.payload, field) for ev in events]
+        last = {k: i for i, k in enumerate(keys) if k is not None}
+        kept = tuple(ev for i, (ev, k) in enumerate(zip(events, keys)) if k is None or last[k] == i)
+        self.coalesced += len(events) - len(kept)
+        return kept
+
+    def _deliver(self, name: str, events: Tuple[Event, ...]) -> None:
+        if not events:
+            return
+        if self._closed:
+            raise RuntimeError("EventBus закрыт")
+        if self.metrics is not None:
+            self.metrics.delivered(name, len(events))
+        for sub in self._route(name):
+            deliveries = (events,) if sub.batch else events
+            for item in deliveries:
+                if self._pool is None:
+                    self._call(sub, item)
+                else:
+                    self._enqueue(sub, item)
+
+    def _call(self, sub: Subscription, item: Delivery) -> None:
+        try:
+            sub.handler(item)
+        except Exception:
+            log.exception("ошибка обработчика %s события %s", sub.handler, sub.name)
+
+    def _call_measured(self, sub: Subscription, item: Delivery) -> None:
+        """`_call` с замером времени и учётом ошибок в `metrics`."""
+        metrics = self.metrics  # instrument(False) из другого потока может сбросить его во время вызова
+        error = None
+        start = time.perf_counter_ns()
+        try:
+            sub.handler(item)
+        except Exception as e:
+            error = e
+            log.exception("ошибка обработчика %s события %s", sub.handler, sub.name)
+        if metrics is not None:
+            metrics.handler(sub).record(time.perf_counter_ns() - start, error)
+
+    # --- метрики ---
+
+    def instrument(self, enabled: bool = True) -> None:
+        """Включить (с нуля) или выключить метрики обработчиков."""
+        if enabled:
+            self.metrics = BusMetrics()
+            self._call = self._call_measured
+        else:
+            self.__dict__.pop("_call", None)
+            self.metrics = None
+
+    def metrics_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Снимок метрик (`BusMetrics.snapshot`) или None, если они выключены."""
+        metrics = self.metrics
+        return metrics.snapshot() if metrics is not None else None
+
+    # --- асинхронный режим ---
+
+    def _enqueue(self, sub: Subscription, item: Delivery) -> None:
+        with self._cond:
+            while True:
+                # Проверяется и после ожидания места: за это время шину могли закрыть
+                if self._closed:
+                    raise RuntimeError("EventBus закрыт")
+                if len(sub.queue) < sub.maxsize:
+                    break
+                if sub.policy == DROP_NEWEST:
+                    sub.dropped += 1
+                    return
+                if sub.policy == DROP_OLDEST:
+                    sub.queue.popleft()
+                    sub.dropped += 1
+                    self._pending -= 1
+                else:
+                    self._cond.wait()
+            sub.queue.append(item)
+            self._pending += 1
+            if not sub.scheduled:
+                sub.scheduled = True
+                self._pool.submit(self._drain, sub)
+
+    def _drain(self, sub: Subscription) -> None:
+        """Разобрать до `_DRAIN_BATCH` доставок подписки и уступить воркер."""
+        for _ in range(_DRAIN_BATCH):
+            with self._cond:
+                if not sub.queue:
+                    sub.scheduled = False
+                    self._cond.notify_all()
+                    return
+                item = sub.queue.popleft()
+                self._cond.notify_all()  # освободилось место в очереди
+            self._call(sub, item)
+            with self._cond:
+                self._pending -= 1
+                if not self._pending:
+                    self._cond.notify_all()
+        with self._cond:
+            if not sub.queue:
+                sub.scheduled = False
+                return
+        self._pool.submit(self._drain, sub)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Дождаться обработки всех опубликованных событий; False — по таймауту."""
+        if self._pool is None:
+            return True
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self) -> None:
+        """Обработать оставшиеся события и остановить шину (повторный вызов безопасен).
+
+        Шина закрывается до ожидания очередей: публикация и выход из
+        `batch()` после этого бросают RuntimeError, а не попадают в пул.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+        self.flush()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        if self.log is not None:
+            self.log.close()
@@ -111,6 +111,11 @@ class Either(Generic[E, T], ABC):
     def map_left(self, f: Callable[[E], E]) -> 'Either[E, T]':
         """Применяет функцию к ошибке, если Either содержит Left"""
         pass
+    
+    @abstractmethod
+    def get_or_else(self, default: T) -> T:
+        """Возвращает значение Right или значение по умолчанию"""
+        pass
 
 class Left(Generic[E, T], Either[E, T]):
     """Контейнер для ошибки"""
@@ -133,6 +138,9 @@ class Left(Generic[E, T], Either[E, T]):
     def map_left(self, f: Callable[[E], E]) -> 'Either[E, T]':
         return Left(f(self._error))
     
+    def get_or_else(self, default: T) -> T:
+        return default
+    
     def __repr__(self) -> str:
         return f"Left({self._error})"
 
@@ -157,6 +165,9 @@ class Right(Generic[E, T], Either[E, T]):
     def map_left(self, f: Callable[[E], E]) -> 'Either[E, T]':
         return Right(self._value)
     
+    def get_or_else(self, default: T) -> T:
+        return self._value
+    
     def __repr__(self) -> str:
         return f"Right({self._value})"
 
@@ -0,0 +1,151 @@
+# core/importer.py
+"""Пакетный импорт задач: потоковая выдача результатов и одна вставка.
+
+`BulkImport` делит входящие задачи на пачки по `chunk_size` и проверяет
+их правилами `RuleSet` — в текущем процессе или, при `workers > 1`, в
+`ProcessPoolExecutor` (в работе одновременно не больше `2 * workers` пачек,
+поэтому вход может быть генератором любой длины). Результаты по каждой
+задаче (`Right(задача)` / `Left(ошибки)`) отдаются генератором в исходном
+порядке, а все принятые задачи добавляются в коллекцию одной структурной
+операцией (`add_tasks`) после последней пачки.
+
+Семантика совпадает с `pipeline_report`: каждая задача «видит» задачи,
+принятые до неё, — правило `unique_id` проверяется в главном процессе по
+ID исходной коллекции и уже принятых задач.
+"""
+
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .domain import Task
+from .ftypes import Either, Left, Right
+from .sqlstore import SqliteTaskStore
+from .store import TaskStore, TaskCollection
+from .transforms import add_tasks
+from .validation import compile_rules, duplicate_error
+
+_Checked = Tuple[Tuple[Task, ...], List[Optional[List[str]]]]  # пачка и ошибки по задачам (None — без ошибок)
+
+
+def check_chunk(rules: Tuple[str, ...], chunk: Tuple[Task, ...]) -> List[Optional[List[str]]]:
+    """Ошибки правил для каждой задачи пачки (None — задача корректна)."""
+    ruleset = compile_rules(rules)
+    return [None if ruleset.is_valid(t) else ruleset.errors(t) for t in chunk]
+
+
+def _chunks(tasks: Iterable[Task], size: int) -> Iterator[Tuple[Task, ...]]:
+    it = iter(tasks)
+    while True:
+        chunk = tuple(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _id_lookup(tasks: TaskCollection) -> Callable[[str], bool]:
+    """Проверка «ID уже есть в коллекции»: по индексу хранилища или по множеству ID."""
+    if isinstance(tasks, (TaskStore, SqliteTaskStore)):
+        return lambda task_id: tasks.get(task_id) is not None
+    return {t.id for t in tasks}.__contains__
+
+
+@dataclass(frozen=True)
+class ImportStats:
+    """Итоги импорта и пропускная способность."""
+    total: int
+    accepted: int
+    rejected: int
+    seconds: float
+
+    @property
+    def per_second(self) -> float:
+        return self.total / self.seconds if self.seconds else 0.0
+
+
+class BulkImport:
+    """Однократный импорт: итерация отдаёт `Either` по каждой задаче.
+
+    После исчерпания итератора доступны `tasks` (коллекция с принятыми
+    задачами) и `stats`; обращение к ним раньше дочитывает импорт до конца.
+    """
+
+    def __init__(self, tasks: TaskCollection, new_tasks: Iterable[Task], rules: Tuple[str, ...] = (),
+                 chunk_size: int = 5_000, workers: int = 1):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size должен быть положительным")
+        self.rules = tuple(rules)
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self._source = tasks
+        self._new_tasks = new_tasks
+        self._tasks: Optional[TaskCollection] = None
+        self._stats: Optional[ImportStats] = None
+        self._run = self._results()
+
+    def __iter__(self) -> Iterator[Either[dict, Task]]:
+        return self._run
+
+    def _finish(self) -> None:
+        for _ in self._run:
+            pass
+
+    @property
+    def tasks(self) -> TaskCollection:
+        if self._tasks is None:
+            self._finish()
+        return self._tasks
+
+    @property
+    def stats(self) -> ImportStats:
+        if self._stats is None:
+            self._finish()
+        return self._stats
+
+    def _checked(self) -> Iterator[_Checked]:
+        chunks = _chunks(self._new_tasks, self.chunk_size)
+        if self.workers <= 1:
+            for chunk in chunks:
+                yield chunk, check_chunk(self.rules, chunk)
+            return
+        with ProcessPoolExecutor(self.workers) as pool:
+            pending: deque = deque()
+            for chunk in chunks:
+                pending.append((chunk, pool.submit(check_chunk, self.rules, chunk)))
+                if len(pending) >= 2 * self.workers:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+
+    def _results(self) -> Iterator[Either[dict, Task]]:
+        start = time.perf_counter()
+        unique = compile_rules(self.rules).unique_id
+        known = _id_lookup(self._source) if unique else None
+        accepted: List[Task] = []
+        accepted_ids = set()
+        total = 0
+        for chunk, errors in self._checked():
+            for task, errs in zip(chunk, errors):
+                total += 1
+                if unique and (task.id in accepted_ids or known(task.id)):
+                    errs = (errs or []) + [duplicate_error(task)]
+                if errs:
+                    yield Left({"errors": errs, "task_id": task.id})
+                    continue
+                accepted.append(task)
+                if unique:
+                    accepted_ids.add(task.id)
+                yield Right(task)
+        self._tasks = add_tasks(self._source, accepted) if accepted else self._source
+        self._stats = ImportStats(total, len(accepted), total - len(accepted), time.perf_counter() - start)
+
+
+def bulk_import(tasks: TaskCollection, new_tasks: Iterable[Task], rules: Tuple[str, ...] = (),
+                chunk_size: int = 5_000, workers: int = 1) -> BulkImport:
+    """Запустить пакетный импорт (см. `BulkImport`)."""
+    return BulkImport(tasks, new_tasks, rules, chunk_size, workers)
@@ -0,0 +1,156 @@
+# core/metrics.py
+"""Метрики обработчиков EventBus: вызовы, задержки и ошибки.
+
+`LatencyHistogram` — гистограмма задержек в наносекундах с логарифмическими
+корзинами: четыре корзины на каждую степень двойки (погрешность квантиля —
+не больше четверти значения), запись — одно вычисление индекса и
+инкремент. `HandlerStats` копит по подписке число вызовов, ошибок, суммарное
+время, гистограмму и последнее исключение; `BusMetrics` — это плюс число
+доставленных событий по именам. `BusMetrics.snapshot()` отдаёт простые
+словари и списки (миллисекунды), которые страница событий показывает таблицей.
+
+Метрики собирает `EventBus` с `metrics=True` или после `bus.instrument()`;
+без них путь вызова обработчика не меняется.
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+PERCENTILES = (50, 95, 99)
+
+_SUB_BITS = 2  # 2**_SUB_BITS корзин на степень двойки
+_SUB = 1 << _SUB_BITS
+_BUCKETS = 256  # хватает на задержки до ~2**62 нс
+
+
+def _bucket(ns: int) -> int:
+    shift = ns.bit_length() - _SUB_BITS - 1
+    if shift <= 0:
+        return ns
+    return shift * _SUB + (ns >> shift)
+
+
+def _bucket_mid(idx: int) -> float:
+    """Середина диапазона значений корзины `idx`."""
+    if idx < 2 * _SUB:
+        return float(idx)
+    shift, mantissa = idx // _SUB - 1, idx % _SUB + _SUB
+    return ((mantissa << shift) + ((mantissa + 1) << shift)) / 2
+
+
+class LatencyHistogram:
+    """Гистограмма задержек (нс) с приближёнными квантилями."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns: int) -> None:
+        self.counts[min(_bucket(ns), _BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q: float) -> float:
+        """Приближённый q-й процентиль (нс); 0 для пустой гистограммы."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(_bucket_mid(idx), float(self.max))
+        return float(self.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class HandlerStats:
+    """Счётчики одной подписки."""
+
+    __slots__ = ("event", "handler", "calls", "errors", "latency", "last_error", "last_error_ts", "_lock")
+
+    def __init__(self, event: str, handler: str):
+        self.event = event
+        self.handler = handler
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+        self.last_error: Optional[BaseException] = None
+        self.last_error_ts: Optional[float] = None
+        self._lock = threading.Lock()  # в синхронном режиме обработчик могут вызвать из разных потоков
+
+    def record(self, ns: int, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self.calls += 1
+            self.latency.record(ns)
+            if error is not None:
+                self.errors += 1
+                self.last_error = error
+                self.last_error_ts = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lat = self.latency
+            row = {
+                "event": self.event,
+                "handler": self.handler,
+                "calls": self.calls,
+                "errors": self.errors,
+                "total_ms": lat.total / 1e6,
+                "mean_ms": lat.mean / 1e6,
+            }
+            for q in PERCENTILES:
+                row[f"p{q}_ms"] = lat.percentile(q) / 1e6
+            row["max_ms"] = lat.max / 1e6
+            row["last_error"] = repr(self.last_error) if self.last_error is not None else None
+            return row
+
+
+def handler_name(handler: Any) -> str:
+    """Читаемое имя обработчика: модуль и qualname функции или тип объекта."""
+    func = getattr(handler, "__func__", handler)
+    name = getattr(func, "__qualname__", None) or type(handler).__qualname__
+    module = getattr(func, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+
+class BusMetrics:
+    """Метрики шины: доставленные события по именам и `HandlerStats` по подпискам."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.events: Dict[str, int] = {}
+        self._handlers: Dict[int, Tuple[Any, HandlerStats]] = {}
+
+    def delivered(self, name: str, n: int) -> None:
+        with self._lock:
+            self.events[name] = self.events.get(name, 0) + n
+
+    def handler(self, sub: Any) -> HandlerStats:
+        """Счётчики подписки `sub` (создаются при первом вызове)."""
+        entry = self._handlers.get(id(sub))
+        if entry is None or entry[0] is not sub:
+            with self._lock:
+                entry = self._handlers.get(id(sub))
+                if entry is None or entry[0] is not sub:
+                    entry = self._handlers[id(sub)] = (sub, HandlerStats(sub.name, handler_name(sub.handler)))
+        return entry[1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """`{"events": {имя: доставлено}, "handlers": [строка на подписку]}`; время — в мс."""
+        with self._lock:
+            events = dict(self.events)
+            stats = [s for _, s in self._handlers.values()]
+        handlers: List[Dict[str, Any]] = [s.snapshot() for s in stats]
+        handlers.sort(key=lambda row: row["total_ms"], reverse=True)
+        return {"events": events, "handlers": handlers}
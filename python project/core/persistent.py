@@ -0,0 +1,539 @@
+# core/persistent.py
+"""Персистентные (со структурным разделением) коллекции.
+
+`PVector` — неизменяемый вектор на 32-арном дереве с хвостом: добавление в
+конец и замена элемента стоят O(log32 n) и копируют только путь от корня до
+листа, а старая версия остаётся валидной и делит с новой все остальные узлы.
+
+`PMap` — неизменяемое отображение на HAMT (hash array mapped trie) с теми же
+свойствами для вставки, удаления и поиска по ключу.
+
+`PSortedSet` — упорядоченное множество из отсортированных блоков поверх
+`PVector`: вставка и удаление за O(log n), обход в порядке возрастания.
+"""
+
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+# === PVector ===
+
+def _new_path(shift: int, leaf: tuple) -> tuple:
+    """Цепочка узлов высотой `shift`, ведущая к листу `leaf`."""
+    node = leaf
+    while shift > 0:
+        node = (node,)
+        shift -= _BITS
+    return node
+
+
+def _push_leaf(node: tuple, shift: int, i: int, leaf: tuple) -> tuple:
+    """Вставить полный лист, начинающийся с индекса `i`, копируя только путь."""
+    sub = (i >> shift) & _MASK
+    if shift == _BITS:
+        return node + (leaf,)
+    if sub < len(node):
+        child = _push_leaf(node[sub], shift - _BITS, i, leaf)
+        return node[:sub] + (child,) + node[sub + 1:]
+    return node + (_new_path(shift - _BITS, leaf),)
+
+
+def _assoc(node: tuple, shift: int, i: int, value: Any) -> tuple:
+    """Заменить элемент с индексом `i`, копируя только путь до листа."""
+    sub = (i >> shift) & _MASK
+    if shift == 0:
+        return node[:sub] + (value,) + node[sub + 1:]
+    child = _assoc(node[sub], shift - _BITS, i, value)
+    return node[:sub] + (child,) + node[sub + 1:]
+
+
+def _iter_leaves(node: tuple, shift: int) -> Iterator[tuple]:
+    if shift == _BITS:
+        yield from node
+        return
+    for child in node:
+        yield from _iter_leaves(child, shift - _BITS)
+
+
+class PVector(Sequence):
+    """Персистентный вектор: O(log n) `append`/`set`, O(1) доступ к хвосту.
+
+    Поддерживает протокол последовательности (`len`, индексация, итерация,
+    `in`), поэтому может использоваться там же, где кортеж задач.
+    """
+
+    __slots__ = ("_count", "_shift", "_root", "_tail", "__weakref__")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        items = items if isinstance(items, (list, tuple)) else list(items)
+        n = len(items)
+        tree_size = ((n - 1) // _WIDTH) * _WIDTH if n else 0
+        nodes = [tuple(items[j:j + _WIDTH]) for j in range(0, tree_size, _WIDTH)]
+        shift = _BITS
+        while len(nodes) > _WIDTH:
+            nodes = [tuple(nodes[j:j + _WIDTH]) for j in range(0, len(nodes), _WIDTH)]
+            shift += _BITS
+        self._count = n
+        self._shift = shift
+        self._root = tuple(nodes)
+        self._tail = tuple(items[tree_size:])
+
+    @classmethod
+    def _make(cls, count: int, shift: int, root: tuple, tail: tuple) -> "PVector":
+        vec = cls.__new__(cls)
+        vec._count = count
+        vec._shift = shift
+        vec._root = root
+        vec._tail = tail
+        return vec
+
+    def _tail_offset(self) -> int:
+        return self._count - len(self._tail)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return tuple(self[i] for i in range(*idx.indices(self._count)))
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("PVector index out of range")
+        tail_off = self._count - len(self._tail)
+        if idx >= tail_off:
+            return self._tail[idx - tail_off]
+        node = self._root
+        shift = self._shift
+        while shift > 0:
+            node = node[(idx >> shift) & _MASK]
+            shift -= _BITS
+        return node[idx & _MASK]
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._root:
+            for leaf in _iter_leaves(self._root, self._shift):
+                yield from leaf
+        yield from self._tail
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PVector, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return f"PVector({list(self)!r})"
+
+    def append(self, value: Any) -> "PVector":
+        """Новый вектор с `value` в конце; исходный не меняется."""
+        if len(self._tail) < _WIDTH:
+            return PVector._make(self._count + 1, self._shift, self._root, self._tail + (value,))
+        root, shift = self._push_tail()
+        return PVector._make(self._count + 1, shift, root, (value,))
+
+    def _push_tail(self) -> Tuple[tuple, int]:
+        """Перенести полный хвост в дерево, при необходимости нарастив корень."""
+        tree_size = self._tail_offset()
+        shift = self._shift
+        if tree_size == 1 << (shift + _BITS):
+            return (self._root, _new_path(shift, self._tail)), shift + _BITS
+        return _push_leaf(self._root, shift, tree_size, self._tail), shift
+
+    def extend(self, values: Iterable[Any]) -> "PVector":
+        """Новый вектор с добавленными в конец значениями.
+
+        Значения укладываются целыми листами, так что стоимость —
+        O(m + m/32 * log n), а не m отдельных `append`.
+        """
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        vec = self
+        start = 0
+        while start < len(values):
+            room = _WIDTH - len(vec._tail)
+            if room == 0:
+                root, shift = vec._push_tail()
+                vec = PVector._make(vec._count, shift, root, ())
+                room = _WIDTH
+            chunk = tuple(values[start:start + room])
+            vec = PVector._make(vec._count + len(chunk), vec._shift, vec._root, vec._tail + chunk)
+            start += len(chunk)
+        return vec
+
+    def set(self, idx: int, value: Any) -> "PVector":
+        """Новый вектор, где элемент `idx` заменён на `value`."""
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("PVector index out of range")
+        tail_off = self._tail_offset()
+        if idx >= tail_off:
+            j = idx - tail_off
+            tail = self._tail[:j] + (value,) + self._tail[j + 1:]
+            return PVector._make(self._count, self._shift, self._root, tail)
+        root = _assoc(self._root, self._shift, idx, value)
+        return PVector._make(self._count, self._shift, root, self._tail)
+
+
+# === PMap (HAMT) ===
+
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & _HASH_MASK
+
+
+class _BitmapNode:
+    """Узел HAMT: битовая маска занятых слотов и плотный кортеж записей.
+
+    Запись — либо пара `(key, value)`, либо дочерний узел.
+    """
+
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class _CollisionNode:
+    """Узел для ключей с полностью совпадающим хешем."""
+
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, h: int, entries: tuple):
+        self.hash = h
+        self.entries = entries
+
+
+_EMPTY_NODE = _BitmapNode(0, ())
+
+
+def _merge_pairs(shift: int, h1: int, p1: tuple, h2: int, p2: tuple):
+    """Узел, содержащий две пары с разными ключами."""
+    if h1 == h2:
+        return _CollisionNode(h1, (p1, p2))
+    i1 = (h1 >> shift) & _MASK
+    i2 = (h2 >> shift) & _MASK
+    if i1 == i2:
+        return _BitmapNode(1 << i1, (_merge_pairs(shift + _BITS, h1, p1, h2, p2),))
+    entries = (p1, p2) if i1 < i2 else (p2, p1)
+    return _BitmapNode((1 << i1) | (1 << i2), entries)
+
+
+def _node_get(node, h: int, key: Any):
+    shift = 0
+    while True:
+        if type(node) is _CollisionNode:
+            for k, v in node.entries:
+                if k is key or k == key:
+                    return v
+            return _MISSING
+        bit = 1 << ((h >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return _MISSING
+        entry = node.entries[(node.bitmap & (bit - 1)).bit_count()]
+        if type(entry) is tuple:
+            k, v = entry
+            return v if (k is key or k == key) else _MISSING
+        node = entry
+        shift += _BITS
+
+
+def _node_assoc(node, shift: int, h: int, key: Any, value: Any):
+    """Вернуть `(новый_узел, добавлен_ли_новый_ключ)`."""
+    if type(node) is _CollisionNode:
+        if node.hash == h:
+            for j, (k, _) in enumerate(node.entries):
+                if k is key or k == key:
+                    entries = node.entries[:j] + ((key, value),) + node.entries[j + 1:]
+                    return _CollisionNode(h, entries), False
+            return _CollisionNode(h, node.entries + ((key, value),)), True
+        wrapper = _BitmapNode(1 << ((node.hash >> shift) & _MASK), (node,))
+        return _node_assoc(wrapper, shift, h, key, value)
+
+    bit = 1 << ((h >> shift) & _MASK)
+    idx = (node.bitmap & (bit - 1)).bit_count()
+    entries = node.entries
+    if not node.bitmap & bit:
+        return _BitmapNode(node.bitmap | bit, entries[:idx] + ((key, value),) + entries[idx:]), True
+
+    entry = entries[idx]
+    if type(entry) is tuple:
+        k, v = entry
+        if k is key or k == key:
+            if v is value:
+                return node, False
+            new_entry = (key, value)
+            added = False
+        else:
+            new_entry = _merge_pairs(shift + _BITS, _hash(k), entry, h, (key, value))
+            added = True
+    else:
+        new_entry, added = _node_assoc(entry, shift + _BITS, h, key, value)
+    return _BitmapNode(node.bitmap, entries[:idx] + (new_entry,) + entries[idx + 1:]), added
+
+
+def _node_without(node, shift: int, h: int, key: Any):
+    """Удалить ключ: вернуть тот же узел (ключа нет), новый узел, пару или None."""
+    if type(node) is _CollisionNode:
+        for j, (k, _) in enumerate(node.entries):
+            if k is key or k == key:
+                entries = node.entries[:j] + node.entries[j + 1:]
+                return entries[0] if len(entries) == 1 else _CollisionNode(h, entries)
+        return node
+
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node
+    idx = (node.bitmap & (bit - 1)).bit_count()
+    entry = node.entries[idx]
+    if type(entry) is tuple:
+        if not (entry[0] is key or entry[0] == key):
+            return node
+        replacement = None
+    else:
+        replacement = _node_without(entry, shift + _BITS, h, key)
+        if replacement is entry:
+            return node
+
+    if replacement is None:
+        bitmap = node.bitmap & ~bit
+        entries = node.entries[:idx] + node.entries[idx + 1:]
+    else:
+        bitmap = node.bitmap
+        entries = node.entries[:idx] + (replacement,) + node.entries[idx + 1:]
+    if not entries:
+        return None
+    if shift > 0 and len(entries) == 1 and type(entries[0]) is tuple:
+        return entries[0]
+    return _BitmapNode(bitmap, entries)
+
+
+def _build_node(entries: list, shift: int):
+    """Построить узел из пар `(hash, (key, value))` снизу вверх, без копирования путей."""
+    groups: dict = {}
+    for entry in entries:
+        groups.setdefault((entry[0] >> shift) & _MASK, []).append(entry)
+    bitmap = 0
+    children = []
+    for idx in sorted(groups):
+        group = groups[idx]
+        bitmap |= 1 << idx
+        if len(group) == 1:
+            children.append(group[0][1])
+        elif all(h == group[0][0] for h, _ in group):
+            children.append(_CollisionNode(group[0][0], tuple(p for _, p in group)))
+        else:
+            children.append(_build_node(group, shift + _BITS))
+    return _BitmapNode(bitmap, tuple(children))
+
+
+def _node_items(node) -> Iterator[tuple]:
+    for entry in node.entries:
+        if type(entry) is tuple:
+            yield entry
+        else:
+            yield from _node_items(entry)
+
+
+class PMap(Mapping):
+    """Персистентное отображение на HAMT: O(log n) `set`/`delete`/поиск."""
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, items: Any = ()):
+        pairs = dict(items)
+        entries = [(_hash(k), (k, v)) for k, v in pairs.items()]
+        self._root = _build_node(entries, 0) if entries else _EMPTY_NODE
+        self._size = len(pairs)
+
+    @classmethod
+    def _make(cls, root, size: int) -> "PMap":
+        m = cls.__new__(cls)
+        m._root = root
+        m._size = size
+        return m
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key: Any) -> Any:
+        value = _node_get(self._root, _hash(key), key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: Any, default: Optional[Any] = None) -> Any:
+        value = _node_get(self._root, _hash(key), key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key: Any) -> bool:
+        return _node_get(self._root, _hash(key), key) is not _MISSING
+
+    def __iter__(self) -> Iterator[Any]:
+        for k, _ in _node_items(self._root):
+            yield k
+
+    def items(self):
+        return _node_items(self._root)
+
+    def __repr__(self) -> str:
+        return f"PMap({dict(self.items())!r})"
+
+    def set(self, key: Any, value: Any) -> "PMap":
+        """Новое отображение с `key -> value`; исходное не меняется."""
+        root, added = _node_assoc(self._root, 0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return PMap._make(root, self._size + added)
+
+    def delete(self, key: Any) -> "PMap":
+        """Новое отображение без `key` (или то же, если ключа нет)."""
+        root = _node_without(self._root, 0, _hash(key), key)
+        if root is self._root:
+            return self
+        return PMap._make(root if root is not None else _EMPTY_NODE, self._size - 1)
+
+
+# === PSortedSet ===
+
+_CHUNK = 64
+
+
+class PSortedSet:
+    """Персистентное упорядоченное множество (например, позиций задач).
+
+    Элементы лежат в отсортированных блоках до `2 * _CHUNK` штук; рядом
+    хранится вектор максимумов блоков для бинарного поиска. Вставка и
+    удаление меняют один блок (O(log n)); перестройка списка блоков нужна
+    только при расщеплении или опустошении блока.
+    """
+
+    __slots__ = ("_chunks", "_maxes", "_size")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        items = sorted(set(items))
+        chunks = [tuple(items[j:j + _CHUNK]) for j in range(0, len(items), _CHUNK)]
+        self._chunks = PVector(chunks)
+        self._maxes = PVector([c[-1] for c in chunks])
+        self._size = len(items)
+
+    @classmethod
+    def _make(cls, chunks: PVector, maxes: PVector, size: int) -> "PSortedSet":
+        s = cls.__new__(cls)
+        s._chunks = chunks
+        s._maxes = maxes
+        s._size = size
+        return s
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __contains__(self, value: Any) -> bool:
+        i = bisect_left(self._maxes, value)
+        if i == len(self._maxes):
+            return False
+        chunk = self._chunks[i]
+        j = bisect_left(chunk, value)
+        return chunk[j] == value
+
+    def __repr__(self) -> str:
+        return f"PSortedSet({list(self)!r})"
+
+    def slice(self, start: int, stop: int) -> Tuple[Any, ...]:
+        """Элементы с рангами `start..stop-1` (по возрастанию), не обходя лишние блоки целиком."""
+        start, stop = max(start, 0), min(stop, self._size)
+        out: list = []
+        offset = 0
+        for chunk in self._chunks:
+            if offset >= stop:
+                break
+            end = offset + len(chunk)
+            if end > start:
+                out.extend(chunk[max(start - offset, 0):stop - offset])
+            offset = end
+        return tuple(out)
+
+    def add(self, value: Any) -> "PSortedSet":
+        """Новое множество с `value` (или то же, если значение уже есть)."""
+        chunks, maxes = self._chunks, self._maxes
+        if not chunks:
+            return PSortedSet._make(PVector([(value,)]), PVector([value]), 1)
+        i = bisect_left(maxes, value)
+        if i == len(maxes):
+            last = chunks[-1]
+            if len(last) < _CHUNK:
+                return PSortedSet._make(chunks.set(-1, last + (value,)), maxes.set(-1, value), self._size + 1)
+            return PSortedSet._make(chunks.append((value,)), maxes.append(value), self._size + 1)
+        chunk = chunks[i]
+        j = bisect_left(chunk, value)
+        if chunk[j] == value:
+            return self
+        new_chunk = chunk[:j] + (value,) + chunk[j:]
+        if len(new_chunk) <= 2 * _CHUNK:
+            return PSortedSet._make(chunks.set(i, new_chunk), maxes, self._size + 1)
+        half = len(new_chunk) // 2
+        parts = [new_chunk[:half], new_chunk[half:]]
+        return self._splice(i, parts, self._size + 1)
+
+    def extend(self, values: Iterable[Any]) -> "PSortedSet":
+        """Новое множество с несколькими значениями.
+
+        Если все значения больше текущего максимума (например, позиции
+        только что дописанных задач), блоки достраиваются в конце за один
+        проход; иначе значения вставляются по одному.
+        """
+        values = sorted(set(values))
+        if not values:
+            return self
+        maxes = self._maxes
+        if maxes and values[0] <= maxes[-1]:
+            result = self
+            for v in values:
+                result = result.add(v)
+            return result
+        chunks, size = self._chunks, self._size + len(values)
+        if chunks and len(chunks[-1]) < _CHUNK:
+            room = _CHUNK - len(chunks[-1])
+            head, values = values[:room], values[room:]
+            chunks = chunks.set(-1, chunks[-1] + tuple(head))
+            maxes = maxes.set(-1, head[-1])
+        new = [tuple(values[j:j + _CHUNK]) for j in range(0, len(values), _CHUNK)]
+        return PSortedSet._make(chunks.extend(new), maxes.extend(c[-1] for c in new), size)
+
+    def discard(self, value: Any) -> "PSortedSet":
+        """Новое множество без `value` (или то же, если значения нет)."""
+        chunks, maxes = self._chunks, self._maxes
+        i = bisect_left(maxes, value)
+        if i == len(maxes):
+            return self
+        chunk = chunks[i]
+        j = bisect_left(chunk, value)
+        if chunk[j] != value:
+            return self
+        new_chunk = chunk[:j] + chunk[j + 1:]
+        if not new_chunk:
+            return self._splice(i, [], self._size - 1)
+        if j == len(chunk) - 1:
+            maxes = maxes.set(i, new_chunk[-1])
+        return PSortedSet._make(chunks.set(i, new_chunk), maxes, self._size - 1)
+
+    def _splice(self, i: int, parts: list, size: int) -> "PSortedSet":
+        """Заменить блок `i` списком блоков `parts` (O(числа блоков))."""
+        chunks = list(self._chunks)
+        chunks[i:i + 1] = parts
+        return PSortedSet._make(PVector(chunks), PVector([c[-1] for c in chunks]), size)
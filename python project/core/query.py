@@ -0,0 +1,157 @@
+# core/query.py
+"""Планировщик фильтров для `filtered_tasks_report`.
+
+Фильтры задаются словарём: ключи `priority`, `assignee`, `status`,
+`project_id` (одно значение или список/кортеж/множество допустимых значений)
+и `date_range` (`{"start": ISO, "end": ISO}`, включительно).
+
+Планировщик оценивает размер выборки по каждому доступному индексу
+(индексы `TaskStore`, индекс по дате создания) и по полному проходу,
+начинает с самого узкого, а остальные условия проверяет одним слитым
+предикатом за один проход — без промежуточных кортежей. Индекс по дате
+создания (O(n log n)) строится только тогда, когда оценка окна дат по
+выборке задач обещает выборку уже любой другой и заметно меньше
+коллекции. Для `TaskTable` все условия сводятся в одну векторную маску,
+для `SqliteTaskStore` — в одно SQL-условие.
+Неизвестные ключи фильтров игнорируются.
+"""
+
+from dataclasses import dataclass
+from heapq import merge
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .domain import Task, iso_to_us
+from .store import TaskStore, TaskCollection
+from .table import TaskTable
+from .sqlstore import SqliteTaskStore
+from .transforms import CREATED_INDEXES, created_index
+
+EQ_FIELDS = ("priority", "assignee", "status", "project_id")
+
+_SAMPLE = 64  # задач в выборке для оценки окна дат без индекса
+_INDEX_SHARE = 0.5  # строить индекс дат, только если окно меньше этой доли задач
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """План запроса: откуда берётся стартовая выборка и что проверяется потом."""
+    source: str  # scan / index:<поле> / created_index / table
+    estimate: int  # ожидаемый размер стартовой выборки
+    residual: Tuple[str, ...]  # фильтры, проверяемые слитым предикатом
+
+
+def _values(value: Any) -> Tuple[Any, ...]:
+    """Одно значение фильтра или несколько — всегда кортеж."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value)
+    return (value,)
+
+
+def normalize_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Привести фильтры к виду поле -> кортеж значений, `date_range` -> (start_us, end_us)."""
+    conds: Dict[str, Any] = {}
+    for field in EQ_FIELDS:
+        if field in filters:
+            conds[field] = _values(filters[field])
+    if "date_range" in filters:
+        rng = filters["date_range"]
+        conds["date_range"] = (iso_to_us(rng["start"]), iso_to_us(rng["end"]))
+    return conds
+
+
+def _check(field: str, arg: Any) -> Callable[[Task], bool]:
+    if field == "date_range":
+        start, end = arg
+        return lambda t: t.created_ts is not None and start <= t.created_ts <= end
+    get = attrgetter(field)
+    if len(arg) == 1:
+        value = arg[0]
+        return lambda t: get(t) == value
+    allowed = frozenset(arg)
+    return lambda t: get(t) in allowed
+
+
+def fused_predicate(conds: Dict[str, Any]) -> Callable[[Task], bool]:
+    """Один предикат, проверяющий все условия подряд (до первого несовпадения)."""
+    checks = tuple(_check(f, arg) for f, arg in conds.items())
+    if len(checks) == 1:
+        return checks[0]
+
+    def predicate(task: Task) -> bool:
+        for check in checks:
+            if not check(task):
+                return False
+        return True
+    return predicate
+
+
+def _sample_share(tasks: TaskCollection, start: int, end: int) -> float:
+    """Доля задач в окне дат по равномерной выборке из `_SAMPLE` задач."""
+    step = max(1, len(tasks) // _SAMPLE)
+    sample = [tasks[i] for i in range(0, len(tasks), step)]
+    return sum(1 for t in sample if t.created_ts is not None and start <= t.created_ts <= end) / len(sample)
+
+
+def _candidates(tasks: TaskCollection, conds: Dict[str, Any]) -> List[Tuple[int, str, Optional[Callable[[], Iterable[int]]]]]:
+    """Возможные стартовые выборки: (оценка размера, источник, позиции по возрастанию или None для прохода)."""
+    options: List[Tuple[int, str, Optional[Callable[[], Iterable[int]]]]] = [(len(tasks), "scan", None)]
+    if isinstance(tasks, TaskStore):
+        for field in EQ_FIELDS:
+            if field in conds:
+                values = conds[field]
+                estimate = sum(tasks.count(field, v) for v in values)
+                options.append((estimate, f"index:{field}", lambda vs=values, f=field: merge(*(tasks.positions(f, v) for v in vs))))
+    if "date_range" in conds and len(tasks):
+        start, end = conds["date_range"]
+        index = CREATED_INDEXES.peek(tasks)
+        if index is None:
+            guess = _sample_share(tasks, start, end) * len(tasks)
+            if guess >= min(o[0] for o in options) or guess >= _INDEX_SHARE * len(tasks):
+                return options
+            index = created_index(tasks)
+        options.append((index.count_between(start, end), "created_index", lambda: index.positions_between(start, end)))
+    return options
+
+
+def _plan(tasks: TaskCollection, conds: Dict[str, Any]) -> Tuple[QueryPlan, Optional[Callable[[], Iterable[int]]]]:
+    if isinstance(tasks, TaskTable):
+        return QueryPlan("table", len(tasks), tuple(conds)), None
+    if isinstance(tasks, SqliteTaskStore):
+        return QueryPlan("sql", len(tasks), tuple(conds)), None
+    estimate, source, positions = min(_candidates(tasks, conds), key=lambda o: o[0])
+    if positions is None:
+        return QueryPlan("scan", estimate, tuple(conds)), None
+    used = "date_range" if source == "created_index" else source.split(":", 1)[1]
+    return QueryPlan(source, estimate, tuple(f for f in conds if f != used)), positions
+
+
+def plan_query(tasks: TaskCollection, filters: Dict[str, Any]) -> QueryPlan:
+    """Выбрать стартовую выборку с наименьшей оценкой размера."""
+    return _plan(tasks, normalize_filters(filters))[0]
+
+
+def run_query(tasks: TaskCollection, filters: Dict[str, Any]) -> Tuple[Task, ...]:
+    """Отфильтровать задачи по плану; результат — в исходном порядке задач."""
+    conds = normalize_filters(filters)
+    if isinstance(tasks, TaskTable):
+        return _run_table(tasks, conds)
+    if isinstance(tasks, SqliteTaskStore):
+        return tasks.query(conds)
+    plan, positions = _plan(tasks, conds)
+    candidates: Iterable[Task] = tasks if positions is None else (tasks[p] for p in positions())
+    if not plan.residual:
+        return tuple(candidates)
+    return tuple(filter(fused_predicate({f: conds[f] for f in plan.residual}), candidates))
+
+
+def _run_table(table: TaskTable, conds: Dict[str, Any]) -> Tuple[Task, ...]:
+    """Все условия — одной векторной маской по столбцам таблицы."""
+    mask = None
+    for field, arg in conds.items():
+        if field == "date_range":
+            m = table.mask_created_between_us(*arg)
+        else:
+            m = table.mask_in(field, arg)
+        mask = m if mask is None else mask & m
+    return tuple(table) if mask is None else table.select(mask)
@@ -1,14 +1,136 @@
-from typing import Tuple, Dict, List, Any
+from collections import Counter
+from operator import attrgetter
+from typing import Tuple, Dict, Iterable, List, Any, Optional
 from .domain import Task, Project, User, Comment
-from .transforms import (
-    avg_tasks_per_user, 
-    filter_by_status, 
-    overdue_tasks,
-    by_priority,
-    by_assignee,
-    by_date_range
-)
+from .persistent import PVector
+from .store import TaskStore, TaskCollection
+from .table import TaskTable
+from .sqlstore import SqliteTaskStore
+from .transforms import overdue_tasks
+from .query import run_query
 from .ftypes import Maybe, Some, Nothing, Either, Right, Left
+from .cache import SLA_CACHE, SnapshotCache
+from .validation import BatchValidation, compile_rules, validate_batch
+from .importer import BulkImport, bulk_import
+from .views import TaskViews
+
+STATUSES = ("todo", "in_progress", "review", "done")
+GROUP_FIELDS = ("project_id", "assignee", "status", "priority")
+GROUP_COUNTS = SnapshotCache()  # снимок -> {by: group_counts(снимок, by)}
+
+# === Движок группировок: один проход по коллекции ===
+
+def group_counts(tasks: TaskCollection, by: Tuple[str, ...], where: Optional[Dict[str, Any]] = None) -> Dict[tuple, int]:
+    """
+    Подсчет задач по комбинациям значений полей `by` за один проход.
+
+    `by` — любая комбинация из `GROUP_FIELDS`; ключи результата — кортежи
+    значений в том же порядке. `where` — необязательные условия равенства
+    (например, `{"project_id": "p1"}`), применяемые в том же проходе.
+    `TaskTable` считает векторно, `TaskStore` сужает выборку по индексу,
+    а для `SqliteTaskStore` подсчёт выполняет один `GROUP BY` в базе.
+    Без `where` результат по кортежу, `PVector` и `TaskStore` запоминается
+    (`GROUP_COUNTS`), а `apply_seed_delta` переносит его на новый снимок.
+    """
+    where = where or {}
+    if isinstance(tasks, SqliteTaskStore):
+        return tasks.group_counts(by, {f: (v,) for f, v in where.items()})
+    if isinstance(tasks, TaskTable):
+        mask = None
+        for field, value in where.items():
+            m = tasks.mask_eq(field, value)
+            mask = m if mask is None else mask & m
+        return tasks.group_counts(by, mask)
+    if not where and isinstance(tasks, (tuple, PVector, TaskStore)):
+        cached = GROUP_COUNTS.get_or_build(tasks, dict)
+        if by not in cached:
+            cached[by] = _count_groups(tasks, by, where)
+        return dict(cached[by])
+    return _count_groups(tasks, by, where)
+
+def _count_groups(tasks: TaskCollection, by: Tuple[str, ...], where: Dict[str, Any]) -> Dict[tuple, int]:
+    if isinstance(tasks, TaskStore) and where:
+        field, value = next(iter(where.items()))
+        tasks = tasks.select(field, value)
+        where = {k: v for k, v in where.items() if k != field}
+
+    rows = tasks
+    if where:
+        fields, values = tuple(where), tuple(where.values())
+        get_where = attrgetter(*fields)
+        rows = (t for t in tasks if (get_where(t) if len(fields) > 1 else (get_where(t),)) == values)
+
+    if not by:
+        return {(): sum(1 for _ in rows)}
+    get_key = attrgetter(*by)
+    if len(by) == 1:
+        return {(k,): n for k, n in Counter(map(get_key, rows)).items()}
+    return dict(Counter(map(get_key, rows)))
+
+def apply_group_delta(groups: Dict[tuple, int], by: Tuple[str, ...], delta: Any) -> Dict[tuple, int]:
+    """
+    Обновить результат `group_counts(tasks, by)` по разнице задач (`EntityDelta`),
+    не пересчитывая коллекцию: старые версии вычитаются, новые прибавляются.
+    """
+    def key(t: Task) -> tuple:
+        return tuple(getattr(t, f) for f in by)
+
+    result = dict(groups)
+    olds = tuple(delta.removed) + tuple(old for old, _ in delta.changed)
+    news = tuple(delta.added) + tuple(new for _, new in delta.changed)
+    for t in olds:
+        k = key(t)
+        result[k] -= 1
+        if not result[k]:
+            del result[k]
+    for t in news:
+        k = key(t)
+        result[k] = result.get(k, 0) + 1
+    return result
+
+def carry_group_counts(old: TaskCollection, new: TaskCollection, delta: Any) -> None:
+    """
+    Перенести запомненные группировки снимка `old` на снимок `new`, полученный
+    из него применением `delta` (`EntityDelta`), через `apply_group_delta`.
+    ID задач считаются уникальными, как в seed.json.
+    """
+    cached = GROUP_COUNTS.peek(old)
+    if cached:
+        GROUP_COUNTS.put(new, {by: apply_group_delta(groups, by, delta) for by, groups in cached.items()})
+
+def rollup(groups: Dict[tuple, int], by: Tuple[str, ...], keep: Tuple[str, ...]) -> Dict[tuple, int]:
+    """Свернуть результат `group_counts(..., by)` до подмножества полей `keep`."""
+    positions = tuple(by.index(f) for f in keep)
+    result: Dict[tuple, int] = {}
+    for key, n in groups.items():
+        sub = tuple(key[i] for i in positions)
+        result[sub] = result.get(sub, 0) + n
+    return result
+
+def _status_breakdown(by_status: Dict[tuple, int]) -> Dict[str, int]:
+    """Словарь вида {"total", "todo", "in_progress", "review", "done"} из подсчета по статусу."""
+    counts = {"total": sum(by_status.values())}
+    for status in STATUSES:
+        counts[status] = by_status.get((status,), 0)
+    return counts
+
+def _overview_from_groups(projects: Tuple[Project, ...], users: Tuple[User, ...], tasks_count: int, groups: Dict[tuple, int], by: Tuple[str, ...]) -> Dict[str, Any]:
+    by_status = rollup(groups, by, ("status",))
+    per_user = {k: n for (k,), n in rollup(groups, by, ("assignee",)).items() if k}
+    return {
+        "projects_count": len(projects),
+        "users_count": len(users),
+        "tasks_count": tasks_count,
+        "status_distribution": {s: by_status.get((s,), 0) for s in STATUSES},
+        "avg_tasks_per_user": sum(per_user.values()) / len(per_user) if per_user else 0.0
+    }
+
+def _workload_from_groups(users: Tuple[User, ...], groups: Dict[tuple, int], by: Tuple[str, ...]) -> Dict[str, Dict[str, int]]:
+    by_user_status = rollup(groups, by, ("assignee", "status"))
+    per_user: Dict[Any, Dict[tuple, int]] = {}
+    for (assignee, status), n in by_user_status.items():
+        per_user.setdefault(assignee, {})[(status,)] = n
+    return {user.name: _status_breakdown(per_user.get(user.id, {})) for user in users}
 
 
 
@@ -22,37 +144,24 @@ from .ftypes import Maybe, Some, Nothing, Either, Right, Left
 
 # === Лаба1: Overview отчеты ===
 
-def overview_stats(projects: Tuple[Project, ...], users: Tuple[User, ...], tasks: Tuple[Task, ...]) -> Dict[str, Any]:
+def overview_stats(projects: Tuple[Project, ...], users: Tuple[User, ...], tasks: TaskCollection) -> Dict[str, Any]:
     """
     Основная статистика: количество проектов, задач, пользователей и распределение по статусам.
+    Распределение и среднее на пользователя считаются за один проход `group_counts`;
+    `TaskViews` отвечает из счётчиков, поддерживаемых событиями.
     """
-    status_counts = {}
-    for status in ("todo", "in_progress", "review", "done"):
-        status_counts[status] = len(filter_by_status(tasks, status))
-    
-    return {
-        "projects_count": len(projects),
-        "users_count": len(users),
-        "tasks_count": len(tasks),
-        "status_distribution": status_counts,
-        "avg_tasks_per_user": avg_tasks_per_user(tasks)
-    }
+    if isinstance(tasks, TaskViews):
+        return tasks.overview_stats(projects, users)
+    by = ("status", "assignee")
+    return _overview_from_groups(projects, users, len(tasks), group_counts(tasks, by), by)
 
-def project_overview_report(tasks: Tuple[Task, ...], project_id: str) -> Dict[str, int]:
+def project_overview_report(tasks: TaskCollection, project_id: str) -> Dict[str, int]:
     """
     Детальный отчет по проекту.
     """
-    tasks_in_project = tuple(t for t in tasks if t.project_id == project_id)
-    
-    counts = {
-        "total": len(tasks_in_project),
-        "todo": len(filter_by_status(tasks_in_project, "todo")),
-        "in_progress": len(filter_by_status(tasks_in_project, "in_progress")),
-        "review": len(filter_by_status(tasks_in_project, "review")),
-        "done": len(filter_by_status(tasks_in_project, "done"))
-    }
-    
-    return counts
+    if isinstance(tasks, TaskViews):
+        return tasks.project_overview(project_id)
+    return _status_breakdown(group_counts(tasks, ("status",), where={"project_id": project_id}))
 
 
 
@@ -72,41 +181,23 @@ def project_overview_report(tasks: Tuple[Task, ...], project_id: str) -> Dict[st
 
 # === Лаба2: Фильтры и отчеты ===
 
-def filtered_tasks_report(tasks: Tuple[Task, ...], filters: Dict[str, Any]) -> Tuple[Task, ...]:
+def filtered_tasks_report(tasks: TaskCollection, filters: Dict[str, Any]) -> Tuple[Task, ...]:
     """
     Отчет с применением фильтров через замыкания и лямбды.
     Демонстрирует использование лямбд для комбинирования фильтров.
 
-    1. Начинаем с полного списка задач: filtered = tasks
-    2. Последовательно применяем фильтры:
-        Если есть фильтр по приоритету → создаем замыкание и фильтруем через лямбду
-        Если есть фильтр по исполнителю → создаем замыкание и фильтруем через лямбду
-        Если есть фильтр по дате → создаем замыкание и фильтруем через лямбду
-    3. Возвращаем отфильтрованный результат
+    1. Планировщик (`core.query`) оценивает размер выборки по каждому индексу
+       и начинает с самого узкого (исполнитель, статус, дата создания...)
+    2. Остальные фильтры сливаются в один предикат-замыкание и проверяются
+       за один проход без промежуточных кортежей
+    3. Возвращаем отфильтрованный результат в исходном порядке задач
+
+    Поддерживаются ключи `priority`, `assignee`, `status`, `project_id`
+    (одно значение или список значений) и `date_range`.
     """
-    filtered = tasks
-    
-    # Применяем фильтры последовательно с использованием лямбд
-    if "priority" in filters:
-        priority_filter = by_priority(filters["priority"])
-        # Используем лямбду для фильтрации
-        filtered = tuple(filter(lambda t: priority_filter(t), filtered))
-    
-    if "assignee" in filters:
-        assignee_filter = by_assignee(filters["assignee"])
-        # Используем лямбду для фильтрации
-        filtered = tuple(filter(lambda t: assignee_filter(t), filtered))
-    
-    if "date_range" in filters:
-        start_date = filters["date_range"]["start"]
-        end_date = filters["date_range"]["end"]
-        date_filter = by_date_range(start_date, end_date)
-        # Используем лямбду для фильтрации
-        filtered = tuple(filter(lambda t: date_filter(t), filtered))
-    
-    return filtered
+    return run_query(tasks, filters)
 
-def user_workload_report(tasks: Tuple[Task, ...], users: Tuple[User, ...]) -> Dict[str, Dict[str, int]]:
+def user_workload_report(tasks: TaskCollection, users: Tuple[User, ...]) -> Dict[str, Dict[str, int]]:
     """
     Отчет по загрузке пользователей.
 
@@ -115,20 +206,13 @@ def user_workload_report(tasks: Tuple[Task, ...], users: Tuple[User, ...]) -> Di
         Находит все задачи, назначенные на этого пользователя
         Подсчитывает общее количество задач
         Подсчитывает задачи по каждому статусу (todo, in_progress, review, done)
+    3.Все подсчеты берутся из одного прохода `group_counts` по (assignee, status),
+      а для `TaskViews` — из готовых счётчиков представления
     """
-    workload = {}
-    
-    for user in users:
-        user_tasks = tuple(t for t in tasks if t.assignee == user.id)
-        workload[user.name] = {
-            "total": len(user_tasks),
-            "todo": len(filter_by_status(user_tasks, "todo")),
-            "in_progress": len(filter_by_status(user_tasks, "in_progress")),
-            "review": len(filter_by_status(user_tasks, "review")),
-            "done": len(filter_by_status(user_tasks, "done"))
-        }
-    
-    return workload
+    if isinstance(tasks, TaskViews):
+        return tasks.user_workload(users)
+    by = ("assignee", "status")
+    return _workload_from_groups(users, group_counts(tasks, by), by)
 
 
 
@@ -152,12 +236,17 @@ def overdue_tasks_report_cached(tasks: Tuple[Task, ...], rules: Tuple[str, ...])
     """
     return overdue_tasks(tasks, rules)
 
-def performance_comparison_report(tasks: Tuple[Task, ...], rules: Tuple[str, ...]) -> Dict[str, Any]:
+def performance_comparison_report(tasks: TaskCollection, rules: Tuple[str, ...]) -> Dict[str, Any]:
     """
     Сравнение производительности с кэшем и без.
+    Первый вызов гарантированно считает заново (записи снимка сбрасываются),
+    второй берётся из кэша; в отчет попадают реальные счетчики `SLA_CACHE`.
     """
     import time
     
+    SLA_CACHE.invalidate(tasks)
+    before = SLA_CACHE.stats()
+    
     # Первый вызов (без кэша)
     start_time = time.time()
     result1 = overdue_tasks(tasks, rules)
@@ -168,12 +257,18 @@ def performance_comparison_report(tasks: Tuple[Task, ...], rules: Tuple[str, ...
     result2 = overdue_tasks(tasks, rules)
     second_call_time = time.time() - start_time
     
+    after = SLA_CACHE.stats()
+    
     return {
         "first_call_time": first_call_time,
         "second_call_time": second_call_time,
         "cache_improvement": first_call_time / second_call_time if second_call_time > 0 else float('inf'),
         "overdue_tasks_count": len(result1),
-        "results_identical": result1 == result2
+        "results_identical": result1 == result2,
+        "cache_hits": after["hits"] - before["hits"],
+        "cache_misses": after["misses"] - before["misses"],
+        "cache_evictions": after["evictions"] - before["evictions"],
+        "cache_stats": after
     }
 
 
@@ -210,23 +305,34 @@ def safe_task_report(tasks: Tuple[Task, ...], task_ids: List[str]) -> Dict[str,
 def validation_report(tasks: Tuple[Task, ...], rules: Tuple[str, ...]) -> Dict[str, Either[dict, Task]]:
     """
     Отчет валидации задач с использованием Either.
+    Правила компилируются один раз на весь отчет.
     """
-    from .transforms import validate_task
+    ruleset = compile_rules(rules)
     
     report = {}
     for task in tasks:
-        report[task.id] = validate_task(task, rules)
+        report[task.id] = ruleset.validate(task)
     
     return report
 
-def pipeline_report(tasks: Tuple[Task, ...], new_tasks: List[Task], rules: Tuple[str, ...]) -> List[Either[dict, Tuple[Task, ...]]]:
+def validation_summary(tasks: TaskCollection, rules: Tuple[str, ...]) -> BatchValidation:
+    """
+    Пакетная валидация большой коллекции: только ошибки и число корректных задач.
+    Без `Either` на каждую задачу; для `TaskTable` — по столбцам.
+    """
+    return validate_batch(tasks, rules)
+
+def pipeline_report(tasks: TaskCollection, new_tasks: List[Task], rules: Tuple[str, ...]) -> List[Either[dict, TaskCollection]]:
     """
     Отчет по пайплайну создания задач.
+
+    Кортеж на входе один раз превращается в `PVector`, поэтому каждое
+    добавление стоит O(log n), а снимки в результатах делят общую структуру.
     """
     from .transforms import create_task_pipeline
     
     results = []
-    current_tasks = tasks
+    current_tasks = tasks if isinstance(tasks, (TaskStore, PVector)) else PVector(tasks)
     
     for new_task in new_tasks:
         result = create_task_pipeline(current_tasks, new_task, rules)
@@ -234,25 +340,41 @@ def pipeline_report(tasks: Tuple[Task, ...], new_tasks: List[Task], rules: Tuple
         
         # Если задача успешно добавлена, обновляем текущий список
         if result.is_right():
-            current_tasks = result.get_or_else(tasks)
+            current_tasks = result.get_or_else(current_tasks)
     
     return results
 
+def bulk_pipeline_report(tasks: TaskCollection, new_tasks: Iterable[Task], rules: Tuple[str, ...],
+                         workers: int = 1, chunk_size: int = 5_000) -> BulkImport:
+    """
+    Потоковый вариант `pipeline_report` для больших импортов.
+    Итерация отдает `Either` по каждой задаче (Right — сама задача), проверка
+    идет пачками (при `workers > 1` — в нескольких процессах), а принятые
+    задачи добавляются одной операцией; итог — в `.tasks`, скорость — в `.stats`.
+    """
+    return bulk_import(tasks, new_tasks, rules, chunk_size, workers)
+
 # === Общие утилиты для отчетов ===
 
-def generate_summary_report(projects: Tuple[Project, ...], users: Tuple[User, ...], tasks: Tuple[Task, ...]) -> Dict[str, Any]:
+def generate_summary_report(projects: Tuple[Project, ...], users: Tuple[User, ...], tasks: TaskCollection) -> Dict[str, Any]:
     """
     Генерирует сводный отчет по всем данным.
+    Обзор, проекты и загрузка пользователей выводятся из одного прохода `group_counts`.
     """
-    overview = overview_stats(projects, users, tasks)
+    by = ("project_id", "assignee", "status")
+    groups = group_counts(tasks, by)
+    overview = _overview_from_groups(projects, users, len(tasks), groups, by)
     
     # Добавляем информацию о проектах
+    per_project: Dict[str, Dict[tuple, int]] = {}
+    for (project_id, status), n in rollup(groups, by, ("project_id", "status")).items():
+        per_project.setdefault(project_id, {})[(status,)] = n
     project_stats = {}
     for project in projects:
-        project_stats[project.name] = project_overview_report(tasks, project.id)
+        project_stats[project.name] = _status_breakdown(per_project.get(project.id, {}))
     
     # Добавляем информацию о пользователях
-    user_workload = user_workload_report(tasks, users)
+    user_workload = _workload_from_groups(users, groups, by)
     
     # Добавляем информацию о просроченных задачах
     overdue_rules = ("overdue_7_days", "critical_overdue")
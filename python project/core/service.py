@@ -6,47 +6,175 @@
 операции, используемые отчетами и UI.
 """
 
-from core.domain import Task, Project, User
-from typing import Tuple, Optional, List, Dict
+from core.domain import Event, Task, Project, User
+from dataclasses import fields
+from typing import Any, Iterable, Tuple, Optional, List, Dict
 from datetime import datetime
-from .transforms import add_task, filter_by_status, avg_tasks_per_user
+from .cache import invalidate_snapshot
+from .persistent import PVector
+from .store import TaskStore, TaskCollection
+from .table import TaskTable
+from .sqlstore import SqliteTaskStore
+from .transforms import ID_INDEXES, add_task, add_tasks, filter_by_status, avg_tasks_per_user, id_index, safe_task
+from .data_loader import EntityDelta
 
-def create_task(tasks: Tuple[Task, ...], new_task: Task) -> Tuple[Task, ...]:
-    """Вернуть новый кортеж с добавленной задачей `new_task`, не изменяя вход."""
-    return add_task(tasks, new_task)
+def create_task(tasks: TaskCollection, new_task: Task) -> TaskCollection:
+    """Вернуть новый кортеж с добавленной задачей `new_task`, не изменяя вход.
 
-def change_status(tasks: Tuple[Task, ...], task_id: str, new_status: str) -> Tuple[Task, ...]:
+    Для `TaskStore` индексы нового хранилища обновляются инкрементально,
+    а `PVector`/`TaskStore` разделяют структуру с исходной коллекцией.
+    Закэшированные SLA-результаты и индексы прежнего снимка сбрасываются.
+    """
+    result = add_task(tasks, new_task)
+    invalidate_snapshot(tasks)
+    return result
+
+def apply_seed_delta(tasks: TaskCollection, delta: "EntityDelta") -> TaskCollection:
+    """Применить разницу задач из seed.json (см. `SeedWatcher`) без полной перезагрузки.
+
+    Изменённые задачи остаются на своих местах, новые дописываются в конец,
+    удалённые убираются. `TaskStore` и `SqliteTaskStore` обновляют только
+    затронутые записи индексов. Посчитанные группировки (`group_counts`)
+    переносятся на новый снимок по разнице, остальные кэши прежнего снимка
+    сбрасываются.
+    """
+    from .report import carry_group_counts
+
+    if not delta:
+        return tasks
+    if isinstance(tasks, (TaskStore, SqliteTaskStore)):
+        result = tasks.apply_delta(delta)
+    else:
+        replaced = {new.id: new for _, new in delta.changed}
+        gone = {t.id for t in delta.removed}
+        result = tuple(replaced.get(t.id, t) for t in tasks if t.id not in gone) + tuple(delta.added)
+        if isinstance(tasks, TaskTable):
+            result = TaskTable.from_tasks(result)
+        elif isinstance(tasks, PVector):
+            result = PVector(result)
+    carry_group_counts(tasks, result, delta)
+    invalidate_snapshot(tasks)
+    return result
+
+def change_status(tasks: TaskCollection, task_id: str, new_status: str, updated: Optional[str] = None) -> TaskCollection:
     """Неизменяемо изменить статус задачи с ID `task_id`.
 
     Если задача не найдена — исходный объект сохраняется без изменений.
-    Поле `updated` обновляется у изменённой задачи.
+    Поле `updated` обновляется у изменённой задачи (текущим временем или
+    значением `updated`, например при воспроизведении журнала событий).
+    Для `TaskStore` задача находится по индексу, а перестраиваются только
+    корзины статусов, между которыми она переходит. Для `PVector` позиции
+    берутся из индекса ID (`id_index`, переносится на новый вектор), а
+    замена стоит O(log n) на каждую найденную задачу без копирования коллекции.
+    Закэшированные SLA-результаты и индексы прежнего снимка сбрасываются.
     """
-    updated = []
+    if isinstance(tasks, PVector):
+        index = id_index(tasks)
+        invalidate_snapshot(tasks)
+        result = tasks
+        for pos in index.get(task_id, ()):
+            result = result.set(pos, task_with_status(tasks[pos], new_status, updated))
+        if result is not tasks:
+            ID_INDEXES.put(result, index)
+        return result
+
+    invalidate_snapshot(tasks)
+    if isinstance(tasks, (TaskStore, SqliteTaskStore)):
+        return tasks.with_status(task_id, new_status, updated)
+
+    result_tasks = []
     for t in tasks:
         if t.id == task_id:
-            updated.append(Task(
-                id=t.id,
-                project_id=t.project_id,
-                title=t.title,
-                desc=t.desc,
-                status=new_status,
-                priority=t.priority,
-                assignee=t.assignee,
-                created=t.created,
-                updated=datetime.utcnow().isoformat()
-            ))
+            result_tasks.append(task_with_status(t, new_status, updated))
         else:
-            updated.append(t)
-    return tuple(updated)
+            result_tasks.append(t)
+    return tuple(result_tasks)
 
-def project_overview(tasks: Tuple[Task, ...], project_id: str) -> Dict[str, int]:
+def task_with_status(t: Task, new_status: str, updated: Optional[str] = None) -> Task:
+    """Копия задачи с новым статусом и обновлённым полем `updated`."""
+    return Task(
+        id=t.id,
+        project_id=t.project_id,
+        title=t.title,
+        desc=t.desc,
+        status=new_status,
+        priority=t.priority,
+        assignee=t.assignee,
+        created=t.created,
+        updated=updated or datetime.utcnow().isoformat()
+    )
+
+def project_overview(tasks: TaskCollection, project_id: str) -> Dict[str, int]:
     """Агрегировать количество задач по статусам для указанного проекта."""
-    tasks_in = [t for t in tasks if t.project_id == project_id]
+    if isinstance(tasks, (TaskTable, SqliteTaskStore)):
+        from .report import project_overview_report
+        return project_overview_report(tasks, project_id)
+    if isinstance(tasks, TaskStore):
+        tasks_in = tasks.select("project_id", project_id)
+    else:
+        tasks_in = [t for t in tasks if t.project_id == project_id]
     counts = {"total": len(tasks_in)}
     for s in ("todo", "in_progress", "review", "done"):
         counts[s] = len([t for t in tasks_in if t.status == s])
     return counts
 
-def avg_tasks_per_user_report(tasks: Tuple[Task, ...]) -> float:
+def avg_tasks_per_user_report(tasks: TaskCollection) -> float:
     """Удобная обёртка: среднее количество задач на пользователя."""
     return avg_tasks_per_user(tasks)
+
+# === Воспроизведение событий задач ===
+
+_TASK_FIELDS = tuple(f.name for f in fields(Task) if f.init)
+
+def task_from_payload(payload: Any) -> Optional[Task]:
+    """Задача из нагрузки события: сам `Task` или словарь со всеми его полями."""
+    if isinstance(payload, Task):
+        return payload
+    if isinstance(payload, dict) and all(f in payload for f in _TASK_FIELDS):
+        return Task(**{f: payload[f] for f in _TASK_FIELDS})
+    return None
+
+def apply_task_event(tasks: TaskCollection, ev: Event) -> TaskCollection:
+    """Применить одно событие к коллекции задач.
+
+    `task_created` с задачей — добавить её; `task_updated` с задачей —
+    заменить задачу с тем же ID (нет такой задачи — коллекция не меняется), со словарём `{"id", "status"[, "updated"]}` —
+    сменить статус. Прочие события и неполные нагрузки не меняют коллекцию.
+    """
+    if ev.name == "task_created":
+        task = task_from_payload(ev.payload)
+        return create_task(tasks, task) if task is not None else tasks
+    if ev.name == "task_updated":
+        task = task_from_payload(ev.payload)
+        if task is not None:
+            old = safe_task(tasks, task.id).get_or_else(None)
+            if old is None:
+                return tasks
+            return apply_seed_delta(tasks, EntityDelta(changed=((old, task),)))
+        payload = ev.payload
+        if isinstance(payload, dict) and "id" in payload and "status" in payload:
+            return change_status(tasks, payload["id"], payload["status"], payload.get("updated"))
+    return tasks
+
+def replay_task_events(tasks: TaskCollection, events: Iterable[Event]) -> TaskCollection:
+    """Восстановить коллекцию задач по событиям (например, из `EventLog.replay`).
+
+    Подряд идущие `task_created` добавляются одной операцией (`add_tasks`).
+    """
+    created: List[Task] = []
+    for ev in events:
+        task = task_from_payload(ev.payload) if ev.name == "task_created" else None
+        if task is not None:
+            created.append(task)
+            continue
+        if created:
+            tasks, created = _add_created(tasks, created), []
+        tasks = apply_task_event(tasks, ev)
+    if created:
+        tasks = _add_created(tasks, created)
+    return tasks
+
+def _add_created(tasks: TaskCollection, created: List[Task]) -> TaskCollection:
+    result = add_tasks(tasks, created)
+    invalidate_snapshot(tasks)
+    return result
@@ -0,0 +1,271 @@
+# core/snapshot.py
+"""Бинарный снимок seed-данных с загрузкой через `mmap`.
+
+Формат (little-endian, все смещения — от начала файла):
+
+- заголовок: магия, версия формата, размер/mtime/sha256 исходного
+  seed.json и число секций;
+- таблица строк: `n + 1` смещений (uint64) и UTF-8 блоб; каждая уникальная
+  строка хранится один раз, `None` кодируется как `NULL_ID`;
+- каталог секций (`projects`, `users`, `tasks`, `comments`): имя, число
+  строк и столбцов, смещение данных;
+- данные секции: id имён столбцов, затем столбцы фиксированной ширины —
+  по uint32-идентификатору строки на запись.
+
+`open_snapshot` отображает файл в память и возвращает `SnapshotView` —
+последовательности, которые собирают `Task`/`Comment` по требованию, не
+разбирая файл целиком. Снимок считается устаревшим, если размер и mtime
+seed.json не совпадают с записанными и не совпадает sha256 содержимого.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import fields
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from .domain import Project, User, Task, Comment
+
+MAGIC = b"TSKSNAP\x00"
+VERSION = 1
+NULL_ID = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<8sIQQ32sI")  # магия, версия, размер seed, mtime_ns seed, sha256, число секций
+_STRINGS = struct.Struct("<QQQ")  # число строк, смещение таблицы смещений, смещение блоба
+_SECTION = struct.Struct("<16sQIIQ")  # имя, строк, столбцов, резерв, смещение данных
+
+SECTIONS: Dict[str, type] = {
+    "projects": Project,
+    "users": User,
+    "tasks": Task,
+    "comments": Comment,
+}
+
+
+class SnapshotError(ValueError):
+    """Снимок повреждён, другой версии или не соответствует seed.json."""
+
+
+def _columns(cls: type) -> Tuple[str, ...]:
+    """Поля конструктора сущности (вычисляемые поля вроде `Task.created_ts` не хранятся)."""
+    return tuple(f.name for f in fields(cls) if f.init)
+
+
+def seed_fingerprint(seed_path: str, with_hash: bool = True) -> Tuple[int, int, bytes]:
+    """(размер, mtime_ns, sha256) файла seed; хеш считается потоково."""
+    st = os.stat(seed_path)
+    digest = b"\x00" * 32
+    if with_hash:
+        h = hashlib.sha256()
+        with open(seed_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.digest()
+    return st.st_size, st.st_mtime_ns, digest
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def write_snapshot(sections: Dict[str, Iterable[Any]], snapshot_path: str, seed_path: str) -> None:
+    """Записать сущности в бинарный снимок (атомарно: через временный файл)."""
+    strings: Dict[str, int] = {}
+
+    def sid(value: Optional[str]) -> int:
+        if value is None:
+            return NULL_ID
+        if not isinstance(value, str):
+            raise SnapshotError(f"в снимке хранятся только строки, получено {type(value).__name__}")
+        i = strings.get(value)
+        if i is None:
+            i = strings[value] = len(strings)
+        return i
+
+    tables = []
+    for name, cls in SECTIONS.items():
+        cols = _columns(cls)
+        data = [_u32(sid(c) for c in cols)]
+        items = list(sections.get(name, ()))
+        for col in cols:
+            data.append(_u32(sid(getattr(item, col)) for item in items))
+        tables.append((name, len(items), len(cols), data))
+
+    blob_parts = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for part in blob_parts:
+        offsets.append(offsets[-1] + len(part))
+
+    size, mtime_ns, digest = seed_fingerprint(seed_path)
+    pos = _HEADER.size + _STRINGS.size + _SECTION.size * len(tables)
+    offsets_pos = _align(pos)
+    blob_pos = offsets_pos + 8 * len(offsets)
+    pos = _align(blob_pos + offsets[-1])
+    directory = []
+    for name, rows, ncols, data in tables:
+        directory.append(_SECTION.pack(name.encode(), rows, ncols, 0, pos))
+        pos = _align(pos + sum(4 * len(col) for col in data))
+
+    tmp = snapshot_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, size, mtime_ns, digest, len(tables)))
+        f.write(_STRINGS.pack(len(strings), offsets_pos, blob_pos))
+        f.writelines(directory)
+        _pad(f)
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.writelines(blob_parts)
+        _pad(f)
+        for _, _, _, data in tables:
+            for col in data:
+                f.write(col.tobytes())
+            _pad(f)
+    os.replace(tmp, snapshot_path)
+
+
+def _u32(values: Iterable[int]) -> array:
+    out = array("I", values)
+    if sys.byteorder != "little":  # pragma: no cover - зависит от платформы
+        out.byteswap()
+    return out
+
+
+def _pad(f) -> None:
+    f.write(b"\x00" * (_align(f.tell()) - f.tell()))
+
+
+class _Strings:
+    """Таблица строк снимка: декодирование по требованию с запоминанием.
+
+    Смещения и UTF-8 блоба проверяются при открытии снимка, поэтому
+    ленивое декодирование отдельных строк потом не падает.
+    """
+
+    __slots__ = ("_offsets", "_blob", "_cache")
+
+    def __init__(self, buf: memoryview, n: int, offsets_pos: int, blob_pos: int):
+        if offsets_pos + 8 * (n + 1) > len(buf):
+            raise SnapshotError("таблица строк обрезана")
+        self._offsets = buf[offsets_pos:offsets_pos + 8 * (n + 1)].cast("Q")
+        offsets = self._offsets
+        if offsets[0] != 0 or blob_pos + offsets[n] > len(buf):
+            raise SnapshotError("таблица строк обрезана")
+        if any(a > b for a, b in zip(offsets, offsets[1:])):
+            raise SnapshotError("смещения таблицы строк не упорядочены")
+        self._blob = buf[blob_pos:blob_pos + offsets[n]]
+        str(self._blob, "utf-8")  # весь блоб — корректный UTF-8...
+        blob = self._blob
+        size = len(blob)
+        # ...и ни одна строка не начинается с середины многобайтового символа
+        if any(off < size and blob[off] & 0xC0 == 0x80 for off in offsets):
+            raise SnapshotError("граница строки внутри символа UTF-8")
+        self._cache: Dict[int, str] = {}
+
+    def get(self, i: int) -> Optional[str]:
+        if i == NULL_ID:
+            return None
+        s = self._cache.get(i)
+        if s is None:
+            s = self._cache[i] = str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+        return s
+
+
+class SnapshotView(Sequence):
+    """Секция снимка как последовательность сущностей (собираются при обращении)."""
+
+    def __init__(self, cls: type, strings: _Strings, columns: Dict[str, memoryview], rows: int, owner: "Snapshot"):
+        self._cls = cls
+        self._strings = strings
+        self._columns = columns
+        self._names = tuple(columns)
+        self._rows = rows
+        self._owner = owner  # держит mmap открытым, пока жив view
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self[j] for j in range(*i.indices(self._rows)))
+        if i < 0:
+            i += self._rows
+        if not 0 <= i < self._rows:
+            raise IndexError("индекс вне снимка")
+        get = self._strings.get
+        return self._cls(*[get(self._columns[name][i]) for name in self._names])
+
+    def __iter__(self) -> Iterator[Any]:
+        cls, get = self._cls, self._strings.get
+        for row in zip(*self._columns.values()):
+            yield cls(*map(get, row))
+
+    def column(self, name: str) -> Tuple[Optional[str], ...]:
+        """Значения одного столбца без сборки сущностей."""
+        get = self._strings.get
+        return tuple(get(i) for i in self._columns[name])
+
+
+class Snapshot:
+    """Открытый (отображённый в память) снимок: секции как `SnapshotView`."""
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":  # pragma: no cover
+            raise SnapshotError("снимок поддерживается только на little-endian платформах")
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # пустой файл
+                raise SnapshotError(f"снимок пуст: {path}") from exc
+        try:
+            self._parse(memoryview(self._mmap), path)
+        except (struct.error, TypeError, IndexError, UnicodeDecodeError) as exc:
+            raise SnapshotError(f"снимок повреждён: {path}") from exc
+
+    def _parse(self, buf: memoryview, path: str) -> None:
+        magic, version, self.seed_size, self.seed_mtime_ns, self.seed_sha256, nsec = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotError(f"неизвестный формат снимка: {path}")
+        nstr, offsets_pos, blob_pos = _STRINGS.unpack_from(buf, _HEADER.size)
+        strings = _Strings(buf, nstr, offsets_pos, blob_pos)
+        self.sections: Dict[str, SnapshotView] = {}
+        pos = _HEADER.size + _STRINGS.size
+        for _ in range(nsec):
+            raw_name, rows, ncols, _, data_pos = _SECTION.unpack_from(buf, pos)
+            pos += _SECTION.size
+            if data_pos + 4 * ncols * (rows + 1) > len(buf):
+                raise SnapshotError(f"снимок обрезан: {path}")
+            name = raw_name.rstrip(b"\x00").decode()
+            cls = SECTIONS.get(name)
+            if cls is None:
+                continue
+            names = tuple(strings.get(i) for i in buf[data_pos:data_pos + 4 * ncols].cast("I"))
+            if names != _columns(cls):
+                raise SnapshotError(f"столбцы секции {name} не совпадают с {cls.__name__}")
+            start = data_pos + 4 * ncols
+            columns = {}
+            for j, col in enumerate(names):
+                a = start + 4 * rows * j
+                columns[col] = buf[a:a + 4 * rows].cast("I")
+            self.sections[name] = SnapshotView(cls, strings, columns, rows, self)
+        if set(self.sections) != set(SECTIONS):
+            raise SnapshotError(f"в снимке не хватает секций: {path}")
+
+    def is_fresh(self, seed_path: str) -> bool:
+        """Совпадает ли снимок с текущим seed.json (mtime/размер, иначе — sha256)."""
+        size, mtime_ns, _ = seed_fingerprint(seed_path, with_hash=False)
+        if size != self.seed_size:
+            return False
+        if mtime_ns == self.seed_mtime_ns:
+            return True
+        return seed_fingerprint(seed_path)[2] == self.seed_sha256
+
+    def section(self, name: str) -> SnapshotView:
+        """Секция снимка (`projects`, `users`, `tasks`, `comments`)."""
+        return self.sections[name]
+
+
+def open_snapshot(path: str) -> Snapshot:
+    """Открыть снимок через mmap (бросает `SnapshotError`/`OSError`)."""
+    return Snapshot(path)
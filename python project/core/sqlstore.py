@@ -0,0 +1,392 @@
+# core/sqlstore.py
+"""Хранилище задач в SQLite (стандартный модуль `sqlite3`).
+
+`SqliteTaskStore` держит задачи в таблице с индексами по `status`,
+`priority`, `project_id`, `assignee`, `created_ts` и `id`, поэтому данные
+переживают перезапуск и не обязаны помещаться в память. Снаружи это та же
+последовательность задач, что и кортеж или `TaskStore`: функции
+`core.transforms`, `core.report`, `core.query` и `core.service` распознают
+её и передают фильтры и группировки в SQL (`WHERE ... IN`, `GROUP BY`).
+
+Дескриптор — неизменяемый снимок одной версии хранилища. Строки задач
+версионируются: у строки есть `born` (версия, записавшая её) и `died`
+(версия, заменившая или удалившая её), и дескриптор версии `v` видит
+строки с `born <= v < died`. Изменение (`add`, `extend`, `with_status`,
+`apply_delta`) не трогает видимые прежним версиям строки, а пишет новые
+(копирование при записи) и возвращает дескриптор новой версии. Порядок
+задач — столбец `seq`; замена сохраняет `seq` задачи, удаление оставляет
+пропуск. Индексы по полям включают `died` и `born`, поэтому выборка по
+значению не перебирает историю. После каждой записи строки, закрытые не
+позже самой старой версии среди ещё живых дескрипторов, удаляются
+(`compact`): их уже никто не может увидеть. Учитываются дескрипторы этого
+процесса; другой процесс, открывший тот же файл, может потерять свою версию.
+
+История линейная: писать можно только через дескриптор последней версии.
+Запись через устаревший дескриптор (ветка от старого снимка) бросает
+`StaleHandleError` — две ветки не могут жить в одной базе.
+
+Соединение общее для всех дескрипторов и потоков. Записи идут под
+блокировкой хранилища; чтение обходится без неё — дескриптор видит только
+строки своей версии, а незавершённая запись создаёт строки новой.
+"""
+
+import sqlite3
+import threading
+import weakref
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .domain import Task
+
+if TYPE_CHECKING:
+    from .data_loader import EntityDelta
+
+INDEXED_FIELDS = ("status", "priority", "project_id", "assignee")
+
+_ALIVE = 9223372036854775807  # `died` строки, которую ещё не заменили
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS task_rows (
+    rid INTEGER PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    born INTEGER NOT NULL,
+    died INTEGER NOT NULL DEFAULT {_ALIVE},
+    id TEXT NOT NULL,
+    project_id TEXT,
+    title TEXT,
+    "desc" TEXT,
+    status TEXT,
+    priority TEXT,
+    assignee TEXT,
+    created TEXT,
+    updated TEXT,
+    created_ts INTEGER
+);
+CREATE TABLE IF NOT EXISTS versions (
+    version INTEGER PRIMARY KEY,
+    size INTEGER NOT NULL,
+    max_seq INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO versions VALUES (0, 0, 0);
+CREATE INDEX IF NOT EXISTS task_rows_id ON task_rows (id, died, born);
+CREATE INDEX IF NOT EXISTS task_rows_seq ON task_rows (seq);
+CREATE INDEX IF NOT EXISTS task_rows_died ON task_rows (died);
+CREATE INDEX IF NOT EXISTS task_rows_status ON task_rows (status, died, born);
+CREATE INDEX IF NOT EXISTS task_rows_priority ON task_rows (priority, died, born);
+CREATE INDEX IF NOT EXISTS task_rows_project_id ON task_rows (project_id, died, born);
+CREATE INDEX IF NOT EXISTS task_rows_assignee ON task_rows (assignee, died, born);
+CREATE INDEX IF NOT EXISTS task_rows_created_ts ON task_rows (created_ts);
+"""
+
+_COLUMNS = 'id, project_id, title, "desc", status, priority, assignee, created, updated'
+_SELECT = f"SELECT {_COLUMNS} FROM task_rows"
+_VISIBLE = "born <= ? AND died > ?"
+_INSERT = f"INSERT INTO task_rows (seq, born, {_COLUMNS}, created_ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+class StaleHandleError(ValueError):
+    """Запись через дескриптор, который уже не указывает на последнюю версию хранилища."""
+
+
+def _row(task: Task) -> tuple:
+    return (task.id, task.project_id, task.title, task.desc, task.status, task.priority,
+            task.assignee, task.created, task.updated, task.created_ts)
+
+
+def _check_field(field: str) -> str:
+    if field not in INDEXED_FIELDS:
+        raise ValueError(f"поле {field!r} не поддерживается SQL-хранилищем")
+    return field
+
+
+def where_clause(conds: Dict[str, Any], version: int) -> Tuple[str, List[Any]]:
+    """SQL-условие из нормализованных фильтров (`core.query.normalize_filters`).
+
+    Поле -> кортеж допустимых значений (`None` означает `IS NULL`),
+    `date_range` -> (start_us, end_us) по `created_ts`. Всегда ограничивает
+    выборку строками версии `version`.
+    """
+    parts: List[str] = [_VISIBLE]
+    params: List[Any] = [version, version]
+    for field, arg in conds.items():
+        if field == "date_range":
+            parts.append("created_ts BETWEEN ? AND ?")
+            params.extend(arg)
+            continue
+        _check_field(field)
+        values = [v for v in arg if v is not None]
+        alts = []
+        if values:
+            alts.append(f"{field} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        if len(values) < len(arg):
+            alts.append(f"{field} IS NULL")
+        parts.append("(" + " OR ".join(alts) + ")" if alts else "0")
+    return " WHERE " + " AND ".join(parts), params
+
+
+class _Database:
+    """Общее соединение, блокировка записи и живые дескрипторы одного хранилища."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+        self.lock = threading.Lock()
+        self.handles: "weakref.WeakSet[SqliteTaskStore]" = weakref.WeakSet()
+
+    def oldest_version(self) -> Optional[int]:
+        """Самая старая версия, которую видит живой дескриптор (None — дескрипторов нет)."""
+        return min((h._version for h in list(self.handles)), default=None)
+
+    def latest(self) -> Tuple[int, int, int]:
+        """(версия, число задач, наибольший `seq`) последней версии."""
+        return self.conn.execute("SELECT version, size, max_seq FROM versions ORDER BY version DESC LIMIT 1").fetchone()
+
+
+class SqliteTaskStore:
+    """Последовательность задач поверх SQLite с выборками и подсчётами в SQL.
+
+    Дескриптор видит строки своей версии; изменения возвращают дескриптор
+    новой версии и не меняют содержимое прежних (см. описание модуля).
+    """
+
+    __slots__ = ("_db", "_version", "_size", "_max_seq", "__weakref__")
+
+    def __init__(self, path: str = ":memory:", tasks: Iterable[Task] = ()):
+        self._db = _Database(path)
+        self._version, self._size, self._max_seq = self._db.latest()
+        self._db.handles.add(self)
+        new = self.extend(tasks)
+        self._version, self._size, self._max_seq = new._version, new._size, new._max_seq
+
+    @classmethod
+    def _handle(cls, db: _Database, version: int, size: int, max_seq: int) -> "SqliteTaskStore":
+        store = cls.__new__(cls)
+        store._db = db
+        store._version, store._size, store._max_seq = version, size, max_seq
+        db.handles.add(store)
+        return store
+
+    @property
+    def path(self) -> str:
+        return self._db.path
+
+    @property
+    def version(self) -> int:
+        """Номер версии хранилища, которую видит дескриптор."""
+        return self._version
+
+    def close(self) -> None:
+        """Закрыть соединение (все дескрипторы хранилища станут недоступны)."""
+        self._db.conn.close()
+
+    def _fetch(self, sql: str, params: Iterable[Any] = ()) -> Tuple[Task, ...]:
+        return tuple(Task(*r) for r in self._db.conn.execute(sql, tuple(params)))
+
+    def _scalar(self, sql: str, params: Iterable[Any] = ()) -> Any:
+        return self._db.conn.execute(sql, tuple(params)).fetchone()[0]
+
+    @property
+    def _vis(self) -> Tuple[int, int]:
+        return self._version, self._version
+
+    def _dense(self) -> bool:
+        """Позиции без пропусков: задача с индексом i имеет `seq = i + 1`."""
+        return self._size == self._max_seq
+
+    def _seq_before(self, idx: int) -> int:
+        """`seq`, после которого начинаются задачи с позиции `idx`."""
+        if idx <= 0:
+            return 0
+        if idx >= self._size:
+            return self._max_seq
+        if self._dense():
+            return idx
+        return self._scalar(f"SELECT seq FROM task_rows WHERE {_VISIBLE} ORDER BY seq LIMIT 1 OFFSET ?",
+                            (*self._vis, idx)) - 1
+
+    # --- протокол последовательности ---
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Task]:
+        cursor = self._db.conn.execute(f"{_SELECT} WHERE {_VISIBLE} ORDER BY seq", self._vis)
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for r in rows:
+                yield Task(*r)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(self._size)
+            if step != 1:
+                return tuple(self)[idx]
+            if stop <= start:
+                return ()
+            if self._dense():
+                return self._fetch(f"{_SELECT} WHERE {_VISIBLE} AND seq > ? AND seq <= ? ORDER BY seq",
+                                   (*self._vis, start, stop))
+            return self._fetch(f"{_SELECT} WHERE {_VISIBLE} ORDER BY seq LIMIT ? OFFSET ?",
+                               (*self._vis, stop - start, start))
+        if idx < 0:
+            idx += self._size
+        if not 0 <= idx < self._size:
+            raise IndexError("индекс вне хранилища")
+        if self._dense():
+            return self._fetch(f"{_SELECT} WHERE {_VISIBLE} AND seq = ?", (*self._vis, idx + 1))[0]
+        return self._fetch(f"{_SELECT} WHERE {_VISIBLE} ORDER BY seq LIMIT 1 OFFSET ?", (*self._vis, idx))[0]
+
+    def __repr__(self) -> str:
+        return f"SqliteTaskStore({self._db.path!r}, {self._size} tasks, version {self._version})"
+
+    # --- выборки ---
+
+    def get(self, task_id: str) -> Optional[Task]:
+        """Первая задача с указанным ID или None."""
+        found = self._fetch(f"{_SELECT} WHERE id = ? AND {_VISIBLE} ORDER BY seq LIMIT 1", (task_id, *self._vis))
+        return found[0] if found else None
+
+    def select(self, field: str, value: Optional[str]) -> Tuple[Task, ...]:
+        """Задачи, у которых `field == value`, в исходном порядке."""
+        return self.query({field: (value,)})
+
+    def count(self, field: str, value: Optional[str]) -> int:
+        """Количество задач с `field == value`."""
+        sql, params = where_clause({field: (value,)}, self._version)
+        return self._scalar("SELECT COUNT(*) FROM task_rows" + sql, params)
+
+    def counts(self, field: str) -> Dict[Optional[str], int]:
+        """Количество задач по каждому значению поля."""
+        return {k[0]: n for k, n in self.group_counts((field,)).items()}
+
+    def query(self, conds: Dict[str, Any]) -> Tuple[Task, ...]:
+        """Задачи, подходящие под нормализованные фильтры, в исходном порядке."""
+        sql, params = where_clause(conds, self._version)
+        return self._fetch(_SELECT + sql + " ORDER BY seq", params)
+
+    def group_counts(self, by: Tuple[str, ...], conds: Optional[Dict[str, Any]] = None) -> Dict[tuple, int]:
+        """Подсчёт задач по комбинациям полей `by` одним `GROUP BY`."""
+        sql, params = where_clause(conds or {}, self._version)
+        if not by:
+            return {(): self._scalar("SELECT COUNT(*) FROM task_rows" + sql, params)}
+        cols = ", ".join(_check_field(f) for f in by)
+        rows = self._db.conn.execute(f"SELECT {cols}, COUNT(*) FROM task_rows{sql} GROUP BY {cols}", params)
+        return {tuple(r[:-1]): r[-1] for r in rows}
+
+    def ids_by_status(self, status_order: Tuple[str, ...], idx: int = 0) -> Iterator[str]:
+        """ID задач в порядке статусов `status_order`, начиная с позиции `idx`."""
+        floor = self._seq_before(idx)
+        for status in status_order:
+            cursor = self._db.conn.execute(
+                f"SELECT id FROM task_rows WHERE status = ? AND seq > ? AND {_VISIBLE} ORDER BY seq",
+                (status, floor, *self._vis),
+            )
+            for (task_id,) in cursor:
+                yield task_id
+
+    # --- изменения ---
+
+    def _write(self, changes) -> "SqliteTaskStore":
+        """Записать новую версию: `changes(conn, v)` возвращает (прирост числа задач, новых seq) или None."""
+        db = self._db
+        conn = db.conn
+        with db.lock, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT MAX(version) FROM versions").fetchone()[0] != self._version:
+                raise StaleHandleError("запись возможна только через дескриптор последней версии хранилища")
+            v = self._version + 1
+            result = changes(conn, v)
+            if result is None:
+                return self
+            grown, appended = result
+            size, max_seq = self._size + grown, self._max_seq + appended
+            conn.execute("INSERT INTO versions VALUES (?, ?, ?)", (v, size, max_seq))
+            new = SqliteTaskStore._handle(db, v, size, max_seq)
+            self._compact(conn)
+        return new
+
+    def _compact(self, conn: sqlite3.Connection) -> int:
+        """Удалить строки и версии, которые не видит ни один живой дескриптор; вернуть число строк."""
+        oldest = self._db.oldest_version()
+        if oldest is None:
+            return 0
+        removed = conn.execute("DELETE FROM task_rows WHERE died <= ?", (oldest,)).rowcount
+        conn.execute("DELETE FROM versions WHERE version < ?", (oldest,))
+        return removed
+
+    def compact(self) -> int:
+        """Удалить недоступную живым дескрипторам историю (после записи это делается само)."""
+        db = self._db
+        with db.lock, db.conn:
+            return self._compact(db.conn)
+
+    def _replace_rows(self, conn: sqlite3.Connection, v: int, task_id: str, values: tuple) -> int:
+        """Новая версия строк задачи `task_id` с теми же `seq`; вернуть число заменённых строк."""
+        cursor = conn.execute(
+            f"INSERT INTO task_rows (seq, born, {_COLUMNS}, created_ts) "
+            f"SELECT seq, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ? FROM task_rows WHERE id = ? AND {_VISIBLE}",
+            (v, *values, task_id, *self._vis),
+        )
+        if cursor.rowcount:
+            conn.execute(f"UPDATE task_rows SET died = ? WHERE id = ? AND {_VISIBLE}", (v, task_id, *self._vis))
+        return cursor.rowcount
+
+    def _append_rows(self, conn: sqlite3.Connection, v: int, tasks: Iterable[Task]) -> int:
+        rows = [(self._max_seq + i, v, *_row(t)) for i, t in enumerate(tasks, 1)]
+        conn.executemany(_INSERT, rows)
+        return len(rows)
+
+    def add(self, task: Task) -> "SqliteTaskStore":
+        """Записать задачу и вернуть дескриптор новой версии; прежний её не видит."""
+        return self.extend((task,))
+
+    def extend(self, tasks: Iterable[Task]) -> "SqliteTaskStore":
+        """Записать пачку задач одной транзакцией и вернуть дескриптор новой версии."""
+        def changes(conn, v):
+            n = self._append_rows(conn, v, tasks)
+            return (n, n) if n else None
+        return self._write(changes)
+
+    def apply_delta(self, delta: "EntityDelta") -> "SqliteTaskStore":
+        """Применить разницу seed.json одной новой версией.
+
+        Изменённые задачи получают новые строки на тех же местах, удалённые
+        закрываются (`died`), новые дописываются в конец.
+        """
+        def changes(conn, v):
+            removed = 0
+            for _, new in delta.changed:
+                self._replace_rows(conn, v, new.id, _row(new))
+            for old in delta.removed:
+                removed += conn.execute(f"UPDATE task_rows SET died = ? WHERE id = ? AND {_VISIBLE}",
+                                        (v, old.id, *self._vis)).rowcount
+            added = self._append_rows(conn, v, delta.added)
+            return added - removed, added
+        return self._write(changes) if delta else self
+
+    def with_status(self, task_id: str, new_status: str, updated: Optional[str] = None) -> "SqliteTaskStore":
+        """Сменить статус задач с ID `task_id` (и поле `updated`, по умолчанию — сейчас) в новой версии.
+
+        Если задача не найдена — возвращается тот же дескриптор.
+        """
+        if self.get(task_id) is None:
+            return self
+        updated = updated or datetime.utcnow().isoformat()
+
+        def changes(conn, v):
+            # Каждая новая строка копирует свою прежнюю — задачи с одним ID могут различаться
+            cursor = conn.execute(
+                f"INSERT INTO task_rows (seq, born, {_COLUMNS}, created_ts) "
+                f'SELECT seq, ?, id, project_id, title, "desc", ?, priority, assignee, created, ?, created_ts '
+                f"FROM task_rows WHERE id = ? AND {_VISIBLE}",
+                (v, new_status, updated, task_id, *self._vis),
+            )
+            if not cursor.rowcount:
+                return None
+            conn.execute(f"UPDATE task_rows SET died = ? WHERE id = ? AND {_VISIBLE}", (v, task_id, *self._vis))
+            return 0, 0
+        return self._write(changes)
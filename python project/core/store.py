@@ -0,0 +1,222 @@
+# core/store.py
+"""Неизменяемое хранилище задач с хеш-индексами.
+
+`TaskStore` держит задачи в персистентном векторе и рядом с ним индексы по
+`id`, `status`, `priority`, `project_id` и `assignee`. Индексы хранят позиции
+задач (по возрастанию), поэтому выборки сохраняют исходный порядок.
+
+Хранилище неизменяемо: `add` и `with_status` возвращают новый объект и
+обновляют только затронутые корзины индексов, не перестраивая их заново.
+Функции из `core.transforms`, `core.service` и `core.report` принимают как
+обычный кортеж задач, так и `TaskStore`.
+"""
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .domain import Task
+from .persistent import PMap, PSortedSet, PVector
+
+if TYPE_CHECKING:
+    from .data_loader import EntityDelta
+    from .sqlstore import SqliteTaskStore
+    from .table import TaskTable
+
+INDEXED_FIELDS = ("status", "priority", "project_id", "assignee")
+
+Positions = PSortedSet
+Index = PMap
+
+_EMPTY_POSITIONS = PSortedSet()
+
+
+class TaskStore:
+    """Неизменяемая коллекция задач с индексами для O(1)/O(k) выборок.
+
+    Ведёт себя как последовательность задач (`len`, итерация, индексация),
+    поэтому код, ожидающий кортеж, работает и с хранилищем.
+    Задачи лежат в `PVector`, а индекс по ID — в `PMap`, поэтому `add` и
+    замена задачи стоят O(log n) и делят структуру с прежней версией.
+    """
+
+    __slots__ = ("_tasks", "_by_id", "_indexes", "__weakref__")
+
+    def __init__(self, tasks: Iterable[Task] = ()):
+        tasks = tuple(tasks)
+        by_id: Dict[str, Tuple[int, ...]] = {}
+        indexes: Dict[str, Dict[Optional[str], list]] = {f: {} for f in INDEXED_FIELDS}
+        for pos, t in enumerate(tasks):
+            by_id[t.id] = by_id.get(t.id, ()) + (pos,)
+            for f in INDEXED_FIELDS:
+                indexes[f].setdefault(getattr(t, f), []).append(pos)
+        self._tasks = PVector(tasks)
+        self._by_id = PMap(by_id)
+        self._indexes = {
+            f: PMap({k: PSortedSet(v) for k, v in buckets.items()})
+            for f, buckets in indexes.items()
+        }
+
+    @classmethod
+    def _from_parts(cls, tasks: PVector, by_id: PMap, indexes: Dict[str, Index]) -> "TaskStore":
+        store = cls.__new__(cls)
+        store._tasks = tasks
+        store._by_id = by_id
+        store._indexes = indexes
+        return store
+
+    # --- протокол последовательности ---
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[Task]:
+        return iter(self._tasks)
+
+    def __getitem__(self, idx):
+        return self._tasks[idx]
+
+    def __repr__(self) -> str:
+        return f"TaskStore({len(self._tasks)} tasks)"
+
+    @property
+    def tasks(self) -> PVector:
+        """Задачи хранилища (персистентный вектор)."""
+        return self._tasks
+
+    # --- выборки по индексам ---
+
+    def get(self, task_id: str) -> Optional[Task]:
+        """Первая задача с указанным ID или None."""
+        positions = self._by_id.get(task_id)
+        return self._tasks[positions[0]] if positions else None
+
+    def select(self, field: str, value: Optional[str]) -> Tuple[Task, ...]:
+        """Задачи, у которых `field == value`, в исходном порядке."""
+        tasks = self._tasks
+        return tuple(tasks[p] for p in self._indexes[field].get(value, _EMPTY_POSITIONS))
+
+    def positions(self, field: str, value: Optional[str]) -> Positions:
+        """Позиции задач с `field == value` (по возрастанию)."""
+        return self._indexes[field].get(value, _EMPTY_POSITIONS)
+
+    def count(self, field: str, value: Optional[str]) -> int:
+        """Количество задач с `field == value` без материализации выборки."""
+        return len(self._indexes[field].get(value, _EMPTY_POSITIONS))
+
+    def counts(self, field: str) -> Dict[Optional[str], int]:
+        """Количество задач по каждому значению поля."""
+        return {k: len(v) for k, v in self._indexes[field].items() if v}
+
+    # --- неизменяемые обновления ---
+
+    def add(self, task: Task) -> "TaskStore":
+        """Вернуть новое хранилище с добавленной задачей за O(log n).
+
+        Обновляются только корзины, в которые попадает новая задача.
+        """
+        pos = len(self._tasks)
+        by_id = self._by_id.set(task.id, self._by_id.get(task.id, ()) + (pos,))
+        indexes = {}
+        for f, index in self._indexes.items():
+            key = getattr(task, f)
+            indexes[f] = index.set(key, index.get(key, _EMPTY_POSITIONS).add(pos))
+        return TaskStore._from_parts(self._tasks.append(task), by_id, indexes)
+
+    def extend(self, tasks: Iterable[Task]) -> "TaskStore":
+        """Вернуть новое хранилище с несколькими добавленными задачами.
+
+        Вектор задач дописывается одним `extend`, а каждая затронутая
+        корзина индекса обновляется один раз за всю пачку.
+        """
+        tasks = tuple(tasks)
+        if not tasks:
+            return self
+        start = len(self._tasks)
+        by_id = self._by_id
+        for pos, task in enumerate(tasks, start):
+            by_id = by_id.set(task.id, by_id.get(task.id, ()) + (pos,))
+        indexes = {}
+        for f, index in self._indexes.items():
+            groups: Dict[Optional[str], List[int]] = {}
+            for pos, task in enumerate(tasks, start):
+                groups.setdefault(getattr(task, f), []).append(pos)
+            for key, positions in groups.items():
+                index = index.set(key, index.get(key, _EMPTY_POSITIONS).extend(positions))
+            indexes[f] = index
+        return TaskStore._from_parts(self._tasks.extend(tasks), by_id, indexes)
+
+    def _replace_at(self, updates: Dict[int, Task]) -> "TaskStore":
+        """Заменить задачи на указанных позициях, обновив затронутые корзины."""
+        tasks = self._tasks
+        by_id = self._by_id
+        indexes = dict(self._indexes)
+        for pos, new_task in updates.items():
+            old = tasks[pos]
+            tasks = tasks.set(pos, new_task)
+            if old.id != new_task.id:
+                rest = tuple(p for p in by_id[old.id] if p != pos)
+                by_id = by_id.set(old.id, rest) if rest else by_id.delete(old.id)
+                by_id = by_id.set(new_task.id, tuple(sorted(by_id.get(new_task.id, ()) + (pos,))))
+            for f in INDEXED_FIELDS:
+                old_key, new_key = getattr(old, f), getattr(new_task, f)
+                if old_key == new_key:
+                    continue
+                index = indexes[f]
+                left = index[old_key].discard(pos)
+                index = index.set(old_key, left) if left else index.delete(old_key)
+                index = index.set(new_key, index.get(new_key, _EMPTY_POSITIONS).add(pos))
+                indexes[f] = index
+        return TaskStore._from_parts(tasks, by_id, indexes)
+
+    def replace(self, task_id: str, new_task: Task) -> "TaskStore":
+        """Вернуть новое хранилище, где задачи с `task_id` заменены на `new_task`.
+
+        Если задача не найдена — возвращается то же хранилище.
+        """
+        positions = self._by_id.get(task_id)
+        if not positions:
+            return self
+        return self._replace_at({pos: new_task for pos in positions})
+
+    def apply_delta(self, delta: "EntityDelta") -> "TaskStore":
+        """Применить разницу seed.json: заменить изменённые, дописать новые, убрать удалённые.
+
+        Замены и добавления обновляют только затронутые корзины; удаление
+        сдвигает позиции, поэтому при нём хранилище перестраивается.
+        """
+        store = self
+        if delta.removed:
+            gone = {t.id for t in delta.removed}
+            store = TaskStore(t for t in store if t.id not in gone)
+        updates = {}
+        for _, new in delta.changed:
+            for pos in store._by_id.get(new.id, ()):
+                updates[pos] = new
+        if updates:
+            store = store._replace_at(updates)
+        return store.extend(delta.added)
+
+    def with_status(self, task_id: str, new_status: str, updated: Optional[str] = None) -> "TaskStore":
+        """Неизменяемо сменить статус задач с `task_id` и обновить поле `updated` (по умолчанию — сейчас)."""
+        positions = self._by_id.get(task_id)
+        if not positions:
+            return self
+        now = updated or datetime.utcnow().isoformat()
+        updates = {}
+        for pos in positions:
+            t = self._tasks[pos]
+            updates[pos] = Task(
+                id=t.id,
+                project_id=t.project_id,
+                title=t.title,
+                desc=t.desc,
+                status=new_status,
+                priority=t.priority,
+                assignee=t.assignee,
+                created=t.created,
+                updated=now
+            )
+        return self._replace_at(updates)
+
+
+TaskCollection = Union[Tuple[Task, ...], PVector, TaskStore, "TaskTable", "SqliteTaskStore"]
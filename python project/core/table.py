@@ -0,0 +1,206 @@
+# core/table.py
+"""Колоночное (struct-of-arrays) представление задач на NumPy.
+
+`TaskTable` хранит задачи не объектами, а столбцами: категориальные поля
+(`status`, `priority`, `project_id`, `assignee`) — массивами маленьких целых
+кодов со словарём значений, `created`/`updated` — int64 микросекундами от
+эпохи (UTC), а текстовые поля — обычными кортежами строк.
+
+Фильтры и подсчёты по группам выполняются векторно (маски и `bincount`),
+а объекты `Task` собираются только для строк, попавших в результат.
+NumPy — необязательная зависимость: модуль импортируется без неё, но
+построение таблицы требует установленного `numpy`.
+"""
+
+import warnings
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - зависит от окружения
+    np = None
+
+from .domain import Task, iso_to_us, us_to_iso
+
+CATEGORICAL_FIELDS = ("status", "priority", "project_id", "assignee")
+STATUSES = ("todo", "in_progress", "review", "done")
+PRIORITIES = ("low", "medium", "high", "critical")
+
+NAT = -(2 ** 63)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("TaskTable требует numpy: pip install numpy")
+
+
+def _encode(values: Iterable[Optional[str]], seed_vocab: Tuple[str, ...] = ()):
+    """Закодировать значения словарём: вернуть (коды, словарь)."""
+    vocab = {v: i for i, v in enumerate(seed_vocab)}
+    codes = [vocab.setdefault(v, len(vocab)) for v in values]
+    dtype = np.min_scalar_type(max(len(vocab) - 1, 0))
+    return np.array(codes, dtype=dtype), tuple(vocab)
+
+
+def _timestamps(values: Iterable[str]):
+    """Разобрать ISO-строки в int64; строки, не восстанавливаемые из числа, запомнить.
+
+    Обычно разбор идёт векторно через `datetime64`; если NumPy не принимает
+    какую-то строку (часовой пояс, мусор), используется построчный разбор.
+    """
+    values = list(values)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            parsed = np.array(values, dtype="datetime64[us]")
+    except (TypeError, ValueError, Warning):
+        return _timestamps_slow(values)
+    out = parsed.astype(np.int64)
+    whole = out % 1_000_000 == 0
+    back = np.where(whole, np.datetime_as_string(parsed, unit="s"), np.datetime_as_string(parsed, unit="us"))
+    mismatch = np.flatnonzero((back != np.array(values, dtype=str)) | (out == NAT))
+    return out, {int(i): values[i] for i in mismatch}
+
+
+def _timestamps_slow(values: Iterable[str]):
+    out = []
+    raw: Dict[int, str] = {}
+    for i, s in enumerate(values):
+        try:
+            us = iso_to_us(s)
+        except (TypeError, ValueError):
+            out.append(NAT)
+            raw[i] = s
+            continue
+        out.append(us)
+        if us_to_iso(us) != s:
+            raw[i] = s
+    return np.array(out, dtype=np.int64), raw
+
+
+class TaskTable:
+    """Неизменяемая колоночная таблица задач.
+
+    Ведёт себя как последовательность `Task` (объекты собираются по
+    требованию), поэтому любая функция, ожидающая кортеж, работает и с ней;
+    функции `core.transforms`/`core.report` распознают таблицу и используют
+    векторные пути.
+    """
+
+    __slots__ = ("ids", "titles", "descs", "codes", "vocab", "created", "updated", "_raw_created", "_raw_updated", "__weakref__")
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Task]) -> "TaskTable":
+        """Построить таблицу из задач (например, из результата `load_seed()`)."""
+        _require_numpy()
+        tasks = tuple(tasks)
+        table = cls.__new__(cls)
+        table.ids = tuple(t.id for t in tasks)
+        table.titles = tuple(t.title for t in tasks)
+        table.descs = tuple(t.desc for t in tasks)
+        seeds = {"status": STATUSES, "priority": PRIORITIES}
+        table.codes = {}
+        table.vocab = {}
+        for f in CATEGORICAL_FIELDS:
+            codes, vocab = _encode((getattr(t, f) for t in tasks), seeds.get(f, ()))
+            codes.flags.writeable = False
+            table.codes[f] = codes
+            table.vocab[f] = vocab
+        table.created, table._raw_created = _timestamps(t.created for t in tasks)
+        table.updated, table._raw_updated = _timestamps(t.updated for t in tasks)
+        table.created.flags.writeable = False
+        table.updated.flags.writeable = False
+        return table
+
+    # --- протокол последовательности ---
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> Task:
+        if i < 0:
+            i += len(self.ids)
+        return self._task(i)
+
+    def __iter__(self) -> Iterator[Task]:
+        return (self._task(i) for i in range(len(self.ids)))
+
+    def __repr__(self) -> str:
+        return f"TaskTable({len(self.ids)} tasks)"
+
+    def _value(self, field: str, i: int) -> Optional[str]:
+        return self.vocab[field][self.codes[field][i]]
+
+    def _task(self, i: int) -> Task:
+        return Task(
+            id=self.ids[i],
+            project_id=self._value("project_id", i),
+            title=self.titles[i],
+            desc=self.descs[i],
+            status=self._value("status", i),
+            priority=self._value("priority", i),
+            assignee=self._value("assignee", i),
+            created=self._raw_created[i] if i in self._raw_created else us_to_iso(self.created[i]),
+            updated=self._raw_updated[i] if i in self._raw_updated else us_to_iso(self.updated[i]),
+        )
+
+    # --- векторные фильтры ---
+
+    def code_of(self, field: str, value: Optional[str]) -> int:
+        """Код значения в словаре поля или -1, если значение не встречается."""
+        try:
+            return self.vocab[field].index(value)
+        except ValueError:
+            return -1
+
+    def mask_eq(self, field: str, value: Optional[str]):
+        """Булева маска строк, где `field == value`."""
+        code = self.code_of(field, value)
+        if code < 0:
+            return np.zeros(len(self.ids), dtype=bool)
+        return self.codes[field] == code
+
+    def mask_in(self, field: str, values: Iterable[Optional[str]]):
+        """Булева маска строк, где значение `field` входит в `values`."""
+        codes = [c for c in (self.code_of(field, v) for v in values) if c >= 0]
+        if not codes:
+            return np.zeros(len(self.ids), dtype=bool)
+        return np.isin(self.codes[field], codes)
+
+    def mask_created_between(self, start_iso: str, end_iso: str):
+        """Маска `start <= created <= end` по целочисленным меткам времени."""
+        return self.mask_created_between_us(iso_to_us(start_iso), iso_to_us(end_iso))
+
+    def mask_created_between_us(self, start: int, end: int):
+        """То же, что `mask_created_between`, для границ в микросекундах."""
+        return (self.created >= start) & (self.created <= end) & (self.created != NAT)
+
+    def select(self, mask) -> Tuple[Task, ...]:
+        """Собрать задачи для строк маски в исходном порядке."""
+        return tuple(self._task(int(i)) for i in np.flatnonzero(mask))
+
+    # --- подсчёты по группам ---
+
+    def count_by(self, field: str, mask=None) -> Dict[Optional[str], int]:
+        """Количество задач по значениям поля (только ненулевые группы)."""
+        codes = self.codes[field] if mask is None else self.codes[field][mask]
+        counts = np.bincount(codes, minlength=len(self.vocab[field]))
+        vocab = self.vocab[field]
+        return {vocab[c]: int(n) for c, n in enumerate(counts) if n}
+
+    def group_counts(self, fields: Tuple[str, ...], mask=None) -> Dict[tuple, int]:
+        """Количество задач по комбинациям значений нескольких полей."""
+        if not fields:
+            return {(): len(self.ids) if mask is None else int(np.count_nonzero(mask))}
+        if not len(self.ids):
+            return {}
+        sizes = tuple(len(self.vocab[f]) for f in fields)
+        codes = [self.codes[f].astype(np.intp) for f in fields]
+        flat = np.ravel_multi_index(codes, sizes)
+        if mask is not None:
+            flat = flat[mask]
+        keys, counts = np.unique(flat, return_counts=True)
+        result = {}
+        for key_codes, n in zip(zip(*np.unravel_index(keys, sizes)), counts):
+            result[tuple(self.vocab[f][c] for f, c in zip(fields, key_codes))] = int(n)
+        return result
@@ -1,14 +1,27 @@
 # core/transforms.py
 # Лабораторная работа #1: Чистые функции + иммутабельность + HOF
-from typing import Tuple, Callable, Dict, TYPE_CHECKING
-from .domain import Task, Comment, Project, User
-from functools import lru_cache, reduce
+from typing import Tuple, Callable, Dict, Iterable, Iterator, List, Optional, TYPE_CHECKING
+from .domain import Task, Comment, Project, User, iso_to_us
+from .cache import SLA_CACHE, SnapshotCache
+from .comments import comment_index
+from .persistent import PMap, PVector
+from .store import TaskStore, TaskCollection
+from .table import TaskTable
+from .sqlstore import SqliteTaskStore
+from .validation import compile_rules
+from functools import reduce
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 import operator
 
 if TYPE_CHECKING:
     from .ftypes import Maybe, Either
 
+DEADLINE_INDEXES = SnapshotCache()
+CREATED_INDEXES = SnapshotCache()
+COMMENT_INDEXES = SnapshotCache()
+ID_INDEXES = SnapshotCache()
+
 
 
 
@@ -21,21 +34,69 @@ if TYPE_CHECKING:
 
 # === Лаба1: Чистые функции + иммутабельность + HOF ===
 
-def add_task(tasks: Tuple[Task, ...], t: Task) -> Tuple[Task, ...]:
+def add_task(tasks: TaskCollection, t: Task) -> TaskCollection:
     """
     Чистая функция для добавления задачи в иммутабельный кортеж задач.
     Возвращает новый кортеж без изменения исходного.
+    Для `TaskStore` возвращает новое хранилище с обновлёнными индексами,
+    для `PVector` — новый вектор; в обоих случаях за O(log n).
+    `SqliteTaskStore` записывает задачу в базу и возвращает новый дескриптор.
     """
+    if isinstance(tasks, (TaskStore, SqliteTaskStore)):
+        return tasks.add(t)
+    if isinstance(tasks, PVector):
+        return _carry_id_index(tasks, tasks.append(t))
     return tasks + (t,)
 
-def filter_by_status(tasks: Tuple[Task, ...], status: str) -> Tuple[Task, ...]:
+def add_tasks(tasks: TaskCollection, new_tasks: Iterable[Task]) -> TaskCollection:
+    """
+    Добавить пачку задач одной структурной операцией.
+    `TaskStore` и `PVector` дописываются через `extend`, `SqliteTaskStore` —
+    одной транзакцией, кортеж — одной конкатенацией.
+    """
+    if isinstance(tasks, PVector):
+        return _carry_id_index(tasks, tasks.extend(new_tasks))
+    if isinstance(tasks, (TaskStore, SqliteTaskStore)):
+        return tasks.extend(new_tasks)
+    return tasks + tuple(new_tasks)
+
+def id_index(tasks: PVector) -> PMap:
+    """
+    Индекс `PVector` задач: ID -> кортеж позиций (как `TaskStore.by_id`).
+    Строится один раз на вектор, а `add_task`, `add_tasks` и `change_status`
+    переносят его на новый вектор, дописывая только новые позиции.
+    """
+    def build() -> PMap:
+        positions: Dict[str, List[int]] = {}
+        for pos, t in enumerate(tasks):
+            positions.setdefault(t.id, []).append(pos)
+        return PMap({k: tuple(v) for k, v in positions.items()})
+    return ID_INDEXES.get_or_build(tasks, build)
+
+def _carry_id_index(old: PVector, new: PVector) -> PVector:
+    """Перенести индекс ID со старого вектора на новый (новые задачи — в его конце)."""
+    index = ID_INDEXES.peek(old)
+    if index is not None:
+        for pos in range(len(old), len(new)):
+            task_id = new[pos].id
+            index = index.set(task_id, index.get(task_id, ()) + (pos,))
+        ID_INDEXES.put(new, index)
+    return new
+
+def filter_by_status(tasks: TaskCollection, status: str) -> Tuple[Task, ...]:
     """
     Чистая функция для фильтрации задач по статусу.
     Возвращает новый кортеж с отфильтрованными задачами.
+    Для `TaskStore` выборка берётся из индекса по статусу за O(k),
+    для `TaskTable` — по векторной маске, для `SqliteTaskStore` — запросом по индексу.
     """
+    if isinstance(tasks, (TaskStore, SqliteTaskStore)):
+        return tasks.select("status", status)
+    if isinstance(tasks, TaskTable):
+        return tasks.select(tasks.mask_eq("status", status))
     return tuple(t for t in tasks if t.status == status)
 
-def avg_tasks_per_user(tasks: Tuple[Task, ...]) -> float:
+def avg_tasks_per_user(tasks: TaskCollection) -> float:
     """
     Чистая функция для вычисления среднего количества задач на пользователя.
     Использует функциональный подход с reduce и именованной функцией.
@@ -44,6 +105,11 @@ def avg_tasks_per_user(tasks: Tuple[Task, ...]) -> float:
     2. Используем reduce для подсчета задач по пользователям через именованную функцию
     3. Вычисляем среднее количество задач на пользователя
     """
+    if isinstance(tasks, (TaskStore, TaskTable, SqliteTaskStore)):
+        counts = tasks.count_by("assignee") if isinstance(tasks, TaskTable) else tasks.counts("assignee")
+        user_counts = {a: n for a, n in counts.items() if a}
+        return sum(user_counts.values()) / len(user_counts) if user_counts else 0.0
+
     assigned = [t.assignee for t in tasks if t.assignee]
     if not assigned:
         return 0.0
@@ -105,71 +171,107 @@ def by_date_range(start_iso: str, end_iso: str) -> Callable[[Task], bool]:
     Возвращает лямбда-функцию-предикат.
 
     1. Функция принимает даты в ISO формате ("2024-01-01T00:00:00")
-    2. Преобразует строки в объекты datetime
+    2. Один раз преобразует строки в целые микросекунды от эпохи
     3. Возвращает лямбда-функцию, которая запоминает значения start и end
-    4. Лямбда проверяет, попадает ли дата создания задачи в диапазон
+    4. Лямбда сравнивает целые числа с уже разобранным `task.created_ts`
+       (задачи с неразбираемой датой в диапазон не попадают)
     """
-    start = datetime.fromisoformat(start_iso)
-    end = datetime.fromisoformat(end_iso)
+    start = iso_to_us(start_iso)
+    end = iso_to_us(end_iso)
     
-    return lambda task: start <= datetime.fromisoformat(task.created) <= end
+    return lambda task: task.created_ts is not None and start <= task.created_ts <= end
+
+
+class CreatedIndex:
+    """
+    Индекс задач, отсортированный по дате создания.
+
+    Запрос диапазона дат — два bisect и срез, поэтому узкое окно не
+    просматривает всю коллекцию. Результат возвращается в исходном порядке.
+    """
+
+    __slots__ = ("_tasks", "_ts", "_pos")
+
+    def __init__(self, tasks: TaskCollection):
+        pairs = sorted((t.created_ts, pos) for pos, t in enumerate(tasks) if t.created_ts is not None)
+        self._tasks = tasks
+        self._ts = [ts for ts, _ in pairs]
+        self._pos = [pos for _, pos in pairs]
+
+    def positions_between(self, start_us: int, end_us: int) -> List[int]:
+        """Позиции задач с `start_us <= created_ts <= end_us` по возрастанию."""
+        lo = bisect_left(self._ts, start_us)
+        hi = bisect_right(self._ts, end_us)
+        return sorted(self._pos[lo:hi])
+
+    def count_between(self, start_us: int, end_us: int) -> int:
+        """Количество задач в диапазоне без материализации выборки."""
+        return bisect_right(self._ts, end_us) - bisect_left(self._ts, start_us)
+
+    def between(self, start_iso: str, end_iso: str) -> Tuple[Task, ...]:
+        """Задачи, созданные в диапазоне [start, end] (включительно)."""
+        return tuple(self._tasks[p] for p in self.positions_between(iso_to_us(start_iso), iso_to_us(end_iso)))
+
+def created_index(tasks: TaskCollection) -> CreatedIndex:
+    """Индекс по дате создания для снимка задач (строится один раз на снимок)."""
+    return CREATED_INDEXES.get_or_build(tasks, lambda: CreatedIndex(tasks))
 
 
 # Рекурсивные функции
 def walk_comments(comments: Tuple[Comment, ...], task_id: str, idx: int = 0) -> Tuple[Comment, ...]:
     """
-    Рекурсивная функция для поиска комментариев по ID задачи.
-    Использует рекурсию с индексом для обхода кортежа.
-    Демонстрирует использование лямбды для проверки условия.
+    Поиск комментариев по ID задачи через индекс `task_id -> комментарии`.
 
-    1. Базовый случай: Если idx >= len(comments) - возвращаем пустой кортеж
-    2. Рекурсивный случай:
-        Берем текущий элемент: head = comments[idx]
-        Рекурсивно обрабатываем остальные элементы: tail = walk_comments(comments, task_id, idx + 1)
-        Используем лямбду для проверки условия: lambda c: c.task_id == task_id
-        Если текущий комментарий принадлежит нужной задаче: return (head,) + tail
-        Иначе: return tail
+    1. Индекс (`core.comments.CommentIndex`) строится за один проход
+       один раз на снимок комментариев и кэшируется; готовый индекс
+       можно передать вместо кортежа
+    2. Ответ — выборка из индекса, без рекурсии и без склейки кортежей
+    3. `idx` — как и раньше, позиция, с которой начинается поиск
     """
-    if idx >= len(comments):
-        return tuple()
-    
-    head = comments[idx]
-    tail = walk_comments(comments, task_id, idx + 1)
-    
-    # Используем лямбду для проверки условия
-    is_target_task = lambda comment: comment.task_id == task_id
-    
-    if is_target_task(head):
-        return (head,) + tail
-    return tail
+    index = COMMENT_INDEXES.get_or_build(comments, lambda: comment_index(comments))
+    if idx <= 0:
+        return index.for_task(task_id)
+    return tuple(index[p] for p in index.positions(task_id) if p >= idx)
 
 
-def traverse_tasks(tasks: Tuple[Task, ...], status_order: Tuple[str, ...], idx: int = 0) -> Tuple[str, ...]:
+def iter_traverse_tasks(tasks: TaskCollection, status_order: Tuple[str, ...], idx: int = 0) -> Iterator[str]:
     """
-    Рекурсивная функция для обхода задач в определенном порядке статусов.
-    Возвращает кортеж ID задач в указанном порядке статусов.
-    Демонстрирует использование лямбды для проверки статуса.
+    Генератор ID задач в порядке статусов из `status_order`.
 
-    1. Базовый случай: Если idx >= len(tasks) - возвращаем пустой кортеж
-    2. Рекурсивный случай:
-        Берем текущую задачу: head = tasks[idx]
-        Рекурсивно обрабатываем остальные: tail = traverse_tasks(tasks, status_order, idx + 1)
-        Используем лямбду для проверки статуса: lambda s: s in status_order
-        Если статус задачи входит в status_order: return (head.id,) + tail
-        Иначе: return tail
+    1. За один проход раскладываем ID по корзинам статусов (для `TaskStore`
+       корзины уже есть — это индекс по статусу)
+    2. Выдаем корзины в порядке `status_order`, внутри корзины — в исходном порядке
+    3. Задачи со статусом вне `status_order` пропускаются; `idx` — позиция,
+       с которой начинается обход
     """
-    if idx >= len(tasks):
-        return tuple()
-    
-    head = tasks[idx]
-    tail = traverse_tasks(tasks, status_order, idx + 1)
-    
-    # Используем лямбду для проверки статуса
-    is_valid_status = lambda status: status in status_order
-    
-    if is_valid_status(head.status):
-        return (head.id,) + tail
-    return tail
+    order = tuple(dict.fromkeys(status_order))
+    if isinstance(tasks, SqliteTaskStore):
+        yield from tasks.ids_by_status(order, idx)
+        return
+    if isinstance(tasks, TaskStore):
+        for status in order:
+            for p in tasks.positions("status", status):
+                if p >= idx:
+                    yield tasks[p].id
+        return
+    buckets: Dict[str, List[str]] = {status: [] for status in order}
+    for i, task in enumerate(tasks):
+        if i < idx:
+            continue
+        bucket = buckets.get(task.status)
+        if bucket is not None:
+            bucket.append(task.id)
+    for status in order:
+        yield from buckets[status]
+
+def traverse_tasks(tasks: TaskCollection, status_order: Tuple[str, ...], idx: int = 0) -> Tuple[str, ...]:
+    """
+    Обход задач в определенном порядке статусов.
+    Возвращает кортеж ID задач: сначала задачи первого статуса из
+    `status_order`, затем второго и т.д. Линейное время, без рекурсии;
+    для потоковой выдачи без материализации — `iter_traverse_tasks`.
+    """
+    return tuple(iter_traverse_tasks(tasks, status_order, idx))
 
     """UI: Фильтры задач в Streamlit находятся в app/main.py в функции show_lab2_filters_page (517)"""
 
@@ -188,38 +290,124 @@ def traverse_tasks(tasks: Tuple[Task, ...], status_order: Tuple[str, ...], idx:
 
 # === Лаба3: Продвинутая рекурсия + мемоизация ===
 
+# Индекс сроков SLA: правило -> (порог в днях, пропускать done, только critical)
+SLA_RULES: Dict[str, Tuple[int, bool, bool]] = {
+    "overdue_7_days": (7, True, False),
+    "overdue_14_days": (14, True, False),
+    "critical_overdue": (3, False, True),
+}
+
+_DAY_US = 86_400_000_000
+_HOUR_US = 3_600_000_000
+
+def now_to_us(now: Optional[datetime]) -> int:
+    """Момент `now` (по умолчанию — текущее время UTC) в микросекундах от эпохи."""
+    return iso_to_us((now or datetime.utcnow()).isoformat())
+
+def _has_offset(iso: str) -> bool:
+    """Есть ли в ISO-строке часовой пояс (`Z` или `±hh:mm` после даты)."""
+    rest = iso[10:]
+    return "+" in rest or "-" in rest or "Z" in rest
+
+def task_deadlines(task: Task, rules: Iterable[str]) -> List[Tuple[str, int]]:
+    """(правило, момент просрочки в мкс) для правил SLA, под которые подпадает задача.
+
+    Дата создания берётся из уже разобранного `task.created_ts`.
+    """
+    created_us = task.created_ts
+    if created_us is None:
+        return []
+    # Наивное `now` несравнимо с датой с часовым поясом — как и в полном проходе, такие задачи пропускаем
+    if _has_offset(task.created):
+        return []
+    out = []
+    for rule in rules:
+        days, skip_done, only_critical = SLA_RULES[rule]
+        if skip_done and task.status == "done":
+            continue
+        if only_critical and task.priority != "critical":
+            continue
+        out.append((rule, created_us + (days + 1) * _DAY_US))
+    return out
+
+class DeadlineIndex:
+    """
+    Отсортированный индекс сроков по правилам SLA.
+
+    Для каждого правила хранит пары (момент просрочки, позиция задачи),
+    отсортированные по моменту. Задача просрочена по правилу, если прошло
+    больше N полных дней, то есть с момента `created + (N + 1) дней`.
+    Вопрос «что просрочено сейчас» — это bisect и срез, а «что станет
+    просроченным в ближайшие N часов» — срез между двумя bisect.
+    """
+
+    __slots__ = ("_tasks", "_due", "_pos")
+
+    def __init__(self, tasks: TaskCollection, rules: Tuple[str, ...] = tuple(SLA_RULES)):
+        entries = {rule: [] for rule in rules if rule in SLA_RULES}
+        for pos, task in enumerate(tasks):
+            for rule, due_us in task_deadlines(task, entries):
+                entries[rule].append((due_us, pos))
+        self._tasks = tasks
+        self._due: Dict[str, List[int]] = {}
+        self._pos: Dict[str, List[int]] = {}
+        for rule, bucket in entries.items():
+            bucket.sort()
+            self._due[rule] = [d for d, _ in bucket]
+            self._pos[rule] = [p for _, p in bucket]
+
+    def _overdue_positions(self, rules: Tuple[str, ...], now_us: int) -> set:
+        positions = set()
+        for rule in rules:
+            if rule in self._due:
+                positions.update(self._pos[rule][:bisect_right(self._due[rule], now_us)])
+        return positions
+
+    def overdue(self, rules: Tuple[str, ...], now: Optional[datetime] = None) -> Tuple[Task, ...]:
+        """Задачи, просроченные хотя бы по одному правилу на момент `now` (в исходном порядке)."""
+        positions = self._overdue_positions(rules, now_to_us(now))
+        return tuple(self._tasks[p] for p in sorted(positions))
+
+    def due_within(self, rules: Tuple[str, ...], hours: float, now: Optional[datetime] = None) -> Tuple[Task, ...]:
+        """Задачи, которые станут просроченными в ближайшие `hours` часов (по возрастанию срока)."""
+        now_us = now_to_us(now)
+        end_us = now_us + int(hours * _HOUR_US)
+        already = self._overdue_positions(rules, now_us)
+        first_due: Dict[int, int] = {}
+        for rule in rules:
+            if rule not in self._due:
+                continue
+            due = self._due[rule]
+            lo, hi = bisect_right(due, now_us), bisect_right(due, end_us)
+            for d, p in zip(due[lo:hi], self._pos[rule][lo:hi]):
+                if p not in already and (p not in first_due or d < first_due[p]):
+                    first_due[p] = d
+        return tuple(self._tasks[p] for p in sorted(first_due, key=lambda p: (first_due[p], p)))
+
+def deadline_index(tasks: TaskCollection) -> DeadlineIndex:
+    """Индекс сроков для снимка задач (строится один раз на снимок и кэшируется)."""
+    return DEADLINE_INDEXES.get_or_build(tasks, lambda: DeadlineIndex(tasks))
+
 # Дорогая функция с кэшированием
-@lru_cache(maxsize=128)
-def overdue_tasks(tasks: Tuple[Task, ...], rules: Tuple[str, ...]) -> Tuple[Task, ...]:
+def overdue_tasks(tasks: TaskCollection, rules: Tuple[str, ...], now: Optional[datetime] = None) -> Tuple[Task, ...]:
     """
     Дорогая функция для подсчета просроченных задач по SLA.
     Использует мемоизацию для кэширования результатов.
+
+    Кэш (`core.cache.SLA_CACHE`) опознаёт снимок задач по идентичности объекта,
+    а не по хешу всего кортежа, и учитывает окно времени, поэтому результат
+    не устаревает, когда идут часы. `now` позволяет посчитать на заданный момент.
+    При промахе ответ берётся из индекса сроков (`DeadlineIndex`) через bisect.
+    Изменяемое `TaskViews` не кэшируется: его сроки и так поддерживаются событиями.
     """
-    from datetime import datetime, timedelta
-    
-    now = datetime.utcnow()
-    overdue = []
-    
-    for task in tasks:
-        try:
-            created = datetime.fromisoformat(task.created)
-            days_passed = (now - created).days
-            
-            # Проверяем правила SLA
-            for rule in rules:
-                if rule == "overdue_7_days" and days_passed > 7 and task.status != "done":
-                    overdue.append(task)
-                    break
-                elif rule == "overdue_14_days" and days_passed > 14 and task.status != "done":
-                    overdue.append(task)
-                    break
-                elif rule == "critical_overdue" and task.priority == "critical" and days_passed > 3:
-                    overdue.append(task)
-                    break
-        except Exception:
-            continue
-    
-    return tuple(overdue)
+    from .views import TaskViews
+    if isinstance(tasks, TaskViews):
+        return tasks.overdue(rules, now)
+    return SLA_CACHE.get_or_compute(tasks, tuple(rules), lambda: deadline_index(tasks).overdue(rules, now), now)
+
+def overdue_within(tasks: TaskCollection, rules: Tuple[str, ...], hours: float, now: Optional[datetime] = None) -> Tuple[Task, ...]:
+    """Задачи, которые станут просроченными в ближайшие `hours` часов, без полного прохода."""
+    return deadline_index(tasks).due_within(rules, hours, now)
 
 def measure_cache_performance():
     """
@@ -253,13 +441,22 @@ def measure_cache_performance():
 
 # === Лаба4: Функциональные паттерны Maybe/Either ===
 
-def safe_task(tasks: Tuple[Task, ...], tid: str) -> 'Maybe[Task]':
+def safe_task(tasks: TaskCollection, tid: str) -> 'Maybe[Task]':
     """
     Безопасное получение задачи по ID с использованием Maybe.
     Возвращает Some(task) если задача найдена, иначе Nothing().
+    Для `TaskStore` поиск идёт по индексу за O(1), для `SqliteTaskStore` — по индексу `id`,
+    для `PVector` — по индексу ID (`id_index`), который переносится на следующие векторы.
     """
     from .ftypes import Some, Nothing
     
+    if isinstance(tasks, (TaskStore, SqliteTaskStore)):
+        task = tasks.get(tid)
+        return Some(task) if task is not None else Nothing()
+    if isinstance(tasks, PVector):
+        positions = id_index(tasks).get(tid)
+        return Some(tasks[positions[0]]) if positions else Nothing()
+
     for task in tasks:
         if task.id == tid:
             return Some(task)
@@ -269,54 +466,26 @@ def validate_task(t: Task, rules: Tuple[str, ...]) -> 'Either[dict, Task]':
     """
     Валидация задачи по правилам с использованием Either.
     Возвращает Right(task) если валидация прошла, иначе Left(ошибки).
+    Правила компилируются в `RuleSet` один раз на набор (`core.validation`).
     """
-    from .ftypes import Right, Left
-    
-    errors = []
-    
-    # Проверка обязательных полей
-    if not t.title or t.title.strip() == "":
-        errors.append("Title is required")
-    
-    if not t.desc or t.desc.strip() == "":
-        errors.append("Description is required")
-    
-    # Проверка статуса
-    valid_statuses = ("todo", "in_progress", "review", "done")
-    if t.status not in valid_statuses:
-        errors.append(f"Invalid status: {t.status}. Must be one of {valid_statuses}")
-    
-    # Проверка приоритета
-    valid_priorities = ("low", "medium", "high", "critical")
-    if t.priority not in valid_priorities:
-        errors.append(f"Invalid priority: {t.priority}. Must be one of {valid_priorities}")
-    
-    # Дополнительные правила валидации
-    for rule in rules:
-        if rule == "title_min_length" and len(t.title) < 3:
-            errors.append("Title must be at least 3 characters long")
-        elif rule == "desc_min_length" and len(t.desc) < 10:
-            errors.append("Description must be at least 10 characters long")
-        elif rule == "assignee_required" and t.status == "in_progress" and not t.assignee:
-            errors.append("Assignee is required for tasks in progress")
-    
-    if errors:
-        return Left({"errors": errors, "task_id": t.id})
-    
-    return Right(t)
+    return compile_rules(rules).validate(t)
 
-def create_task_pipeline(tasks: Tuple[Task, ...], new_task: Task, rules: Tuple[str, ...]) -> 'Either[dict, Tuple[Task, ...]]':
+def create_task_pipeline(tasks: TaskCollection, new_task: Task, rules: Tuple[str, ...]) -> 'Either[dict, TaskCollection]':
     """
     Пайплайн для создания задачи: создать задачу → проверить правила → сохранить.
     Использует функциональные паттерны Maybe/Either.
+    Правило `unique_id` отклоняет задачу, чей ID уже есть в `tasks`; проверка
+    идёт через `safe_task`, то есть по индексу, а не проходом по задачам.
     """
     from .ftypes import Right, Left
     
     # Шаг 1: Валидация задачи
-    validation_result = validate_task(new_task, rules)
+    ruleset = compile_rules(rules)
+    duplicate = ruleset.unique_id and safe_task(tasks, new_task.id).is_some()
+    validation_result = ruleset.validate(new_task, duplicate)
     
     # Шаг 2: Если валидация прошла, добавляем задачу
-    def add_validated_task(task: Task) -> Tuple[Task, ...]:
+    def add_validated_task(task: Task) -> TaskCollection:
         return add_task(tasks, task)
     
     return validation_result.map(add_validated_task)
@@ -0,0 +1,163 @@
+# core/validation.py
+"""Скомпилированные правила валидации задач и пакетная проверка.
+
+`compile_rules` один раз превращает кортеж имён правил (`title_min_length`,
+`desc_min_length`, `assignee_required`) вместе с обязательными проверками
+(заголовок, описание, статус, приоритет) в `RuleSet` — список проверок-
+функций. Неизвестные имена правил игнорируются, как и раньше. Правило
+`unique_id` зависит от коллекции, а не от одной задачи: `RuleSet` лишь
+отмечает его, а проверяют вызывающие (`create_task_pipeline`, `core.importer`).
+
+`validate_batch` проходит по коллекции один раз и возвращает только
+ошибки и число корректных задач, не создавая `Either` на каждую задачу.
+Для `TaskTable` категориальные проверки выполняются масками по кодам
+столбцов, а сообщения об ошибках собираются только для неудачных строк.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Iterable, List, Tuple
+
+from .domain import Task
+from .table import PRIORITIES, STATUSES, TaskTable
+
+if TYPE_CHECKING:
+    from .ftypes import Either
+
+
+@dataclass(frozen=True)
+class Check:
+    """Одна проверка: предикат ошибки и текст сообщения для задачи."""
+    name: str
+    fails: Callable[[Task], bool]
+    message: Callable[[Task], str]
+
+
+def _blank(value) -> bool:
+    return not value or value.isspace()
+
+
+BASE_CHECKS: Tuple[Check, ...] = (
+    Check("title_required", lambda t: _blank(t.title), lambda t: "Title is required"),
+    Check("desc_required", lambda t: _blank(t.desc), lambda t: "Description is required"),
+    Check("status", lambda t: t.status not in STATUSES,
+          lambda t: f"Invalid status: {t.status}. Must be one of {STATUSES}"),
+    Check("priority", lambda t: t.priority not in PRIORITIES,
+          lambda t: f"Invalid priority: {t.priority}. Must be one of {PRIORITIES}"),
+)
+
+RULES = {
+    "title_min_length": Check("title_min_length", lambda t: len(t.title) < 3,
+                              lambda t: "Title must be at least 3 characters long"),
+    "desc_min_length": Check("desc_min_length", lambda t: len(t.desc) < 10,
+                             lambda t: "Description must be at least 10 characters long"),
+    "assignee_required": Check("assignee_required", lambda t: t.status == "in_progress" and not t.assignee,
+                               lambda t: "Assignee is required for tasks in progress"),
+}
+
+UNIQUE_ID = "unique_id"
+
+
+def duplicate_error(t: Task) -> str:
+    return f"Duplicate task id: {t.id}"
+
+
+class RuleSet:
+    """Правила, разрешённые в список проверок один раз."""
+
+    __slots__ = ("rules", "checks", "unique_id", "_fails")
+
+    def __init__(self, rules: Iterable[str] = ()):
+        self.rules = tuple(rules)
+        self.checks = BASE_CHECKS + tuple(RULES[r] for r in self.rules if r in RULES)
+        self.unique_id = UNIQUE_ID in self.rules
+        self._fails = tuple(c.fails for c in self.checks)
+
+    def __repr__(self) -> str:
+        return f"RuleSet({self.rules!r})"
+
+    def is_valid(self, t: Task) -> bool:
+        for fails in self._fails:
+            if fails(t):
+                return False
+        return True
+
+    def errors(self, t: Task) -> List[str]:
+        """Сообщения всех нарушенных проверок в порядке правил."""
+        return [c.message(t) for c in self.checks if c.fails(t)]
+
+    def failure(self, t: Task, duplicate: bool = False) -> dict:
+        """Описание ошибки в том же виде, что и `Left` у `validate_task`."""
+        errors = self.errors(t)
+        if duplicate:
+            errors.append(duplicate_error(t))
+        return {"errors": errors, "task_id": t.id}
+
+    def validate(self, t: Task, duplicate: bool = False) -> 'Either[dict, Task]':
+        """Right(задача) или Left({"errors": [...], "task_id": id}).
+
+        `duplicate` — вызывающий уже выяснил, что ID задачи занят.
+        """
+        from .ftypes import Right, Left
+
+        if not duplicate and self.is_valid(t):
+            return Right(t)
+        return Left(self.failure(t, duplicate))
+
+
+@lru_cache(maxsize=32)
+def _compile(rules: Tuple[str, ...]) -> RuleSet:
+    return RuleSet(rules)
+
+
+def compile_rules(rules: Iterable[str] = ()) -> RuleSet:
+    """`RuleSet` для набора правил (скомпилированные наборы переиспользуются)."""
+    if isinstance(rules, RuleSet):
+        return rules
+    return _compile(tuple(rules))
+
+
+@dataclass(frozen=True)
+class BatchValidation:
+    """Итог пакетной проверки: число корректных задач и только ошибки."""
+    valid: int
+    failures: Tuple[dict, ...]
+
+    @property
+    def total(self) -> int:
+        return self.valid + len(self.failures)
+
+
+def validate_batch(tasks: Iterable[Task], rules: Iterable[str] = ()) -> BatchValidation:
+    """Проверить коллекцию задач за один проход; ошибки — в исходном порядке."""
+    ruleset = compile_rules(rules)
+    if isinstance(tasks, TaskTable):
+        return _validate_table(tasks, ruleset)
+    is_valid, failure = ruleset.is_valid, ruleset.failure
+    valid = 0
+    failures = []
+    for t in tasks:
+        if is_valid(t):
+            valid += 1
+        else:
+            failures.append(failure(t))
+    return BatchValidation(valid, tuple(failures))
+
+
+def _validate_table(table: TaskTable, ruleset: RuleSet) -> BatchValidation:
+    """Маска подозрительных строк по столбцам; задачи собираются только для них."""
+    import numpy as np
+
+    names = {c.name for c in ruleset.checks}
+    titles, descs = table.titles, table.descs
+    bad = ~table.mask_in("status", STATUSES) | ~table.mask_in("priority", PRIORITIES)
+    bad |= np.fromiter((_blank(s) for s in titles), bool, len(titles))
+    bad |= np.fromiter((_blank(s) for s in descs), bool, len(descs))
+    if "title_min_length" in names:
+        bad |= np.fromiter((len(s) < 3 for s in titles), bool, len(titles))
+    if "desc_min_length" in names:
+        bad |= np.fromiter((len(s) < 10 for s in descs), bool, len(descs))
+    if "assignee_required" in names:
+        bad |= table.mask_eq("status", "in_progress") & table.mask_in("assignee", (None, ""))
+    failures = tuple(ruleset.failure(t) for t in table.select(bad))
+    return BatchValidation(len(table) - len(failures), failures)
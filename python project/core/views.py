@@ -0,0 +1,232 @@
+# core/views.py
+"""Материализованные представления задач, обновляемые событиями EventBus.
+
+`TaskViews` хранит последние версии задач и поддерживает на каждом
+событии `task_created`/`task_updated` распределение по статусам, счётчики
+по проектам, загрузку по исполнителям и множество сроков SLA. Поэтому
+`overview_stats`, `project_overview_report` и `user_workload_report`
+отвечают из готовых счётчиков без прохода по задачам (`core.report`
+распознаёт представление и передаёт вызов ему), а просроченные задачи —
+это bisect по отсортированным срокам, как в `DeadlineIndex`.
+
+Нагрузки событий — те же, что понимает `core.service.apply_task_event`:
+задача (или словарь со всеми её полями) либо `{"id", "status"[, "updated"]}`.
+ID задач считаются уникальными (правило `unique_id`): повторный
+`task_created` заменяет задачу, обновление неизвестной задачи игнорируется.
+`verify(tasks, ...)` сравнивает представление с полным пересчётом отчётов.
+
+Представление изменяемое и потокобезопасное. Синхронная шина, `batch()`
+и `replay` доставляют события в порядке публикации. В асинхронном режиме
+у каждой подписки своя очередь, и порядок между `task_created` и
+`task_updated` не гарантирован: обновление может прийти раньше создания
+задачи и будет проигнорировано — для точных представлений используйте
+синхронную шину или сверяйтесь через `verify`.
+
+Сроки SLA поддерживаются только для правил `rules`, заданных при создании;
+`overdue` по другому правилу из `SLA_RULES` считает его проходом по задачам.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+
+from .domain import Event, Project, Task, User
+from .frp import Delivery, EventBus, Subscription
+from .service import task_with_status, task_from_payload
+from .transforms import SLA_RULES, now_to_us, task_deadlines
+
+STATUSES = ("todo", "in_progress", "review", "done")
+VIEW_EVENTS = ("task_created", "task_updated")
+
+_AFTER_ALL = float("inf")
+
+
+def _bump(counts: Dict[Any, Dict[str, int]], key: Any, status: str, n: int) -> None:
+    bucket = counts.setdefault(key, {})
+    bucket[status] = bucket.get(status, 0) + n
+    if not bucket[status]:
+        del bucket[status]
+        if not bucket:
+            del counts[key]
+
+
+def _breakdown(by_status: Dict[str, int]) -> Dict[str, int]:
+    counts = {"total": sum(by_status.values())}
+    for status in STATUSES:
+        counts[status] = by_status.get(status, 0)
+    return counts
+
+
+class TaskViews:
+    """Счётчики и сроки по задачам, поддерживаемые событиями (см. модуль).
+
+    Как последовательность отдаёт текущие версии задач в порядке создания.
+    """
+
+    __slots__ = ("rules", "version", "_lock", "_tasks", "_seq", "_next_seq", "_status",
+                 "_projects", "_users", "_assigned", "_due")
+
+    def __init__(self, tasks: Iterable[Task] = (), rules: Tuple[str, ...] = tuple(SLA_RULES)):
+        self.rules = tuple(r for r in rules if r in SLA_RULES)
+        self.version = 0  # применённых событий
+        self._lock = threading.RLock()
+        self._tasks: Dict[str, Task] = {}
+        self._seq: Dict[str, int] = {}  # порядковый номер создания задачи
+        self._next_seq = 0
+        self._status: Dict[str, int] = {}
+        self._projects: Dict[Any, Dict[str, int]] = {}
+        self._users: Dict[Any, Dict[str, int]] = {}
+        self._assigned = 0  # задач с непустым исполнителем
+        self._due: Dict[str, List[Tuple[int, int, str]]] = {rule: [] for rule in self.rules}
+        for task in tasks:
+            self._put(task)
+
+    # --- изменения ---
+
+    def _count(self, task: Task, n: int) -> None:
+        self._status[task.status] = self._status.get(task.status, 0) + n
+        if not self._status[task.status]:
+            del self._status[task.status]
+        _bump(self._projects, task.project_id, task.status, n)
+        _bump(self._users, task.assignee, task.status, n)
+        if task.assignee:
+            self._assigned += n
+        seq = self._seq[task.id]
+        for rule, due_us in task_deadlines(task, self.rules):
+            due = self._due[rule]
+            if n > 0:
+                insort(due, (due_us, seq, task.id))
+            else:
+                del due[bisect_left(due, (due_us, seq, task.id))]
+
+    def _put(self, task: Task) -> None:
+        old = self._tasks.get(task.id)
+        if old is not None:
+            self._count(old, -1)
+        else:
+            self._seq[task.id] = self._next_seq
+            self._next_seq += 1
+        self._tasks[task.id] = task
+        self._count(task, 1)
+
+    def apply(self, ev: Event) -> bool:
+        """Применить одно событие; False — событие не меняет представление."""
+        if ev.name not in VIEW_EVENTS:
+            return False
+        task = task_from_payload(ev.payload)
+        with self._lock:
+            if task is None:
+                payload = ev.payload
+                if ev.name != "task_updated" or not isinstance(payload, dict) or "status" not in payload:
+                    return False
+                old = self._tasks.get(payload.get("id"))
+                if old is None:
+                    return False
+                task = task_with_status(old, payload["status"], payload.get("updated"))
+            elif ev.name == "task_updated" and task.id not in self._tasks:
+                return False
+            self._put(task)
+            self.version += 1
+            return True
+
+    def apply_events(self, events: Delivery) -> int:
+        """Применить событие или пачку событий (обработчик подписки); вернуть число изменений."""
+        if isinstance(events, Event):
+            events = (events,)
+        with self._lock:
+            return sum(self.apply(ev) for ev in events)
+
+    def attach(self, bus: EventBus) -> Tuple[Subscription, ...]:
+        """Подписать представление на `task_created`/`task_updated` пачками."""
+        return tuple(bus.subscribe(name, self.apply_events, batch=True) for name in VIEW_EVENTS)
+
+    # --- последовательность задач ---
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[Task]:
+        with self._lock:
+            return iter(tuple(self._tasks.values()))
+
+    def __repr__(self) -> str:
+        return f"TaskViews({len(self._tasks)} tasks, version={self.version})"
+
+    def get(self, task_id: str) -> Optional[Task]:
+        """Текущая версия задачи или None."""
+        return self._tasks.get(task_id)
+
+    # --- отчёты без прохода по задачам ---
+
+    def overview_stats(self, projects: Tuple[Project, ...], users: Tuple[User, ...]) -> Dict[str, Any]:
+        """То же, что `core.report.overview_stats`, из счётчиков."""
+        with self._lock:
+            assignees = len(self._users) - sum(1 for k in (None, "") if k in self._users)
+            return {
+                "projects_count": len(projects),
+                "users_count": len(users),
+                "tasks_count": len(self._tasks),
+                "status_distribution": {s: self._status.get(s, 0) for s in STATUSES},
+                "avg_tasks_per_user": self._assigned / assignees if assignees else 0.0,
+            }
+
+    def project_overview(self, project_id: str) -> Dict[str, int]:
+        """То же, что `core.report.project_overview_report`."""
+        with self._lock:
+            return _breakdown(self._projects.get(project_id, {}))
+
+    def user_workload(self, users: Tuple[User, ...]) -> Dict[str, Dict[str, int]]:
+        """То же, что `core.report.user_workload_report` (время — по числу пользователей)."""
+        with self._lock:
+            return {user.name: _breakdown(self._users.get(user.id, {})) for user in users}
+
+    def overdue(self, rules: Tuple[str, ...], now: Optional[datetime] = None) -> Tuple[Task, ...]:
+        """Задачи, просроченные хотя бы по одному правилу на момент `now` (в порядке создания).
+
+        Правила, сроки которых не поддерживаются (не в `self.rules`), считаются
+        проходом по задачам; неизвестные `SLA_RULES` правила пропускаются.
+        """
+        now_us = now_to_us(now)
+        with self._lock:
+            found: Dict[int, str] = {}
+            untracked = [r for r in rules if r in SLA_RULES and r not in self._due]
+            for rule in rules:
+                due = self._due.get(rule)
+                if due is None:
+                    continue
+                for _, seq, task_id in due[:bisect_right(due, (now_us, _AFTER_ALL))]:
+                    found[seq] = task_id
+            if untracked:
+                for task_id, task in self._tasks.items():
+                    if any(due_us <= now_us for _, due_us in task_deadlines(task, untracked)):
+                        found[self._seq[task_id]] = task_id
+            return tuple(self._tasks[found[seq]] for seq in sorted(found))
+
+    # --- сверка ---
+
+    def verify(self, tasks: Iterable[Task], projects: Tuple[Project, ...] = (), users: Tuple[User, ...] = (),
+               now: Optional[datetime] = None) -> List[str]:
+        """Сверить представление с полным пересчётом отчётов по `tasks`.
+
+        Возвращает имена расходящихся отчётов (пустой список — всё совпадает).
+        """
+        from .report import group_counts, overview_stats, project_overview_report, user_workload_report
+        from .transforms import DeadlineIndex
+
+        tasks = tuple(tasks)
+        project_ids = set(self._projects) | {k for (k,) in group_counts(tasks, ("project_id",))}
+        project_ids |= {p.id for p in projects}
+        mismatched = []
+        if self.overview_stats(projects, users) != overview_stats(projects, users, tasks):
+            mismatched.append("overview_stats")
+        if any(self.project_overview(p) != project_overview_report(tasks, p) for p in project_ids):
+            mismatched.append("project_overview_report")
+        if self.user_workload(users) != user_workload_report(tasks, users):
+            mismatched.append("user_workload_report")
+        if self.rules:
+            now = now or datetime.utcnow()
+            expected = DeadlineIndex(tasks, self.rules).overdue(self.rules, now)
+            if {t.id for t in self.overdue(self.rules, now)} != {t.id for t in expected}:
+                mismatched.append("overdue_tasks")
+        return mismatched
@@ -0,0 +1,66 @@
+"""Пропускная способность EventBus с журналом событий на диске.
+
+Пример:
+    python scripts/bench_event_log.py --events 100000 --fsync-every 1 100 1000
+
+Публикует `--events` событий `task_created` (по одному и через
+`publish_many`) в шину с `EventLog` во временном каталоге и печатает
+событий в секунду для каждого значения `fsync_every`, а также скорость
+воспроизведения журнала.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.domain import Task  # noqa: E402
+from core.eventlog import EventLog  # noqa: E402
+from core.frp import EventBus  # noqa: E402
+
+
+def make_tasks(n: int):
+    return [
+        Task(f"t{i}", "p1", f"Задача {i}", "Описание задачи", "todo", "medium", "u1",
+             "2024-01-01T00:00:00", "2024-01-01T00:00:00")
+        for i in range(n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--fsync-every", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--batch", type=int, default=1000, help="размер пачки publish_many")
+    args = parser.parse_args()
+    tasks = make_tasks(args.events)
+
+    for fsync_every in args.fsync_every:
+        for mode in ("publish", "publish_many"):
+            with tempfile.TemporaryDirectory() as tmp:
+                bus = EventBus(log=EventLog(tmp, fsync_every=fsync_every))
+                n = args.events if fsync_every > 1 or mode == "publish_many" else min(args.events, 2000)
+                start = time.perf_counter()
+                if mode == "publish":
+                    for t in tasks[:n]:
+                        bus.publish("task_created", t)
+                else:
+                    for i in range(0, n, args.batch):
+                        bus.publish_many("task_created", tasks[i:i + args.batch])
+                bus.close()
+                elapsed = time.perf_counter() - start
+                print(f"fsync_every={fsync_every:<5} {mode:<13} {n / elapsed:>10.0f} событий/с ({n} событий)")
+                if mode == "publish_many" and fsync_every == args.fsync_every[-1]:
+                    log = EventLog(tmp)
+                    start = time.perf_counter()
+                    count = sum(1 for _ in log.replay())
+                    elapsed = time.perf_counter() - start
+                    log.close()
+                    print(f"{'replay':<26} {count / elapsed:>10.0f} событий/с")
+
+
+if __name__ == "__main__":
+    main()
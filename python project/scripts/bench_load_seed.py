@@ -0,0 +1,63 @@
+"""Сравнение последовательной и параллельной загрузки seed.json.
+
+Пример:
+    python scripts/bench_load_seed.py --tasks 200000 --workers 1 2 4 8
+
+Собирает во временном каталоге seed.json с `--tasks` задачами (задачи из
+data/seed.json, размноженные с новыми id) и печатает время `iter_seed`
+(последовательный разбор) и `load_seed_parallel` для каждого числа
+процессов, а также ускорение относительно последовательного разбора.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.data_loader import SEED, _collect, load_seed_parallel  # noqa: E402
+
+
+def make_seed(path: str, n_tasks: int) -> None:
+    with open(SEED, encoding="utf-8") as f:
+        data = json.load(f)
+    base = data["tasks"]
+    data["tasks"] = [dict(base[i % len(base)], id=f"t{i}") for i in range(n_tasks)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seed.json")
+        make_seed(path, args.tasks)
+        size_mb = os.path.getsize(path) / (1 << 20)
+        print(f"seed.json: {args.tasks} задач, {size_mb:.1f} МБ, CPU: {os.cpu_count()}")
+
+        serial = best_of(args.repeat, lambda: _collect(path))
+        print(f"{'последовательно':>16}: {serial:7.2f} с")
+        for workers in args.workers:
+            elapsed = best_of(args.repeat, lambda: load_seed_parallel(path, workers))
+            print(f"{workers:>6} процессов: {elapsed:7.2f} с  x{serial / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Память, занимаемая загруженными задачами.
+
+Пример:
+    python scripts/bench_memory.py --tasks 200000
+
+Собирает временный seed.json (как `bench_load_seed.py`), загружает задачи
+через `iter_seed` и печатает прирост памяти по `tracemalloc` в байтах на задачу.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bench_load_seed import make_seed  # noqa: E402
+from core.data_loader import iter_seed  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "seed.json")
+        make_seed(path, args.tasks)
+        gc.collect()
+        tracemalloc.start()
+        tasks = tuple(e for key, e in iter_seed(path) if key == "tasks")
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"{len(tasks)} задач: {current / len(tasks):.0f} байт на задачу (пик загрузки {peak / (1 << 20):.1f} МБ)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,36 @@
 import os
 import sys
 
+import pytest
+
 # Ensure project root is on sys.path so 'core' package is importable when running pytest from repo root
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
+
+from core.domain import Task  # noqa: E402
+
+
+def make_task(idx: int, status: str = "todo", assignee: str | None = None, priority: str = "medium",
+              project_id: str = "p1", created: str = "2024-01-01T00:00:00", desc: str = "Desc") -> Task:
+    """Задача `t<idx>` для тестов (`from conftest import make_task`)."""
+    return Task(
+        id=f"t{idx}",
+        project_id=project_id,
+        title=f"Task {idx}",
+        desc=desc,
+        status=status,
+        priority=priority,
+        assignee=assignee,
+        created=created,
+        updated=created,
+    )
+
+
+@pytest.fixture(params=["tuple", "sqlite"])
+def backend(request):
+    """Фабрика коллекции задач: обычный кортеж или SQLite-хранилище."""
+    if request.param == "tuple":
+        return tuple
+    from core.sqlstore import SqliteTaskStore
+    return lambda tasks: SqliteTaskStore(tasks=tasks)
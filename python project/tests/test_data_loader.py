@@ -0,0 +1,198 @@
+import json
+import struct
+import pytest
+from core.domain import Project, User, Task, Comment
+from core.data_loader import SEED, load_seed, iter_seed, iter_seed_batches
+
+
+def expected_from_json(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return (
+        tuple(Project(**p) for p in data.get("projects", [])),
+        tuple(User(**u) for u in data.get("users", [])),
+        tuple(Task(**t) for t in data.get("tasks", [])),
+        tuple(Comment(**c) for c in data.get("comments", [])),
+    )
+
+
+def test_load_seed_matches_json_load():
+    assert load_seed() == expected_from_json(SEED)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 4096])
+def test_iter_seed_handles_chunk_boundaries(tmp_path, chunk_size):
+    data = {
+        "version": 12345,
+        "meta": {"note": "пропускается", "nested": [1, 2, {"a": "}]"}]},
+        "users": [{"id": f"u{i}", "name": f"Пользователь \"{i}\"", "role": "dev"} for i in range(20)],
+        "projects": [],
+        "comments": [{"id": "c1", "task_id": "t1", "author": "u1", "text": "a,b]}", "ts": "2024-01-01T00:00:00"}],
+    }
+    path = tmp_path / "seed.json"
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    items = list(iter_seed(str(path), chunk_size=chunk_size))
+    assert [k for k, _ in items] == ["users"] * 20 + ["comments"]
+    assert items[3][1] == User(id="u3", name="Пользователь \"3\"", role="dev")
+    assert items[-1][1].text == "a,b]}"
+
+
+def test_iter_seed_batches_are_bounded():
+    batches = list(iter_seed_batches(batch_size=4))
+    assert all(0 < len(b) <= 4 for _, b in batches)
+    projects, users, tasks, comments = load_seed()
+    assert tuple(e for k, b in batches if k == "tasks" for e in b) == tasks
+
+
+def test_iter_seed_rejects_malformed_json(tmp_path):
+    path = tmp_path / "seed.json"
+    path.write_text('{"users": [{"id": "u1", "name": "x", "role": "dev"} {"id": "u2"}]}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_seed(str(path), chunk_size=8))
+
+
+def test_snapshot_roundtrip_and_fallbacks(tmp_path, monkeypatch):
+    import os
+    import shutil
+    from core import data_loader
+    seed = tmp_path / "seed.json"
+    snap = tmp_path / "seed.snapshot"
+    shutil.copy(SEED, seed)
+    monkeypatch.setattr(data_loader, "SEED", str(seed))
+    monkeypatch.setattr(data_loader, "SNAPSHOT", str(snap))
+    expected = expected_from_json(seed)
+
+    assert data_loader.load_snapshot() is None  # снимка ещё нет
+    data_loader.build_snapshot()
+    snapshot = data_loader.load_snapshot()
+    assert snapshot is not None
+    tasks = snapshot.section("tasks")
+    assert len(tasks) == len(expected[2]) and tasks[-1] == expected[2][-1]
+    assert tasks.column("status") == tuple(t.status for t in expected[2])
+    assert data_loader.load_seed() == expected
+
+    # тот же контент с новым mtime — снимок по-прежнему актуален (сверка по sha256)
+    os.utime(seed, ns=(1, 1))
+    assert data_loader.load_snapshot() is not None
+    # изменённый seed — снимок устарел, загрузка идёт из JSON
+    seed.write_text(json.dumps({"users": [{"id": "u1", "name": "A", "role": "dev"}]}), encoding="utf-8")
+    assert data_loader.load_snapshot() is None
+    assert data_loader.load_seed() == ((), (User("u1", "A", "dev"),), (), ())
+    # повреждённый снимок тоже не используется
+    snap.write_bytes(b"garbage")
+    assert data_loader.load_snapshot() is None
+
+
+def test_corrupt_snapshot_strings_fall_back_to_json(tmp_path, monkeypatch):
+    from core import data_loader, snapshot
+    seed = tmp_path / "seed.json"
+    snap = tmp_path / "seed.snapshot"
+    seed.write_text(json.dumps({"users": [{"id": "u1", "name": "Аня", "role": "dev"}]}), encoding="utf-8")
+    monkeypatch.setattr(data_loader, "SEED", str(seed))
+    monkeypatch.setattr(data_loader, "SNAPSHOT", str(snap))
+    expected = ((), (User("u1", "Аня", "dev"),), (), ())
+    data_loader.build_snapshot()
+    good = snap.read_bytes()
+    _, _, blob_pos = snapshot._STRINGS.unpack_from(good, snapshot._HEADER.size)
+    name_pos = good.index("Аня".encode(), blob_pos)
+
+    # битый UTF-8 в таблице строк: снимок отвергается при открытии
+    snap.write_bytes(good[:name_pos] + b"\xff" + good[name_pos + 1:])
+    assert data_loader.load_snapshot() is None
+    assert data_loader.load_seed() == expected
+
+    # id строки за пределами таблицы в данных секции: загрузка переходит на JSON
+    pos = snapshot._HEADER.size + snapshot._STRINGS.size
+    while True:
+        name, _, ncols, _, data_pos = snapshot._SECTION.unpack_from(good, pos)
+        if name.rstrip(b"\x00") == b"users":
+            break
+        pos += snapshot._SECTION.size
+    cell = data_pos + 4 * ncols  # первая ячейка первого столбца
+    snap.write_bytes(good[:cell] + struct.pack("<I", 10_000) + good[cell + 4:])
+    assert data_loader.load_snapshot() is not None
+    assert data_loader.load_seed() == expected
+
+
+def test_seed_watcher_publishes_only_changes(tmp_path):
+    import os
+    from core.data_loader import SECTIONS, SeedWatcher, seed_fingerprint
+    from core.frp import EventBus
+    from core.comments import CommentIndex
+    from core.store import TaskStore
+    from core.service import apply_seed_delta
+    from core.report import GROUP_COUNTS, group_counts
+
+    path = tmp_path / "seed.json"
+    data = json.loads(open(SEED, encoding="utf-8").read())
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    bus = EventBus()
+    events = []
+    bus.subscribe("seed_changed", events.append)
+    watcher = SeedWatcher(str(path), bus=bus)
+    tasks = tuple(watcher.current("tasks"))
+    seeded = SeedWatcher(str(path), seed=tuple(watcher.current(key) for key in SECTIONS), fingerprint=seed_fingerprint(str(path)))
+    store = TaskStore(tasks)
+    comments = CommentIndex(watcher.current("comments"))
+    by = ("project_id", "status")
+    groups = group_counts(tasks, by)
+
+    assert watcher.poll() is None
+    os.utime(path, ns=(1, 1))  # тот же контент — разницы нет
+    assert watcher.poll() is None
+
+    removed_id = data["tasks"][0]["id"]
+    data["tasks"][1]["status"] = "done" if data["tasks"][1]["status"] != "done" else "todo"
+    data["tasks"] = data["tasks"][1:] + [dict(data["tasks"][2], id="t_new")]
+    data["comments"][0]["text"] = "изменено"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    delta = watcher.poll()
+    assert [t.id for t in delta.tasks.added] == ["t_new"]
+    assert [new.id for _, new in delta.tasks.changed] == [data["tasks"][0]["id"]]
+    assert [t.id for t in delta.tasks.removed] == [removed_id]
+    assert len(delta.comments.changed) == 1 and not delta.users
+    assert events and events[0].payload is delta
+
+    expected = tuple(Task(**t) for t in data["tasks"])
+    reloaded = apply_seed_delta(tasks, delta.tasks)
+    assert reloaded == expected
+    assert GROUP_COUNTS.peek(reloaded) == {by: group_counts(expected, by)} and group_counts(reloaded, by) != groups
+    assert tuple(apply_seed_delta(store, delta.tasks)) == expected
+    assert seeded.poll() == delta
+    assert tuple(comments.apply_delta(delta.comments)) == tuple(Comment(**c) for c in data["comments"])
+
+
+@pytest.mark.parametrize("workers", [2, 3, 7])
+def test_load_seed_parallel_matches_serial(tmp_path, monkeypatch, workers):
+    from core import data_loader
+    monkeypatch.setattr(data_loader, "PARALLEL_MIN_BYTES", 0)
+    data = {
+        "projects": [{"id": f"p{i}", "name": f"Проект {i}", "owner": "u1"} for i in range(5)],
+        "meta": [{"id": "m1", "note": "пропускается"}],
+        "users": [{"id": f"u{i}", "name": f"Пользователь {i}", "role": "dev"} for i in range(40)],
+        "tasks": [
+            {"id": f"t{i}", "project_id": "p1", "title": "[{ не элемент", "desc": ', {"id": "ложный"}',
+             "status": "todo", "priority": "low", "assignee": None,
+             "created": "2024-01-01T00:00:00", "updated": "не дата"}
+            for i in range(60)
+        ],
+        "comments": [{"id": f"c{i}", "task_id": "t1", "author": "u1", "text": "ё" * i, "ts": "2024-01-02T00:00:00"} for i in range(30)],
+    }
+    path = tmp_path / "seed.json"
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+    serial = expected_from_json(str(path))
+    parallel = data_loader.load_seed_parallel(str(path), workers=workers, chunk_size=64)
+    assert parallel == serial
+    assert [t.created_ts for t in parallel[2]] == [t.created_ts for t in serial[2]]
+    assert parallel[2][0].updated_ts is None
+
+
+def test_loaded_entities_are_slotted_and_interned():
+    projects, users, tasks, comments = load_seed()
+    assert not hasattr(tasks[0], "__dict__")
+    by_status = {}
+    for t in tasks:
+        assert by_status.setdefault(t.status, t.status) is t.status
+    assert hash(tasks[0]) == hash(Task(**{f: getattr(tasks[0], f) for f in (
+        "id", "project_id", "title", "desc", "status", "priority", "assignee", "created", "updated")}))
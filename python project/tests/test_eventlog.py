@@ -0,0 +1,112 @@
+import os
+
+import pytest
+from core.domain import Event
+from core.eventlog import EventLog
+from core.frp import EventBus
+from core.persistent import PVector
+from core.report import group_counts
+from core.service import apply_task_event, replay_task_events
+from core.store import TaskStore
+from conftest import make_task
+
+
+def make_event(i, payload=None) -> Event:
+    return Event(id=f"e{i}", ts="2024-01-01T00:00:00", name="e", payload={"i": i} if payload is None else payload)
+
+
+def test_log_roundtrip_rotation_and_offsets(tmp_path):
+    log = EventLog(str(tmp_path), segment_bytes=512, fsync_every=3)
+    bus = EventBus(log=log)
+    bus.publish("task_created", make_task(0))
+    bus.publish_many("task_created", [make_task(i) for i in range(1, 10)])
+    bus.publish("task_updated", {"id": "t3", "status": "done", "updated": "2024-02-01T00:00:00"})
+    assert len(log) == 11 and len(log.segments()) > 1
+    replayed = list(log.replay(9))
+    assert [pos for pos, _ in replayed] == [9, 10]
+    assert replayed[0][1].payload == make_task(9)
+    assert [pos for pos, _ in log.replay(0, names=("task_updated",))] == [10]
+    bus.close()
+
+    reopened = EventLog(str(tmp_path))
+    assert reopened.next_offset == 11
+    assert [ev.payload for _, ev in reopened.replay(0)][:10] == [make_task(i) for i in range(10)]
+    reopened.close()
+
+
+def test_log_drops_torn_tail_on_open(tmp_path):
+    log = EventLog(str(tmp_path))
+    log.append_many(make_event(i) for i in range(3))
+    log.close()
+    (_, path), = log.segments()
+    with open(path, "ab") as f:
+        f.write(b'{"o": 3, "id": "x", "ts": "')
+    log = EventLog(str(tmp_path))
+    assert log.next_offset == 3
+    log.append(make_event(3))
+    assert [ev.payload["i"] for _, ev in log.replay()] == [0, 1, 2, 3]
+    log.close()
+
+
+@pytest.mark.parametrize("tail", [b'{"o": 3, "id": "x"}\n', b'{"o": 3, "id": "x", "ts": 1, "name": "e", "p": {"__type__": "Task"}}\n', b'[3]\n'])
+def test_log_drops_malformed_tail_on_open(tmp_path, tail):
+    log = EventLog(str(tmp_path))
+    log.append_many(make_event(i) for i in range(3))
+    log.close()
+    (_, path), = log.segments()
+    with open(path, "ab") as f:
+        f.write(tail)
+    assert EventLog(str(tmp_path)).next_offset == 3
+
+
+def test_replay_stops_at_partially_written_line(tmp_path):
+    log = EventLog(str(tmp_path))
+    log.append_many(make_event(i) for i in range(3))
+    log.sync()
+    (_, path), = log.segments()
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 5)  # последняя строка дописана не до конца
+    assert [pos for pos, _ in log.replay()] == [0, 1]
+
+
+def test_log_rejects_unknown_payload_types(tmp_path):
+    log = EventLog(str(tmp_path))
+    with pytest.raises(TypeError):
+        log.append(make_event(0, object()))
+    assert log.next_offset == 0
+    log.close()
+
+
+@pytest.mark.parametrize("initial", [(), PVector(), TaskStore()])
+def test_replay_rebuilds_tasks_after_restart(tmp_path, initial):
+    bus = EventBus(log=EventLog(str(tmp_path)))
+    tasks = ()
+    for i in range(5):
+        bus.publish("task_created", make_task(i))
+        tasks += (make_task(i),)
+    bus.publish("task_updated", {"id": "t2", "status": "review", "updated": "2024-03-01T00:00:00"})
+    bus.publish("task_updated", make_task(4, status="done"))
+    bus.close()
+
+    restarted = EventBus(log=EventLog(str(tmp_path)))
+    rebuilt = replay_task_events(initial, (ev for _, ev in restarted.log.replay()))
+    assert [(t.id, t.status) for t in rebuilt] == [("t0", "todo"), ("t1", "todo"), ("t2", "review"), ("t3", "todo"), ("t4", "done")]
+    assert rebuilt[2].updated == "2024-03-01T00:00:00"
+
+    seen = []
+    restarted.subscribe("task_created", seen.append, batch=True)
+    assert restarted.replay(2) == 7
+    assert [[ev.payload.id for ev in b] for b in seen] == [["t2", "t3", "t4"]]
+    restarted.close()
+
+
+@pytest.mark.parametrize("initial", [tuple, PVector])
+def test_task_update_event_keeps_cached_group_counts_exact(initial):
+    tasks = initial(make_task(i) for i in range(4))
+    assert group_counts(tasks, ("status",)) == {("todo",): 4}
+    updated = apply_task_event(tasks, Event(id="e", ts="2024-01-01T00:00:00", name="task_updated",
+                                            payload=make_task(0, status="done")))
+    assert updated[0].status == "done"
+    assert group_counts(updated, ("status",)) == {("todo",): 3, ("done",): 1}
+    missing = Event(id="e", ts="2024-01-01T00:00:00", name="task_updated", payload=make_task(9, status="done"))
+    assert apply_task_event(updated, missing) is updated
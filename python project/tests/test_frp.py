@@ -0,0 +1,228 @@
+import dataclasses
+import datetime
+import threading
+import time
+
+import pytest
+from core.domain import Event
+from core.frp import EventBus, DROP_NEWEST, DROP_OLDEST
+from core.metrics import LatencyHistogram
+
+
+def test_sync_mode_calls_handlers_in_publisher_thread():
+    bus = EventBus()
+    seen = []
+    bus.subscribe("task_created", lambda ev: seen.append((ev.payload["id"], threading.current_thread())))
+    ev = bus.publish("task_created", {"id": "t1"})
+    assert ev.name == "task_created"
+    assert seen == [("t1", threading.current_thread())]
+
+
+def test_async_mode_does_not_block_publisher_and_keeps_order():
+    bus = EventBus(mode="async", workers=2)
+    release = threading.Event()
+    slow, fast = [], []
+    bus.subscribe("task_created", lambda ev: (release.wait(5), slow.append(ev.payload["i"])))
+    bus.subscribe("task_created", lambda ev: fast.append(ev.payload["i"]))
+    start = time.perf_counter()
+    for i in range(20):
+        bus.publish("task_created", {"i": i})
+    assert time.perf_counter() - start < 1
+    assert not bus.flush(timeout=0.05)
+    release.set()
+    assert bus.flush(timeout=5)
+    assert slow == fast == list(range(20))
+    bus.close()
+    with pytest.raises(RuntimeError):
+        bus.publish("task_created", {})
+
+
+@pytest.mark.parametrize("policy, expected", [(DROP_NEWEST, [0, 1, 2]), (DROP_OLDEST, [0, 8, 9])])
+def test_async_drop_policies(policy, expected):
+    bus = EventBus(mode="async", workers=1)
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def handler(ev):
+        started.set()
+        release.wait(5)
+        seen.append(ev.payload["i"])
+
+    sub = bus.subscribe("e", handler, queue_size=2, policy=policy)
+    bus.publish("e", {"i": 0})
+    started.wait(5)  # событие 0 уже в обработке, очередь пуста
+    for i in range(1, 10):
+        bus.publish("e", {"i": i})
+    release.set()
+    bus.close()
+    assert seen == expected
+    assert sub.dropped == 7
+
+
+def test_async_block_policy_applies_backpressure():
+    bus = EventBus(mode="async", workers=1, queue_size=1)
+    seen = []
+    bus.subscribe("e", lambda ev: (time.sleep(0.001), seen.append(ev.payload["i"])))
+    for i in range(50):
+        bus.publish("e", {"i": i})
+    bus.close()
+    assert seen == list(range(50))
+
+
+def test_publish_many_delivers_batches_and_single_events():
+    bus = EventBus()
+    batches, singles = [], []
+    bus.subscribe("task_created", batches.append, batch=True)
+    bus.subscribe("task_created", singles.append)
+    events = bus.publish_many("task_created", [{"id": f"t{i}"} for i in range(3)])
+    bus.publish("task_created", {"id": "t3"})
+    assert batches == [events, (singles[-1],)]
+    assert [ev.payload["id"] for ev in singles] == ["t0", "t1", "t2", "t3"]
+
+
+def test_batch_context_delivers_runs_and_coalesces_updates():
+    bus = EventBus(coalesce={"task_updated": "id"})
+    created, updated = [], []
+    bus.subscribe("task_created", created.append, batch=True)
+    bus.subscribe("task_updated", updated.append, batch=True)
+    with bus.batch():
+        bus.publish("task_created", {"id": "t1"})
+        for status in ("in_progress", "review", "done"):
+            bus.publish("task_updated", {"id": "t1", "status": status})
+        bus.publish("task_updated", {"id": "t2", "status": "todo"})
+        with bus.batch():
+            bus.publish("task_created", {"id": "t2"})
+        assert not created and not updated
+    assert [[ev.payload["id"] for ev in b] for b in created] == [["t1"], ["t2"]]
+    assert [(ev.payload["id"], ev.payload["status"]) for ev in updated[0]] == [("t1", "done"), ("t2", "todo")]
+    assert bus.coalesced == 2
+
+
+def test_batch_keeps_order_across_interleaved_names():
+    bus = EventBus(coalesce={"task_updated": "id"})
+    seen = []
+    bus.subscribe("#", lambda evs: seen.append([(ev.name, ev.payload["id"]) for ev in evs]), batch=True)
+    with bus.batch():
+        bus.publish("task_updated", {"id": "t0", "status": "review"})
+        bus.publish("task_created", {"id": "t1"})
+        bus.publish("task_updated", {"id": "t1", "status": "todo"})
+        bus.publish("task_updated", {"id": "t1", "status": "done"})
+    assert seen == [[("task_updated", "t0")], [("task_created", "t1")], [("task_updated", "t1")]]
+    assert bus.coalesced == 1
+
+def test_close_rejects_late_publish_and_batch_exit():
+    bus = EventBus(mode="async", workers=2)
+    seen = []
+    bus.subscribe("e", seen.append)
+    with pytest.raises(RuntimeError, match="EventBus закрыт"):
+        with bus.batch():
+            bus.publish("e", 1)
+            bus.close()
+    with pytest.raises(RuntimeError):
+        bus.publish("e", 2)
+    with pytest.raises(RuntimeError):
+        bus.publish("unrouted", 3)
+    assert seen == []
+    bus.close()
+
+
+def test_async_batch_subscription():
+    bus = EventBus(mode="async", workers=2)
+    batches = []
+    bus.subscribe("e", batches.append, batch=True)
+    bus.publish_many("e", range(100))
+    bus.close()
+    assert len(batches) == 1 and [ev.payload for ev in batches[0]] == list(range(100))
+
+
+def test_topic_patterns_match_in_subscription_order():
+    bus = EventBus()
+    seen = []
+    for pattern in ("task.*", "task.updated.status", "task.#", "#", "user.*", "task.*.status"):
+        bus.subscribe(pattern, lambda ev, p=pattern: seen.append((p, ev.name)))
+    bus.publish("task.created", {})
+    bus.publish("task.updated.status", {})
+    bus.publish("task", {})
+    assert seen == [
+        ("task.*", "task.created"), ("task.#", "task.created"), ("#", "task.created"),
+        ("task.updated.status", "task.updated.status"), ("task.#", "task.updated.status"),
+        ("#", "task.updated.status"), ("task.*.status", "task.updated.status"),
+        ("task.#", "task"), ("#", "task"),
+    ]
+    with pytest.raises(ValueError):
+        bus.subscribe("task..x", seen.append)
+
+
+def test_unsubscribe_invalidates_cached_routes():
+    bus = EventBus()
+    seen = []
+    exact = bus.subscribe("task.created", lambda ev: seen.append("exact"))
+    bus.publish("task.created", {})
+    wildcard = bus.subscribe("task.*", lambda ev: seen.append("wildcard"))
+    bus.publish("task.created", {})
+    assert bus.unsubscribe(exact) and not bus.unsubscribe(exact)
+    bus.publish("task.created", {})
+    assert bus.unsubscribe(wildcard)
+    bus.publish("task.created", {})
+    assert seen == ["exact", "exact", "wildcard", "wildcard"]
+
+
+@pytest.mark.parametrize("ids", ["uuid", "counter", "ulid"])
+def test_event_ids_and_lazy_timestamp(ids):
+    bus = EventBus(ids=ids)
+    bus.subscribe("task_created", lambda ev: None)
+    events = [bus.publish("task_created", {"i": i}) for i in range(3)]
+    assert len({ev.id for ev in events}) == 3
+    if ids != "uuid":
+        assert [ev.id for ev in events] == sorted((ev.id for ev in events), key=lambda i: (len(i), i))
+    ev = events[0]
+    assert ev.ts == (datetime.datetime(1970, 1, 1) + datetime.timedelta(microseconds=ev.ts_us)).isoformat()
+    assert ev == Event(id=ev.id, ts=ev.ts, name="task_created", payload={"i": 0})
+
+
+def test_publish_without_recipients_skips_event_id():
+    bus = EventBus(ids="counter")
+    ev = bus.publish("task_created", {"i": 0})
+    assert isinstance(ev, Event) and ev.id == "" and ev.payload == {"i": 0} and ev.ts
+    assert [e.id for e in bus.publish_many("task_created", [{}, {}])] == ["", ""]
+    bus.subscribe("task_created", lambda ev: None)
+    assert bus.publish("task_created", {}).id == "1"
+    assert [f.name for f in dataclasses.fields(Event)] == ["id", "ts", "name", "payload"]
+    with pytest.raises(ValueError):
+        EventBus(ids="random")
+
+
+def test_latency_histogram_percentiles_within_bucket_error():
+    hist = LatencyHistogram()
+    for ns in range(1, 10_001):
+        hist.record(ns * 1000)
+    assert hist.count == 10_000 and hist.max == 10_000_000
+    for q in (50, 95, 99):
+        assert abs(hist.percentile(q) - q * 100_000) <= 0.25 * q * 100_000
+    assert LatencyHistogram().percentile(99) == 0.0
+
+
+def test_instrumented_bus_counts_calls_latency_and_errors(caplog):
+    bus = EventBus(metrics=True)
+
+    def failing(ev):
+        raise ValueError(ev.payload["i"])
+
+    bus.subscribe("task.*", lambda ev: time.sleep(0.002))
+    bus.subscribe("task.created", failing)
+    for i in range(3):
+        bus.publish("task.created", {"i": i})
+    bus.publish("task.updated", {"i": 9})
+    snap = bus.metrics_snapshot()
+    assert snap["events"] == {"task.created": 3, "task.updated": 1}
+    slow, failed = snap["handlers"]
+    assert (slow["event"], slow["calls"], slow["errors"]) == ("task.*", 4, 0)
+    assert slow["p50_ms"] >= 1.5 and slow["total_ms"] >= 8
+    assert failed["handler"].endswith("failing") and (failed["calls"], failed["errors"]) == (3, 3)
+    assert failed["last_error"] == repr(ValueError(2))
+
+    bus.instrument(False)
+    bus.publish("task.created", {"i": 3})
+    assert bus.metrics_snapshot() is None
+    errors = [r for r in caplog.records if r.name == "core.frp"]
+    assert len(errors) == 4 and all(r.exc_info and r.exc_info[0] is ValueError for r in errors)
@@ -0,0 +1,50 @@
+from core.data_loader import load_seed
+from core.store import TaskStore
+from core.report import (
+    group_counts, rollup, overview_stats, project_overview_report,
+    user_workload_report, generate_summary_report,
+)
+from conftest import make_task
+
+
+
+TASKS = (
+    make_task(1, status="todo", assignee="u1", project_id="p1"),
+    make_task(2, status="done", assignee="u1", project_id="p2"),
+    make_task(3, status="todo", assignee="u2", project_id="p1", priority="high"),
+    make_task(4, status="review", project_id="p2"),
+)
+
+
+def test_group_counts_any_field_combination():
+    assert group_counts(TASKS, ("status",)) == {("todo",): 2, ("done",): 1, ("review",): 1}
+    assert group_counts(TASKS, ("project_id", "status")) == {
+        ("p1", "todo"): 2,
+        ("p2", "done"): 1,
+        ("p2", "review"): 1,
+    }
+    assert group_counts(TASKS, ("assignee",), where={"project_id": "p1"}) == {("u1",): 1, ("u2",): 1}
+    assert group_counts(TASKS, (), where={"priority": "high"}) == {(): 1}
+
+
+def test_group_counts_same_for_store():
+    store = TaskStore(TASKS)
+    for by in (("status",), ("assignee", "status"), ("project_id", "assignee", "priority")):
+        assert group_counts(store, by) == group_counts(TASKS, by)
+    assert group_counts(store, ("status",), where={"project_id": "p2", "assignee": None}) == {("review",): 1}
+
+
+def test_rollup_sums_dropped_fields():
+    by = ("project_id", "status")
+    groups = group_counts(TASKS, by)
+    assert rollup(groups, by, ("status",)) == group_counts(TASKS, ("status",))
+    assert rollup(groups, by, ()) == {(): 4}
+
+
+def test_summary_report_matches_individual_reports():
+    projects, users, tasks, _ = load_seed()
+    summary = generate_summary_report(projects, users, tasks)
+    assert summary["overview"] == overview_stats(projects, users, tasks)
+    assert summary["user_workload"] == user_workload_report(tasks, users)
+    for p in projects:
+        assert summary["project_stats"][p.name] == project_overview_report(tasks, p.id)
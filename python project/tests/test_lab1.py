@@ -18,8 +18,8 @@ def make_task(idx: int, status: str = "todo", assignee: str | None = None, prior
     )
 
 
-def test_add_task_returns_new_tuple_immutability():
-    tasks = (make_task(1),)
+def test_add_task_returns_new_tuple_immutability(backend):
+    tasks = backend((make_task(1),))
     t2 = make_task(2)
     new_tasks = add_task(tasks, t2)
     assert tasks is not new_tasks
@@ -28,44 +28,44 @@ def test_add_task_returns_new_tuple_immutability():
     assert new_tasks[-1] == t2
 
 
-def test_filter_by_status_only_matches_requested():
-    tasks = (
+def test_filter_by_status_only_matches_requested(backend):
+    tasks = backend((
         make_task(1, status="todo"),
         make_task(2, status="done"),
         make_task(3, status="in_progress"),
         make_task(4, status="todo"),
-    )
+    ))
     only_todo = filter_by_status(tasks, "todo")
     assert all(t.status == "todo" for t in only_todo)
     assert len(only_todo) == 2
 
 
-def test_avg_tasks_per_user_no_assignees_is_zero():
-    tasks = (make_task(1), make_task(2))
+def test_avg_tasks_per_user_no_assignees_is_zero(backend):
+    tasks = backend((make_task(1), make_task(2)))
     assert avg_tasks_per_user(tasks) == 0.0
 
 
-def test_avg_tasks_per_user_multiple_users():
-    tasks = (
+def test_avg_tasks_per_user_multiple_users(backend):
+    tasks = backend((
         make_task(1, assignee="u1"),
         make_task(2, assignee="u1"),
         make_task(3, assignee="u2"),
         make_task(4, assignee="u3"),
-    )
+    ))
     # counts: u1=2, u2=1, u3=1 -> avg = 4/3
     assert pytest.approx(avg_tasks_per_user(tasks), rel=1e-9) == 4 / 3
 
 
-def test_overview_stats_counts_and_distribution():
+def test_overview_stats_counts_and_distribution(backend):
     projects = (Project(id="p1", name="P1", owner="o1"),)
     users = (User(id="u1", name="U1", role="dev"), User(id="u2", name="U2", role="qa"))
-    tasks = (
+    tasks = backend((
         make_task(1, status="todo"),
         make_task(2, status="in_progress"),
         make_task(3, status="review"),
         make_task(4, status="done"),
         make_task(5, status="todo"),
-    )
+    ))
     stats = overview_stats(projects, users, tasks)
     assert stats["projects_count"] == 1
     assert stats["users_count"] == 2
@@ -78,12 +78,12 @@ def test_overview_stats_counts_and_distribution():
     }
 
 
-def test_project_overview_report_filters_by_project():
-    tasks = (
+def test_project_overview_report_filters_by_project(backend):
+    tasks = backend((
         make_task(1, status="todo"),
         Task(id="t2", project_id="p2", title="x", desc="d", status="done", priority="low", assignee=None, created="2024-01-01T00:00:00", updated="2024-01-01T00:00:00"),
         make_task(3, status="done"),
-    )
+    ))
     report = project_overview_report(tasks, "p1")
     assert report["total"] == 2
     assert report["todo"] == 1
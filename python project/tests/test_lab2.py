@@ -75,24 +75,38 @@ def test_walk_comments_collects_only_for_task():
     assert [c.id for c in result] == ["c1", "c3"]
 
 
-def test_traverse_tasks_respects_status_order():
-    tasks = (
+def test_traverse_tasks_respects_status_order(backend):
+    tasks = backend((
         make_task(1, status="review"),
         make_task(2, status="in_progress"),
         make_task(3, status="todo"),
         make_task(4, status="done"),
-    )
+    ))
     order = ("todo", "in_progress")
     ids = traverse_tasks(tasks, order)
-    assert ids == ("t2", "t3")  # only those in order
+    assert ids == ("t3", "t2")  # only those in order, grouped by status order
 
 
-def test_filtered_tasks_report_combines_filters():
-    tasks = (
+def test_traverse_tasks_is_iterative_and_streams():
+    from core.store import TaskStore
+    from core.transforms import iter_traverse_tasks
+    statuses = ("todo", "in_progress", "review", "done")
+    tasks = tuple(make_task(i, status=statuses[i % 4]) for i in range(5000))
+    order = ("done", "todo")
+    ids = traverse_tasks(tasks, order)
+    assert len(ids) == 2500
+    assert ids[0] == "t3" and ids[1249] == "t4999" and ids[1250] == "t0"
+    assert traverse_tasks(TaskStore(tasks), order) == ids
+    stream = iter_traverse_tasks(tasks, order)
+    assert next(stream) == "t3"
+
+
+def test_filtered_tasks_report_combines_filters(backend):
+    tasks = backend((
         make_task(1, status="todo", priority="high", assignee="u1", created="2024-01-02T00:00:00"),
         make_task(2, status="todo", priority="high", assignee="u2", created="2024-01-03T00:00:00"),
         make_task(3, status="todo", priority="low", assignee="u1", created="2024-01-04T00:00:00"),
-    )
+    ))
     filters = {
         "priority": "high",
         "assignee": "u1",
@@ -102,13 +116,13 @@ def test_filtered_tasks_report_combines_filters():
     assert [t.id for t in result] == ["t1"]
 
 
-def test_user_workload_report_counts_by_status():
-    tasks = (
+def test_user_workload_report_counts_by_status(backend):
+    tasks = backend((
         make_task(1, status="todo", assignee="u1"),
         make_task(2, status="in_progress", assignee="u1"),
         make_task(3, status="done", assignee="u1"),
         make_task(4, status="review", assignee="u2"),
-    )
+    ))
     users = (
         User(id="u1", name="Alice", role="dev"),
         User(id="u2", name="Bob", role="qa"),
@@ -121,3 +135,41 @@ def test_user_workload_report_counts_by_status():
     assert report["Bob"]["review"] == 1
 
 
+
+
+def test_date_range_uses_parsed_timestamps_and_created_index():
+    from core.transforms import created_index
+    from core.store import TaskStore
+    tasks = tuple(
+        make_task(i, assignee="u1" if i % 2 else None, created=f"2024-01-{i:02d}T12:00:00")
+        for i in range(1, 21)
+    ) + (make_task(21, assignee="u1", created="not a date"),)
+    assert tasks[0].created_ts is not None and tasks[-1].created_ts is None
+    pred = by_date_range("2024-01-05T12:00:00", "2024-01-07T12:00:00")
+    expected = tuple(t for t in tasks if pred(t))
+    assert [t.id for t in expected] == ["t5", "t6", "t7"]
+    assert created_index(tasks).between("2024-01-05T12:00:00", "2024-01-07T12:00:00") == expected
+    filters = {"assignee": "u1", "date_range": {"start": "2024-01-05T00:00:00", "end": "2024-01-10T00:00:00"}}
+    assert [t.id for t in filtered_tasks_report(tasks, filters)] == ["t5", "t7", "t9"]
+    assert filtered_tasks_report(TaskStore(tasks), filters) == filtered_tasks_report(tasks, filters)
+
+
+def test_walk_comments_uses_index_without_recursion_limit():
+    from core.comments import CommentIndex
+    comments = tuple(
+        Comment(id=f"c{i}", task_id=f"t{i % 3}", author="u1", text="x", ts=f"2024-01-01T00:00:{59 - i % 60:02d}")
+        for i in range(5000)
+    )
+    found = walk_comments(comments, "t1")
+    assert len(found) == len([c for c in comments if c.task_id == "t1"])
+    assert found[0].id == "c1" and found[-1].id == "c4999"
+    assert walk_comments(comments, "t1", idx=4000) == tuple(c for c in comments[4000:] if c.task_id == "t1")
+
+    index = CommentIndex(comments[:10])
+    newer = index.add(Comment("c_new", "t0", "u2", "new", "2023-12-31T00:00:00"))
+    assert index.count("t0") == 4 and newer.count("t0") == 5
+    assert walk_comments(newer, "t0")[-1].id == "c_new"
+    page = newer.page("t0", 0, 2)
+    assert [c.id for c in page] == ["c_new", "c9"]
+    assert [c.id for c in newer.page("t0", 4, 10)] == ["c0"]
+    assert newer.page("missing") == ()
@@ -2,7 +2,7 @@ import pytest
 import time
 from datetime import datetime, timedelta
 from core.domain import Task
-from core.transforms import overdue_tasks, measure_cache_performance
+from core.transforms import overdue_tasks, measure_cache_performance, overdue_within, DeadlineIndex, task_deadlines
 from core.report import overdue_tasks_report_cached, performance_comparison_report
 
 
@@ -22,14 +22,14 @@ def make_task(idx: int, status: str = "todo", priority: str = "medium", created_
     )
 
 
-def test_overdue_tasks_applies_rules():
+def test_overdue_tasks_applies_rules(backend):
     now = datetime.utcnow()
-    tasks = (
+    tasks = backend((
         make_task(1, status="todo", created_dt=now - timedelta(days=8)),
         make_task(2, status="done", created_dt=now - timedelta(days=20)),
         make_task(3, status="todo", priority="critical", created_dt=now - timedelta(days=4)),
         make_task(4, status="todo", created_dt=now - timedelta(days=2)),
-    )
+    ))
     rules = ("overdue_7_days", "critical_overdue")
     result = overdue_tasks(tasks, rules)
     assert set(t.id for t in result) == {"t1", "t3"}
@@ -92,3 +92,85 @@ def test_performance_comparison_report_has_better_second_call():
     assert report["second_call_time"] <= report["first_call_time"]
 
 
+
+
+def test_overdue_tasks_cache_is_time_correct_and_counts_hits():
+    from core.cache import SLA_CACHE
+
+    base = datetime(2024, 1, 1)
+    tasks = (make_task(1, created_dt=base - timedelta(days=6)),)
+    rules = ("overdue_7_days",)
+    SLA_CACHE.clear()
+
+    assert overdue_tasks(tasks, rules, now=base) == ()
+    assert overdue_tasks(tasks, rules, now=base) == ()
+    # через два дня окно времени другое — результат пересчитывается
+    assert len(overdue_tasks(tasks, rules, now=base + timedelta(days=2))) == 1
+    stats = SLA_CACHE.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_sla_cache_bounded_and_invalidated_on_mutation():
+    from core.cache import SlaCache, SLA_CACHE
+    from core.service import create_task
+
+    cache = SlaCache(maxsize=2)
+    snapshots = [tuple(make_task(i) for i in range(n)) for n in (1, 2, 3)]
+    for snap in snapshots:
+        cache.get_or_compute(snap, ("overdue_7_days",), lambda: snap)
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+
+    tasks = (make_task(1),)
+    SLA_CACHE.clear()
+    overdue_tasks(tasks, ("overdue_7_days",))
+    create_task(tasks, make_task(2))
+    assert SLA_CACHE.stats()["entries"] == 0
+    assert SLA_CACHE.stats()["invalidations"] == 1
+
+
+def test_caches_count_pinned_tuple_snapshots_and_use_utc_buckets():
+    from core.cache import SlaCache, SnapshotCache
+
+    cache = SlaCache(maxsize=10, max_items=150, bucket_seconds=3600)
+    snapshots = [tuple(make_task(i) for i in range(100)) for _ in range(3)]
+    for snap in snapshots:
+        cache.get_or_compute(snap, ("overdue_7_days",), lambda: ())
+    assert cache.stats()["entries"] == 1 and cache.stats()["cached_tasks"] == 100
+
+    built = SnapshotCache(maxsize=10, max_items=150)
+    for snap in snapshots:
+        built.get_or_build(snap, lambda: "index")
+    assert built.peek(snapshots[-1]) == "index" and built.peek(snapshots[0]) is None
+
+    # наивное время — UTC: окно не зависит от часового пояса машины
+    assert cache._bucket(datetime(1970, 1, 1, 2)) == 2
+
+
+def test_deadline_index_matches_day_boundaries():
+    now = datetime(2024, 3, 1, 12, 0, 0)
+    tasks = (
+        make_task(1, created_dt=now - timedelta(days=8)),
+        make_task(2, created_dt=now - timedelta(days=8) + timedelta(microseconds=1)),
+        make_task(3, status="done", priority="critical", created_dt=now - timedelta(days=5)),
+        make_task(4, priority="critical", created_dt=now - timedelta(days=3, hours=20)),
+        make_task(5, created_dt=now - timedelta(days=30)),
+    )
+    tasks += (Task("bad", "p1", "Bad", "", "todo", "critical", None, "not a date", "not a date"),)
+    rules = ("overdue_7_days", "critical_overdue")
+    index = DeadlineIndex(tasks)
+    assert [t.id for t in index.overdue(rules, now)] == ["t1", "t3", "t5"]
+    assert [t.id for t in overdue_tasks(tasks, rules, now)] == ["t1", "t3", "t5"]
+    assert [t.id for t in index.overdue(("overdue_14_days",), now)] == ["t5"]
+    assert [t.id for t in overdue_within(tasks, rules, 1, now)] == ["t2"]
+    assert [t.id for t in overdue_within(tasks, rules, 5, now)] == ["t2", "t4"]
+
+
+def test_task_deadlines_use_parsed_created_and_skip_aware_dates():
+    def task(created):
+        return Task("t1", "p1", "T", "D", "todo", "critical", None, created, created)
+
+    naive = task("2024-01-01T00:00:00")
+    assert task_deadlines(naive, ("critical_overdue",)) == [("critical_overdue", naive.created_ts + 4 * 86_400_000_000)]
+    assert task_deadlines(task("2024-01-01"), ("critical_overdue",)) == task_deadlines(naive, ("critical_overdue",))
+    for created in ("2024-01-01T00:00:00+03:00", "2024-01-01T00:00:00Z", "2024-01-01T00:00:00-05:00", "not a date"):
+        assert task_deadlines(task(created), ("critical_overdue",)) == []
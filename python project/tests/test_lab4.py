@@ -50,8 +50,8 @@ def test_safe_helpers_maybe_and_either():
     assert safe_divide(1, 0).is_left()
 
 
-def test_safe_task_returns_some_or_nothing():
-    tasks = (make_task(1), make_task(2))
+def test_safe_task_returns_some_or_nothing(backend):
+    tasks = backend((make_task(1), make_task(2)))
     assert safe_task(tasks, "t2").is_some()
     assert safe_task(tasks, "t404").is_none()
 
@@ -85,8 +85,8 @@ def test_create_task_pipeline_adds_only_valid():
     assert len(new_tasks) == 2 and any(t.id == "t3" for t in new_tasks)
 
 
-def test_safe_task_report_mix_some_and_nothing():
-    tasks = (make_task(1), make_task(2))
+def test_safe_task_report_mix_some_and_nothing(backend):
+    tasks = backend((make_task(1), make_task(2)))
     report = safe_task_report(tasks, ["t1", "tX"])
     assert report["t1"].is_some()
     assert report["tX"].is_none()
@@ -117,3 +117,76 @@ def test_pipeline_report_accumulates_results_and_updates_state():
     assert results[0].is_left()
     assert results[1].is_right()
     assert results[2].is_right()
+
+
+def _mixed_tasks():
+    return (
+        make_task(1, title="Okay", desc="0123456789X"),
+        make_task(2, title="", desc="bad", status="bad", priority="bad"),
+        make_task(3, title="Go", status="in_progress", assignee=None),
+        make_task(4, title="   ", desc="0123456789X", status="in_progress", assignee="u1"),
+        make_task(5, title="Fine", desc="0123456789X", status="done", priority="critical"),
+    )
+
+
+def test_validation_summary_matches_validate_task():
+    from core.report import validation_summary
+    tasks = _mixed_tasks()
+    rules = ("title_min_length", "desc_min_length", "assignee_required", "unknown_rule")
+    summary = validation_summary(tasks, rules)
+    results = [validate_task(t, rules) for t in tasks]
+    errors = []
+    for r in results:
+        r.map_left(errors.append)
+    assert summary.valid == sum(r.is_right() for r in results) == 2
+    assert list(summary.failures) == errors
+    assert [f["task_id"] for f in summary.failures] == ["t2", "t3", "t4"]
+    assert summary.failures[1]["errors"] == ["Title must be at least 3 characters long", "Assignee is required for tasks in progress"]
+    assert summary.total == len(tasks)
+
+
+def test_validate_batch_on_table_matches_tuple():
+    pytest.importorskip("numpy")
+    from core.table import TaskTable
+    from core.validation import validate_batch
+    tasks = _mixed_tasks()
+    rules = ("title_min_length", "desc_min_length", "assignee_required")
+    assert validate_batch(TaskTable.from_tasks(tasks), rules) == validate_batch(tasks, rules)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bulk_pipeline_report_matches_pipeline_report(backend, workers):
+    from core.report import bulk_pipeline_report
+    rules = ("title_min_length", "desc_min_length", "assignee_required", "unique_id")
+    new_tasks = [
+        make_task(2, title="No", desc="short", status="in_progress"),  # invalid
+        make_task(3, title="Good", desc="0123456789X"),
+        make_task(1, title="Dup", desc="0123456789X"),  # ID уже есть в исходной коллекции
+        make_task(3, title="Again", desc="0123456789X"),  # ID принят выше
+        make_task(4, title="Good2", desc="0123456789Y"),
+    ]
+    expected = pipeline_report((make_task(1),), new_tasks, rules)
+    run = bulk_pipeline_report(backend((make_task(1),)), iter(new_tasks), rules, workers=workers, chunk_size=2)
+    results = list(run)
+    assert [r.is_right() for r in results] == [r.is_right() for r in expected] == [False, True, False, False, True]
+    left, left_expected = [], []
+    for r, e in zip(results, expected):
+        r.map_left(left.append)
+        e.map_left(left_expected.append)
+    assert left == left_expected
+    assert left[1]["errors"] == ["Duplicate task id: t1"]
+    assert [t.id for t in run.tasks] == ["t1", "t3", "t4"]
+    assert (run.stats.total, run.stats.accepted, run.stats.rejected) == (5, 2, 3)
+
+
+def test_pipeline_report_checks_duplicates_through_carried_id_index():
+    from core.persistent import PVector
+    from core.transforms import ID_INDEXES
+
+    tasks = PVector((make_task(1),))
+    new_tasks = [make_task(2), make_task(1), make_task(3), make_task(2)]
+    results = pipeline_report(tasks, new_tasks, ("unique_id",))
+    assert [r.is_right() for r in results] == [True, False, True, False]
+    final = results[2].get_or_else(None)
+    assert safe_task(final, "t3").get_or_else(None) == make_task(3) and safe_task(final, "t9").is_none()
+    assert ID_INDEXES.peek(final) is not None
@@ -0,0 +1,83 @@
+import pytest
+from core.persistent import PVector, PMap
+from core.transforms import ID_INDEXES, add_task
+from core.service import create_task, change_status
+from core.report import pipeline_report
+from conftest import make_task
+
+
+
+@pytest.mark.parametrize("n", [0, 1, 32, 33, 1024, 1025, 40000])
+def test_pvector_append_and_build_agree(n):
+    items = list(range(n))
+    built = PVector(items)
+    appended = PVector()
+    for i in items:
+        appended = appended.append(i)
+    assert list(built) == items
+    assert list(appended) == items
+    assert list(PVector(items[: n // 2]).extend(items[n // 2:])) == items
+    if n:
+        assert appended[-1] == n - 1 and appended[n // 2] == n // 2
+
+
+def test_pvector_set_keeps_old_version():
+    vec = PVector(range(2000))
+    new_vec = vec.set(100, "x").set(1999, "y")
+    assert vec[100] == 100 and vec[1999] == 1999
+    assert new_vec[100] == "x" and new_vec[1999] == "y"
+    assert new_vec[101] == 101
+    with pytest.raises(IndexError):
+        vec.set(2000, 0)
+
+
+def test_pmap_set_delete_are_persistent():
+    m = PMap({f"k{i}": i for i in range(500)})
+    m2 = m.set("k1", "one").delete("k2").set("new", 42)
+    assert len(m) == 500 and m["k1"] == 1 and "k2" in m
+    assert len(m2) == 500 and m2["k1"] == "one" and "k2" not in m2
+    assert m2.get("new") == 42
+    assert m.delete("missing") is m
+
+
+def test_add_task_and_change_status_on_pvector():
+    tasks = PVector((make_task(1), make_task(2)))
+    added = add_task(tasks, make_task(3))
+    assert isinstance(added, PVector) and len(added) == 3 and len(tasks) == 2
+    assert create_task(tasks, make_task(4))[-1].id == "t4"
+    changed = change_status(added, "t2", "done")
+    assert changed[1].status == "done" and added[1].status == "todo"
+    assert change_status(added, "t404", "done") is added
+
+
+def test_change_status_on_pvector_reuses_id_index():
+    tasks = PVector(make_task(i) for i in range(1000))
+    changed = change_status(tasks, "t10", "done")
+    grown = create_task(changed, make_task(10))
+    index = ID_INDEXES.peek(grown)
+    assert index["t10"] == (10, 1000)
+    final = change_status(grown, "t10", "review")
+    assert [final[p].status for p in (10, 1000)] == ["review", "review"]
+    assert ID_INDEXES.peek(final) is index
+    assert changed[10].status == "done" and tasks[10].status == "todo"
+
+
+def test_pipeline_report_shares_structure_between_snapshots():
+    tasks = tuple(make_task(i) for i in range(100))
+    new_tasks = [make_task(100 + i) for i in range(50)]
+    results = pipeline_report(tasks, new_tasks, ("title_min_length",))
+    assert all(r.is_right() for r in results)
+    first = results[0].get_or_else(None)
+    last = results[-1].get_or_else(None)
+    assert len(first) == 101 and len(last) == 150
+    assert last[100].id == "t100" and first[-1].id == "t100"
+
+
+def test_psortedset_extend_appends_and_inserts():
+    from core.persistent import PSortedSet
+    base = PSortedSet([1, 5, 9])
+    tail = base.extend(range(10, 300))
+    assert list(tail) == [1, 5, 9] + list(range(10, 300)) and len(tail) == 293
+    mixed = tail.extend([2, 400, 5])
+    assert list(mixed) == [1, 2, 5, 9] + list(range(10, 300)) + [400] and len(mixed) == 295
+    assert list(base) == [1, 5, 9]
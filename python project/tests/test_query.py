@@ -0,0 +1,77 @@
+import pytest
+from core.data_loader import load_seed
+from core.store import TaskStore
+from core.query import plan_query, run_query
+from core.report import filtered_tasks_report
+from conftest import make_task
+
+
+
+TASKS = tuple(
+    make_task(
+        i,
+        status=("todo", "in_progress", "review", "done")[i % 4],
+        assignee="u1" if i % 10 == 0 else "u2",
+        priority="high" if i % 3 == 0 else "low",
+        project_id="p1" if i < 50 else "p2",
+        created=f"2024-02-{1 + i % 28:02d}T09:00:00",
+    )
+    for i in range(100)
+)
+
+
+def brute_force(tasks, filters):
+    def ok(t):
+        for key in ("priority", "assignee", "status", "project_id"):
+            if key in filters:
+                allowed = filters[key] if isinstance(filters[key], (list, tuple, set)) else (filters[key],)
+                if getattr(t, key) not in allowed:
+                    return False
+        if "date_range" in filters:
+            rng = filters["date_range"]
+            if not rng["start"] <= t.created <= rng["end"]:
+                return False
+        return True
+    return tuple(t for t in tasks if ok(t))
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"assignee": "u1"},
+    {"priority": "high", "status": ["todo", "done"]},
+    {"project_id": "p2", "assignee": "u2", "date_range": {"start": "2024-02-03T00:00:00", "end": "2024-02-05T23:59:59"}},
+    {"status": ("review",), "priority": ["high", "low"], "assignee": "nobody"},
+])
+def test_query_matches_brute_force_for_tuple_and_store(filters):
+    expected = brute_force(TASKS, filters)
+    assert run_query(TASKS, filters) == expected
+    assert filtered_tasks_report(TaskStore(TASKS), filters) == expected
+
+
+def test_plan_starts_from_most_selective_index():
+    store = TaskStore(TASKS)
+    plan = plan_query(store, {"priority": "low", "assignee": "u1", "project_id": "p1"})
+    assert plan.source == "index:assignee" and plan.estimate == 10
+    assert set(plan.residual) == {"priority", "project_id"}
+    narrow = {"assignee": "u2", "date_range": {"start": "2024-02-10T00:00:00", "end": "2024-02-10T23:59:59"}}
+    assert plan_query(store, narrow).source == "created_index"
+    assert plan_query(TASKS, {"status": "done"}).source == "scan"
+
+
+def test_wide_date_range_scans_without_building_index():
+    from core.transforms import CREATED_INDEXES
+    tasks = tuple(list(TASKS))  # новый снимок: индекс дат для TASKS могли построить другие тесты
+    wide = {"date_range": {"start": "2024-02-02T00:00:00", "end": "2024-02-28T23:59:59"}}
+    plan = plan_query(tasks, wide)
+    assert plan.source == "scan" and plan.residual == ("date_range",)
+    assert CREATED_INDEXES.peek(tasks) is None
+    assert run_query(tasks, wide) == brute_force(tasks, wide)
+
+
+def test_query_on_table_matches_store():
+    pytest.importorskip("numpy")
+    from core.table import TaskTable
+    _, _, tasks, _ = load_seed()
+    table = TaskTable.from_tasks(tasks)
+    filters = {"status": ["todo", "review"], "priority": ["high", "critical"]}
+    assert filtered_tasks_report(table, filters) == filtered_tasks_report(TaskStore(tasks), filters)
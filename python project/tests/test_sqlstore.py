@@ -0,0 +1,128 @@
+import dataclasses
+import gc
+import threading
+
+import pytest
+from core.data_loader import EntityDelta, load_seed
+from core.sqlstore import SqliteTaskStore, StaleHandleError
+from core.query import plan_query
+from core.service import apply_seed_delta, change_status, create_task, project_overview
+from core.transforms import traverse_tasks
+from core.report import (
+    filtered_tasks_report, generate_summary_report, group_counts, overview_stats,
+)
+
+
+def test_sqlite_reports_match_tuple_reports():
+    projects, users, tasks, _ = load_seed()
+    store = SqliteTaskStore(tasks=tasks)
+    assert tuple(store) == tasks and store[3] == tasks[3] and store[-2:] == tasks[-2:]
+    assert generate_summary_report(projects, users, store) == generate_summary_report(projects, users, tasks)
+    assert group_counts(store, ("project_id", "status"), where={"assignee": None}) == group_counts(tasks, ("project_id", "status"), where={"assignee": None})
+    filters = {"status": ["todo", "review"], "priority": "high", "assignee": [users[0].id, None]}
+    assert filtered_tasks_report(store, filters) == filtered_tasks_report(tasks, filters)
+    assert plan_query(store, filters).source == "sql"
+    order = ("done", "todo")
+    assert traverse_tasks(store, order) == traverse_tasks(tasks, order)
+    for p in projects:
+        assert project_overview(store, p.id) == project_overview(tasks, p.id)
+
+
+def test_sqlite_store_persists_and_keeps_old_handles(tmp_path):
+    _, _, tasks, _ = load_seed()
+    path = str(tmp_path / "tasks.db")
+    store = SqliteTaskStore(path, tasks[:5])
+    grown = create_task(store, tasks[5])
+    assert len(store) == 5 and len(grown) == 6
+    changed = change_status(grown, tasks[0].id, "done")
+    assert changed.get(tasks[0].id).status == "done"
+    assert change_status(changed, "missing", "done") is changed
+    grown.close()
+
+    reopened = SqliteTaskStore(path)
+    assert len(reopened) == 6
+    assert reopened[5] == tasks[5]
+    assert overview_stats((), (), reopened)["status_distribution"]["done"] >= 1
+    with pytest.raises(IndexError):
+        reopened[6]
+
+
+def test_sqlite_handles_are_immutable_snapshots():
+    _, _, tasks, _ = load_seed()
+    base = SqliteTaskStore(tasks=tasks[:3])
+    grown = create_task(base, tasks[3])
+    with pytest.raises(StaleHandleError):
+        create_task(base, tasks[4])
+    assert tuple(grown) == tasks[:4]
+
+    changed = change_status(grown, tasks[0].id, "done", updated="2024-03-01T00:00:00")
+    assert grown.get(tasks[0].id) == tasks[0] and tuple(grown) == tasks[:4]
+    assert changed[0].status == "done" and changed.version == grown.version + 1
+    with pytest.raises(StaleHandleError):
+        change_status(grown, tasks[1].id, "done")
+
+
+def test_sqlite_apply_delta_removes_tasks():
+    _, _, tasks, _ = load_seed()
+    store = SqliteTaskStore(tasks=tasks[:6])
+    edited = dataclasses.replace(tasks[4], title="Renamed")
+    delta = EntityDelta(added=(tasks[6],), changed=((tasks[4], edited),), removed=(tasks[1], tasks[2]))
+    reloaded = apply_seed_delta(store, delta)
+    expected = apply_seed_delta(tasks[:6], delta)
+    assert tuple(reloaded) == tuple(expected) and len(reloaded) == 5
+    assert reloaded[1] == expected[1] and reloaded[-2:] == tuple(expected[-2:])
+    assert list(reloaded.ids_by_status(("todo", "in_progress", "review", "done"), 2)) == \
+        [t.id for s in ("todo", "in_progress", "review", "done") for t in expected[2:] if t.status == s]
+    assert len(store) == 6 and store[1] == tasks[1]
+
+
+def test_sqlite_with_status_keeps_each_row_and_compacts_history():
+    _, _, tasks, _ = load_seed()
+    twin = dataclasses.replace(tasks[0], title="Twin", priority="low")
+    store = SqliteTaskStore(tasks=(tasks[0], tasks[1], twin))
+    old = store
+    for status in ("in_progress", "review", "done"):
+        store = store.with_status(tasks[0].id, status, updated="2024-03-01T00:00:00")
+    assert [(t.title, t.priority, t.status) for t in store if t.id == tasks[0].id] == [
+        (tasks[0].title, tasks[0].priority, "done"), ("Twin", "low", "done"),
+    ]
+    assert tuple(old) == (tasks[0], tasks[1], twin)
+
+    rows = lambda: store._db.conn.execute("SELECT COUNT(*) FROM task_rows").fetchone()[0]
+    assert rows() == 3 + 2 * 3
+    del old
+    gc.collect()
+    store.compact()
+    assert rows() == 3 and tuple(store)[1] == tasks[1]
+    plan = " ".join(r[-1] for r in store._db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM task_rows WHERE status = ? AND born <= ? AND died > ?", ("done", 1, 1)))
+    assert "task_rows_status" in plan
+
+
+def test_sqlite_writes_from_threads_are_serialised():
+    _, _, tasks, _ = load_seed()
+    store = SqliteTaskStore()
+    handles = []
+    lock = threading.Lock()
+
+    def writer(chunk):
+        nonlocal store
+        for task in chunk:
+            while True:
+                with lock:
+                    current = store
+                try:
+                    new = current.add(task)
+                except StaleHandleError:
+                    continue
+                with lock:
+                    store = new if new.version > store.version else store
+                    handles.append(new)
+                break
+
+    threads = [threading.Thread(target=writer, args=(tasks[i::4],)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(store) == len(tasks) and sorted(t.id for t in store) == sorted(t.id for t in tasks)
@@ -0,0 +1,82 @@
+import pytest
+from core.domain import User
+from core.store import TaskStore
+from core.transforms import filter_by_status, safe_task, avg_tasks_per_user
+from core.service import create_task, change_status, project_overview
+from core.report import overview_stats, project_overview_report, filtered_tasks_report, user_workload_report
+from conftest import make_task
+
+
+
+def sample_tasks():
+    return (
+        make_task(1, status="todo", assignee="u1", priority="high"),
+        make_task(2, status="done", assignee="u2", project_id="p2"),
+        make_task(3, status="in_progress", assignee="u1"),
+        make_task(4, status="todo", priority="high", project_id="p2"),
+        make_task(5, status="review", assignee="u1", priority="high"),
+    )
+
+
+def test_store_behaves_like_sequence():
+    tasks = sample_tasks()
+    store = TaskStore(tasks)
+    assert len(store) == 5
+    assert tuple(store) == tasks
+    assert store[0] == tasks[0] and store[-1] == tasks[-1]
+
+
+def test_store_lookups_match_tuple_results():
+    tasks = sample_tasks()
+    store = TaskStore(tasks)
+    for status in ("todo", "in_progress", "review", "done"):
+        assert filter_by_status(store, status) == filter_by_status(tasks, status)
+    assert safe_task(store, "t3").is_some()
+    assert safe_task(store, "t404").is_none()
+    assert avg_tasks_per_user(store) == pytest.approx(avg_tasks_per_user(tasks))
+
+
+def test_store_reports_match_tuple_reports():
+    tasks = sample_tasks()
+    store = TaskStore(tasks)
+    users = (User(id="u1", name="Alice", role="dev"), User(id="u2", name="Bob", role="qa"))
+    assert overview_stats((), users, store) == overview_stats((), users, tasks)
+    assert project_overview_report(store, "p2") == project_overview_report(tasks, "p2")
+    assert project_overview(store, "p1") == project_overview(tasks, "p1")
+    assert user_workload_report(store, users) == user_workload_report(tasks, users)
+    filters = {"priority": "high", "assignee": "u1"}
+    assert filtered_tasks_report(store, filters) == filtered_tasks_report(tasks, filters)
+
+
+def test_create_task_updates_indexes_without_touching_original():
+    store = TaskStore(sample_tasks())
+    new_store = create_task(store, make_task(6, status="done", assignee="u2"))
+    assert isinstance(new_store, TaskStore)
+    assert len(store) == 5 and len(new_store) == 6
+    assert store.count("status", "done") == 1
+    assert new_store.count("status", "done") == 2
+    assert [t.id for t in new_store.select("assignee", "u2")] == ["t2", "t6"]
+
+
+def test_change_status_moves_task_between_buckets():
+    store = TaskStore(sample_tasks())
+    new_store = change_status(store, "t1", "done")
+    assert store.get("t1").status == "todo"
+    assert new_store.get("t1").status == "done"
+    assert [t.id for t in new_store.select("status", "todo")] == ["t4"]
+    assert [t.id for t in new_store.select("status", "done")] == ["t1", "t2"]
+    assert change_status(store, "t404", "done") is store
+
+
+def test_extend_matches_repeated_add():
+    base = TaskStore([make_task(1, status="todo")])
+    new = [make_task(2, status="done"), make_task(3, status="todo"), make_task(1, status="review")]
+    extended = base.extend(new)
+    added = base
+    for t in new:
+        added = added.add(t)
+    assert tuple(extended) == tuple(added)
+    assert extended.select("status", "todo") == added.select("status", "todo")
+    assert extended.counts("status") == added.counts("status")
+    assert extended.get("t1") == added.get("t1")
+    assert len(base) == 1
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from core.data_loader import load_seed
+from core.table import TaskTable
+from core.transforms import filter_by_status, avg_tasks_per_user
+from core.service import project_overview
+from core.report import overview_stats, project_overview_report, filtered_tasks_report, user_workload_report
+from conftest import make_task
+
+
+
+def test_table_roundtrips_tasks():
+    tasks = (
+        make_task(1, assignee="u1"),
+        make_task(2, status="weird", created="2024-01-02T10:00:00.250000"),
+        make_task(3, created="2024-01-03T10:00:00+03:00"),
+        make_task(4, created="not a date"),
+    )
+    table = TaskTable.from_tasks(tasks)
+    assert len(table) == 4
+    assert tuple(table) == tasks
+    assert table[-1] == tasks[-1]
+
+
+def test_table_filters_match_tuple_filters():
+    tasks = (
+        make_task(1, status="todo", priority="high", assignee="u1", created="2024-01-02T00:00:00"),
+        make_task(2, status="done", priority="high", assignee="u2", created="2024-01-03T00:00:00"),
+        make_task(3, status="todo", priority="low", assignee="u1", created="2024-01-04T00:00:00"),
+    )
+    table = TaskTable.from_tasks(tasks)
+    assert filter_by_status(table, "todo") == filter_by_status(tasks, "todo")
+    assert filter_by_status(table, "missing") == ()
+    filters = {
+        "priority": "high",
+        "assignee": "u1",
+        "date_range": {"start": "2024-01-01T00:00:00", "end": "2024-01-03T23:59:59"},
+    }
+    assert filtered_tasks_report(table, filters) == filtered_tasks_report(tasks, filters)
+    assert filtered_tasks_report(table, {}) == tasks
+
+
+def test_table_reports_match_seed_reports():
+    projects, users, tasks, _ = load_seed()
+    table = TaskTable.from_tasks(tasks)
+    assert overview_stats(projects, users, table) == overview_stats(projects, users, tasks)
+    assert avg_tasks_per_user(table) == pytest.approx(avg_tasks_per_user(tasks))
+    assert user_workload_report(table, users) == user_workload_report(tasks, users)
+    for p in projects:
+        assert project_overview_report(table, p.id) == project_overview_report(tasks, p.id)
+        assert project_overview(table, p.id) == project_overview_report(tasks, p.id)
+
+
+def test_group_counts_by_two_fields():
+    tasks = (
+        make_task(1, status="todo", project_id="p1"),
+        make_task(2, status="todo", project_id="p1"),
+        make_task(3, status="done", project_id="p2"),
+    )
+    table = TaskTable.from_tasks(tasks)
+    assert table.group_counts(("project_id", "status")) == {("p1", "todo"): 2, ("p2", "done"): 1}
+    assert table.count_by("status") == {"todo": 2, "done": 1}
@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from core.domain import User
+from core.frp import EventBus
+from core.report import overview_stats, project_overview_report, user_workload_report
+from core.service import replay_task_events
+from core.transforms import overdue_tasks
+from core.views import TaskViews
+from conftest import make_task
+
+NOW = datetime(2024, 3, 1)
+USERS = (User(id="u1", name="Ann", role="dev"), User(id="u2", name="Bob", role="dev"))
+
+
+def test_views_follow_bus_events_and_match_full_recompute():
+    bus = EventBus()
+    views = TaskViews()
+    views.attach(bus)
+    seen = []
+    for name in ("task_created", "task_updated"):
+        bus.subscribe(name, seen.append)
+    created = [make_task(i, project_id=f"p{i % 3}", priority="critical" if i % 4 == 0 else "medium", assignee=("u1", "u2", None)[i % 3],
+                         created="2024-02-27T00:00:00" if i % 2 else "2024-01-01T00:00:00") for i in range(30)]
+    with bus.batch():
+        for t in created:
+            bus.publish("task_created", t)
+    bus.publish("task_updated", {"id": "t1", "status": "done", "updated": "2024-02-28T00:00:00"})
+    bus.publish("task_updated", {"id": "t2", "status": "in_progress", "updated": "2024-02-28T00:00:00"})
+    bus.publish("task_updated", make_task(5, status="review", assignee="u1", project_id="p2"))
+    bus.publish("task_updated", {"id": "missing", "status": "done"})
+    tasks = replay_task_events((), seen)
+
+    assert views.version == 33 and len(views) == 30
+    assert views.verify(tasks, (), USERS, now=NOW) == []
+    assert overview_stats((), USERS, views) == overview_stats((), USERS, tasks)
+    assert project_overview_report(views, "p1") == project_overview_report(tasks, "p1")
+    assert user_workload_report(views, USERS) == user_workload_report(tasks, USERS)
+    rules = ("overdue_7_days", "critical_overdue")
+    assert overdue_tasks(views, rules, NOW) == overdue_tasks(tasks, rules, NOW)
+
+
+def test_verify_reports_divergence():
+    tasks = tuple(make_task(i, assignee="u1") for i in range(5))
+    views = TaskViews(tasks)
+    assert views.verify(tasks, (), USERS, now=NOW) == []
+    assert views.verify(tasks[:4], (), USERS, now=NOW) == [
+        "overview_stats", "project_overview_report", "user_workload_report", "overdue_tasks",
+    ]
+
+
+def test_views_apply_interleaved_batch_in_publish_order():
+    bus = EventBus(coalesce={"task_updated": "id"})
+    views = TaskViews((make_task(0),))
+    views.attach(bus)
+    with bus.batch():
+        bus.publish("task_updated", {"id": "t0", "status": "review", "updated": "2024-02-28T00:00:00"})
+        bus.publish("task_created", make_task(1))
+        bus.publish("task_updated", {"id": "t1", "status": "done", "updated": "2024-02-28T00:00:00"})
+    assert views.version == 3
+    assert [(t.id, t.status) for t in views] == [("t0", "review"), ("t1", "done")]
+
+
+def test_overdue_scans_rules_not_tracked_by_views():
+    tasks = tuple(make_task(i, priority="critical" if i % 2 else "medium") for i in range(6))
+    views = TaskViews(tasks, rules=("overdue_7_days",))
+    rules = ("overdue_7_days", "critical_overdue")
+    assert views.overdue(("critical_overdue",), NOW) == overdue_tasks(tasks, ("critical_overdue",), NOW)
+    assert views.overdue(rules, NOW) == overdue_tasks(tasks, rules, NOW)